@@ -3,6 +3,14 @@ ASGI config for adlab project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The "events" service runs it under uvicorn to serve the management
+dashboard event stream (/api/dashboard/events/, see pages.live_events):
+open streams stay on the event loop, so idle lab screens cost a coroutine
+each instead of a gunicorn worker. Nginx routes only that location here;
+the rest of the site stays on config.wsgi. Without it
+(DASHBOARD_EVENTS_ENABLED unset) the dashboard does not open the stream
+and relies on its periodic batch refresh.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -209,6 +209,43 @@ else:
         }
     }
 
+# Management dashboard entries use versioned keys invalidated by model
+# saves (pages.dashboard_cache); the TTL is only a safety net.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "3600"))
+# Last computed value of each entry, served while a single worker refreshes
+# an invalidated or expired entry (stale-while-revalidate).
+DASHBOARD_CACHE_STALE_TIMEOUT = int(
+    os.getenv("DASHBOARD_CACHE_STALE_TIMEOUT", "86400")
+)
+# Refresh lock TTL; bounds how long a crashed refresh can block others.
+DASHBOARD_CACHE_LOCK_TIMEOUT = int(
+    os.getenv("DASHBOARD_CACHE_LOCK_TIMEOUT", "30")
+)
+# Hand refreshes to Celery instead of computing them in the request that
+# found the entry stale.
+DASHBOARD_CACHE_ASYNC_REFRESH = (
+    os.getenv("DASHBOARD_CACHE_ASYNC_REFRESH", "false").lower() == "true"
+)
+
+# Live dashboard events (pages.live_events, ASGI only). Enable once the
+# "events" service (uvicorn serving config.asgi) is deployed behind the
+# /api/dashboard/events/ location: the dashboard page, served by gunicorn,
+# then opens the stream. Also: generation poll interval per process,
+# keepalive comment interval for open streams and the EventSource
+# reconnection delay.
+DASHBOARD_EVENTS_ENABLED = bool(
+    strtobool(os.getenv("DASHBOARD_EVENTS_ENABLED", "false"))
+)
+if TESTING:
+    DASHBOARD_EVENTS_ENABLED = False
+DASHBOARD_EVENTS_POLL_INTERVAL = float(
+    os.getenv("DASHBOARD_EVENTS_POLL_INTERVAL", "1.0")
+)
+DASHBOARD_EVENTS_KEEPALIVE = float(
+    os.getenv("DASHBOARD_EVENTS_KEEPALIVE", "15.0")
+)
+DASHBOARD_EVENTS_RETRY_MS = int(os.getenv("DASHBOARD_EVENTS_RETRY_MS", "3000"))
+
 # Celery
 # https://docs.celeryproject.org/en/stable/userguide/configuration.html
 CELERY_BROKER_URL = REDIS_URL
@@ -241,6 +278,26 @@ if TESTING:
 SERVER_STATS_REFRESH_INTERVAL = float(
     os.getenv("SERVER_STATS_REFRESH_INTERVAL", "60.0")
 )  # seconds (once per minute)
+# ServerStatsSample history: raw samples, 5-minute and hourly averages are
+# kept for these periods (enforced by maintain-server-stats-history)
+SERVER_STATS_RAW_RETENTION_HOURS = int(
+    os.getenv("SERVER_STATS_RAW_RETENTION_HOURS", "24")
+)
+SERVER_STATS_5MIN_RETENTION_DAYS = int(
+    os.getenv("SERVER_STATS_5MIN_RETENTION_DAYS", "30")
+)
+SERVER_STATS_HOURLY_RETENTION_DAYS = int(
+    os.getenv("SERVER_STATS_HOURLY_RETENTION_DAYS", "365")
+)
+# Bucket listing pages (up to 1000 objects each) walked per
+# reconcile-media-usage run; the walk resumes where the last run stopped
+MEDIA_RECONCILE_PAGES_PER_RUN = int(
+    os.getenv("MEDIA_RECONCILE_PAGES_PER_RUN", "10")
+)
+# Days reconciled by the periodic refresh-daily-metrics task (today included)
+METRICS_ROLLUP_REFRESH_DAYS = int(
+    os.getenv("METRICS_ROLLUP_REFRESH_DAYS", "2")
+)
 # Worker consumes the "celery" queue by default; do not use "default" or tasks are never picked up.
 CELERY_BEAT_SCHEDULE = {
     "check-container-memory-alerts": {
@@ -248,6 +305,26 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": 600.0,  # Every 10 minutes
         "options": {"queue": "celery"},
     },
+    "evaluate-alert-rules": {
+        "task": "pages.tasks.evaluate_alert_rules",
+        "schedule": 120.0,  # Every 2 minutes
+        "options": {"queue": "celery"},
+    },
+    "maintain-server-stats-history": {
+        "task": "pages.tasks.maintain_server_stats_history",
+        "schedule": 300.0,  # Every 5 minutes (downsampling + retention)
+        "options": {"queue": "celery"},
+    },
+    "reconcile-media-usage": {
+        "task": "pages.tasks.reconcile_media_usage",
+        "schedule": 900.0,  # Every 15 minutes (resumable bucket walk)
+        "options": {"queue": "celery"},
+    },
+    "refresh-daily-metrics": {
+        "task": "pages.tasks.refresh_daily_metrics",
+        "schedule": 600.0,  # Every 10 minutes (reconciles recent days)
+        "options": {"queue": "celery"},
+    },
     "refresh-server-stats": {
         "task": "pages.tasks.refresh_server_stats",
         "schedule": SERVER_STATS_REFRESH_INTERVAL,
@@ -261,6 +338,11 @@ CELERY_BEAT_MAX_LOOP_INTERVAL = min(
     max(5, int(SERVER_STATS_REFRESH_INTERVAL)),
 )
 
+# Docker container stats (admin dashboard and memory alerts): seconds each
+# container's stats call may take and how many run in parallel
+DOCKER_STATS_TIMEOUT = float(os.getenv("DOCKER_STATS_TIMEOUT", "5.0"))
+DOCKER_STATS_MAX_WORKERS = int(os.getenv("DOCKER_STATS_MAX_WORKERS", "8"))
+
 # Container memory alert: threshold (percent) and optional name substring filter.
 # Containers with memory_percent >= threshold are reported to admins (email).
 # Set to 0 to disable alerting.
@@ -416,7 +498,7 @@ STORAGES = {
 
 if USE_S3_STORAGE and not TESTING:
     STORAGES["default"] = {
-        "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+        "BACKEND": "config.storage.AccountedS3Storage",
         "OPTIONS": {
             "access_key": os.getenv("AWS_ACCESS_KEY_ID"),
             "secret_key": os.getenv("AWS_SECRET_ACCESS_KEY"),
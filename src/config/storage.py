@@ -1,15 +1,23 @@
 """
-Custom static files storage backends.
+Custom storage backends.
 
 Provides a WhiteNoise-based storage that gracefully handles missing manifest
 entries instead of crashing the entire request with a ValueError. This is
 critical during deployments where the manifest may be temporarily stale (e.g.
 the volume-mounted staticfiles.json hasn't been regenerated yet, or the web
 process hasn't restarted to pick up the new manifest).
+
+Also provides the media storage used with Garage/S3, which keeps running
+per-prefix usage counters so bucket stats never require a full listing.
 """
 
+import logging
+
+from storages.backends.s3boto3 import S3Boto3Storage
 from whitenoise.storage import CompressedManifestStaticFilesStorage
 
+logger = logging.getLogger(__name__)
+
 
 class ForgivingManifestStaticFilesStorage(
     CompressedManifestStaticFilesStorage
@@ -25,3 +33,39 @@ class ForgivingManifestStaticFilesStorage(
     """
 
     manifest_strict = False
+
+
+class AccountedStorageMixin:
+    """
+    Storage mixin recording saves and deletes in pages.MediaPrefixUsage.
+
+    Accounting failures are logged and never break the upload or delete;
+    the periodic reconcile_media_usage task corrects any drift.
+    """
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        self._record(name, 1, content.size)
+        return name
+
+    def delete(self, name):
+        try:
+            size = self.size(name)
+        except Exception:
+            size = None  # Missing object: nothing to subtract
+        super().delete(name)
+        if size is not None:
+            self._record(name, -1, -size)
+
+    @staticmethod
+    def _record(name, count_delta, size_delta):
+        from pages.models import MediaPrefixUsage
+
+        try:
+            MediaPrefixUsage.record_change(name, count_delta, size_delta)
+        except Exception as e:
+            logger.warning("Media usage accounting failed for %s: %s", name, e)
+
+
+class AccountedS3Storage(AccountedStorageMixin, S3Boto3Storage):
+    """S3/Garage media storage with per-prefix usage accounting."""
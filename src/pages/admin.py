@@ -4,7 +4,13 @@ Django admin for the pages app.
 
 from django.contrib import admin
 
-from pages.models import ServerStatsSnapshot
+from pages.models import (
+    AlertRule,
+    DailyMetricsRollup,
+    MediaPrefixUsage,
+    ServerStatsSample,
+    ServerStatsSnapshot,
+)
 
 
 @admin.register(ServerStatsSnapshot)
@@ -23,3 +29,109 @@ class ServerStatsSnapshotAdmin(admin.ModelAdmin):
 
     def get_readonly_fields(self, request, obj=None):
         return ["payload", "updated_at"]
+
+
+@admin.register(ServerStatsSample)
+class ServerStatsSampleAdmin(admin.ModelAdmin):
+    """Read-only admin for the server stats history (debugging)."""
+
+    list_display = (
+        "timestamp",
+        "resolution",
+        "sample_count",
+        "cpu_percent",
+        "ram_percent",
+        "disk_percent",
+    )
+    list_filter = ("resolution",)
+    date_hierarchy = "timestamp"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MediaPrefixUsage)
+class MediaPrefixUsageAdmin(admin.ModelAdmin):
+    """Read-only admin for the media bucket usage counters (debugging)."""
+
+    list_display = ("prefix", "object_count", "total_size_bytes", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyMetricsRollup)
+class DailyMetricsRollupAdmin(admin.ModelAdmin):
+    """Read-only admin for the dashboard daily rollup (debugging)."""
+
+    list_display = (
+        "date",
+        "analysis_type",
+        "histopathologist",
+        "protocols_received",
+        "reports_finalized",
+        "updated_at",
+    )
+    list_filter = ("analysis_type",)
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AlertRule)
+class AlertRuleAdmin(admin.ModelAdmin):
+    """Admin for the management dashboard alert rules."""
+
+    list_display = (
+        "name",
+        "alert_type",
+        "severity",
+        "threshold",
+        "is_active",
+        "last_count",
+        "last_evaluated_at",
+    )
+    list_filter = ("alert_type", "severity", "is_active")
+    list_editable = ("is_active",)
+    readonly_fields = ("last_count", "last_sample", "last_evaluated_at")
+    fieldsets = (
+        (
+            None,
+            {
+                "fields": (
+                    "name",
+                    "alert_type",
+                    "severity",
+                    "position",
+                    "is_active",
+                )
+            },
+        ),
+        (
+            "Condición",
+            {
+                "fields": (
+                    "statuses",
+                    "analysis_type",
+                    "age_field",
+                    "min_age_days",
+                    "threshold",
+                )
+            },
+        ),
+        ("Presentación", {"fields": ("message", "stage", "sample_size")}),
+        (
+            "Última evaluación",
+            {"fields": ("last_count", "last_sample", "last_evaluated_at")},
+        ),
+    )
@@ -43,9 +43,24 @@ urlpatterns = [
         api_views.DashboardAlertsView.as_view(),
         name="dashboard_alerts",
     ),
+    path(
+        "dashboard/all/",
+        api_views.DashboardBatchView.as_view(),
+        name="dashboard_batch",
+    ),
+    path(
+        "dashboard/events/",
+        api_views.dashboard_events,
+        name="dashboard_events",
+    ),
     path(
         "dashboard/server-stats/",
         api_views.ServerStatsView.as_view(),
         name="dashboard_server_stats",
     ),
+    path(
+        "dashboard/server-stats/history/",
+        api_views.ServerStatsHistoryView.as_view(),
+        name="dashboard_server_stats_history",
+    ),
 ]
@@ -10,24 +10,54 @@ Provides real-time metrics for laboratory management including:
 - Server stats (admin-only: CPU, RAM, disk, I/O, Docker)
 """
 
-from datetime import timedelta
+import hashlib
+from datetime import datetime, time, timedelta
 from typing import Dict, List
 
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.core.cache import cache
-from django.db.models import Count, Q
-from django.http import JsonResponse
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.db.models import (
+    Avg,
+    CharField,
+    Count,
+    F,
+    Max,
+    Min,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import TruncDate
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
 from django.views import View
 
+from pages import dashboard_cache, live_events
+from pages.models import AlertRule, DailyMetricsRollup
+from protocols.db_functions import DaysBetween, PercentileCont
 from protocols.models import (
     Cassette,
     Protocol,
-    Report,
     Slide,
 )
 
+User = get_user_model()
+
+
+def has_management_access(user) -> bool:
+    """Lab staff, histopathologists and admins see the management dashboard."""
+    return user.is_authenticated and (
+        user.is_lab_staff or user.is_histopathologist or user.is_admin_user
+    )
+
 
 class ManagementDashboardRequiredMixin(UserPassesTestMixin):
     """
@@ -38,10 +68,7 @@ class ManagementDashboardRequiredMixin(UserPassesTestMixin):
 
     def test_func(self):
         """Check if user has management access."""
-        user = self.request.user
-        return user.is_authenticated and (
-            user.is_lab_staff or user.is_histopathologist or user.is_admin_user
-        )
+        return has_management_access(self.request.user)
 
 
 class AdminDashboardRequiredMixin(UserPassesTestMixin):
@@ -67,13 +94,7 @@ class DashboardWIPView(
     def get(self, request, *args, **kwargs):
         """Return WIP metrics by stage for both analysis types."""
         try:
-            # Cache WIP data for 2 minutes to reduce database load
-            cache_key = "dashboard_wip_metrics"
-            wip_data = cache.get(cache_key)
-
-            if wip_data is None:
-                wip_data = self._calculate_wip_metrics()
-                cache.set(cache_key, wip_data, 120)  # Cache for 2 minutes
+            wip_data = dashboard_cache.get_or_compute("dashboard_wip_metrics")
 
             return render(
                 request,
@@ -91,21 +112,26 @@ class DashboardWIPView(
                 {"error": f"Error calculating WIP metrics: {str(e)}"},
             )
 
+    # Statuses and stages shown on the WIP board. The cassette and slide
+    # filters match the partial indexes on their estado columns.
+    WIP_PROTOCOL_STATUSES = [
+        Protocol.Status.SUBMITTED,
+        Protocol.Status.RECEIVED,
+        Protocol.Status.PROCESSING,
+        Protocol.Status.READY,
+    ]
+    WIP_CASSETTE_STAGES = {
+        Cassette.Status.PENDIENTE: "encasetado",
+        Cassette.Status.EN_PROCESO: "fijacion",
+    }
+    WIP_SLIDE_STAGES = {
+        Slide.Status.MONTADO: "corte",
+        Slide.Status.COLOREADO: "coloracion",
+    }
+
     def _calculate_wip_metrics(self) -> Dict:
-        """Calculate WIP metrics for both analysis types."""
-        # Get protocols by status and type
-        protocols_by_status = (
-            Protocol.objects.filter(
-                status__in=[
-                    Protocol.Status.SUBMITTED,
-                    Protocol.Status.RECEIVED,
-                    Protocol.Status.PROCESSING,
-                    Protocol.Status.READY,
-                ]
-            )
-            .values("analysis_type", "status")
-            .annotate(count=Count("id"))
-        )
+        """Calculate WIP metrics for both analysis types in one query."""
+        rows = self._wip_counts_queryset()
 
         # Initialize structure
         wip_data = {
@@ -140,80 +166,66 @@ class DashboardWIPView(
             Protocol.Status.RECEIVED: "recibido",
             Protocol.Status.PROCESSING: "procesando",
             Protocol.Status.READY: "listo_diagnostico",
-            Protocol.Status.REPORT_SENT: "informe_borrador",
         }
+        processing_stages = wip_data["histopatologia"]["procesando"]
 
-        # Populate basic counts
-        for item in protocols_by_status:
-            tipo = item["analysis_type"]
-            status = item["status"]
+        for item in rows:
+            source = item["source"]
+            state = item["state"]
             count = item["count"]
 
-            if status in status_mapping:
-                stage = status_mapping[status]
-                if tipo == "histopathology":
-                    if stage == "procesando":
-                        # For histopathology, we need to get detailed processing stages
-                        wip_data["histopatologia"][stage] = (
-                            self._get_histopathology_processing_stages()
-                        )
-                    else:
-                        wip_data["histopatologia"][stage] = count
-                else:  # cytology
-                    wip_data["citologia"][stage] = count
-
-        # Get additional processing stage details for histopathology
-        wip_data["histopatologia"]["procesando"] = (
-            self._get_histopathology_processing_stages()
-        )
+            if source == "cassette":
+                processing_stages[self.WIP_CASSETTE_STAGES[state]] += count
+            elif source == "slide":
+                processing_stages[self.WIP_SLIDE_STAGES[state]] += count
+            elif item["kind"] == "histopathology":
+                # Histopathology processing is broken down by cassette and
+                # slide stage instead of the protocol count
+                if status_mapping[state] != "procesando":
+                    wip_data["histopatologia"][status_mapping[state]] = count
+            else:  # cytology
+                wip_data["citologia"][status_mapping[state]] = count
 
         return wip_data
 
-    def _get_histopathology_processing_stages(self) -> Dict:
-        """Get detailed processing stages for histopathology."""
-        # Get cassettes by processing stage
-        cassette_stages = (
-            Cassette.objects.filter(
-                estado__in=[
-                    Cassette.Status.PENDIENTE,
-                    Cassette.Status.EN_PROCESO,
-                    Cassette.Status.COMPLETADO,
-                ]
-            )
-            .values("estado")
+    def _wip_counts_queryset(self):
+        """
+        Grouped counts for protocols, cassettes and slides as one UNION ALL.
+
+        Every branch yields (source, kind, state, count) rows; kind is the
+        protocol analysis type and empty for cassettes and slides.
+        """
+        protocol_counts = (
+            Protocol.objects.filter(status__in=self.WIP_PROTOCOL_STATUSES)
+            .values(
+                source=Value("protocol", output_field=CharField()),
+                kind=F("analysis_type"),
+                state=F("status"),
+            )
             .annotate(count=Count("id"))
+            .order_by()
         )
-
-        # Get slides by processing stage
-        slide_stages = (
-            Slide.objects.filter(
-                estado__in=[
-                    Slide.Status.PENDIENTE,
-                    Slide.Status.MONTADO,
-                    Slide.Status.COLOREADO,
-                    Slide.Status.LISTO,
-                ]
-            )
-            .values("estado")
+        cassette_counts = (
+            Cassette.objects.filter(estado__in=self.WIP_CASSETTE_STAGES)
+            .values(
+                source=Value("cassette", output_field=CharField()),
+                kind=Value("", output_field=CharField()),
+                state=F("estado"),
+            )
             .annotate(count=Count("id"))
+            .order_by()
         )
-
-        stages = {"encasetado": 0, "fijacion": 0, "corte": 0, "coloracion": 0}
-
-        # Map cassette and slide statuses to processing stages
-        for item in cassette_stages:
-            if item["estado"] == Cassette.Status.PENDIENTE:
-                stages["encasetado"] += item["count"]
-            elif item["estado"] == Cassette.Status.EN_PROCESO:
-                stages["fijacion"] += item["count"]
-
-        for item in slide_stages:
-            if item["estado"] == Slide.Status.MONTADO:
-                stages["corte"] += item["count"]
-            elif item["estado"] == Slide.Status.COLOREADO:
-                stages["coloracion"] += item["count"]
-
-        return stages
+        slide_counts = (
+            Slide.objects.filter(estado__in=self.WIP_SLIDE_STAGES)
+            .values(
+                source=Value("slide", output_field=CharField()),
+                kind=Value("", output_field=CharField()),
+                state=F("estado"),
+            )
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        return protocol_counts.union(cassette_counts, slide_counts, all=True)
 
 
 class DashboardVolumeView(
@@ -231,13 +243,9 @@ class DashboardVolumeView(
             periodo = request.GET.get("periodo", "mes")
             tipo = request.GET.get("tipo", "ambos")
 
-            # Cache volume data for 5 minutes (less frequently changing)
-            cache_key = f"dashboard_volume_metrics_{periodo}_{tipo}"
-            volume_data = cache.get(cache_key)
-
-            if volume_data is None:
-                volume_data = self._calculate_volume_metrics(periodo, tipo)
-                cache.set(cache_key, volume_data, 300)  # Cache for 5 minutes
+            volume_data = dashboard_cache.get_or_compute(
+                "dashboard_volume_metrics", periodo, tipo
+            )
 
             return render(request, "pages/api/volume_widget.html", volume_data)
         except Exception as e:
@@ -248,7 +256,7 @@ class DashboardVolumeView(
             )
 
     def _calculate_volume_metrics(self, periodo: str, tipo: str) -> Dict:
-        """Calculate volume metrics for specified period and type."""
+        """Calculate volume metrics for specified period and type from rollups."""
         now = timezone.now()
 
         # Calculate date range based on period
@@ -269,51 +277,24 @@ class DashboardVolumeView(
             date_from = now - timedelta(days=30)
             date_to = now
 
-        # Build query filters
-        protocol_filter = Q(submission_date__gte=date_from.date())
-        report_filter = Q(
-            updated_at__gte=date_from, status=Report.Status.FINALIZED
-        )
-
+        # Read pre-aggregated daily counters (see DailyMetricsRollup)
+        rollup_filter = Q(date__gte=date_from.date(), date__lte=date_to.date())
         if tipo != "ambos":
-            protocol_filter &= Q(analysis_type=tipo)
-            report_filter &= Q(protocol__analysis_type=tipo)
-
-        # OPTIMIZED: Single query to get both protocol and report counts
-        # Use UNION to combine protocol and report data
-        from django.db.models import CharField, F, Value
-
-        protocol_counts = (
-            Protocol.objects.filter(protocol_filter)
+            rollup_filter &= Q(analysis_type=tipo)
+
+        combined_data = {
+            item["analysis_type"]: {
+                "protocols": item["protocols"] or 0,
+                "reports": item["reports"] or 0,
+            }
+            for item in DailyMetricsRollup.objects.filter(rollup_filter)
             .values("analysis_type")
             .annotate(
-                count=Count("id"),
-                data_type=Value("protocol", output_field=CharField()),
-            )
-        )
-
-        report_counts = (
-            Report.objects.filter(report_filter)
-            .values(analysis_type=F("protocol__analysis_type"))
-            .annotate(
-                count=Count("id"),
-                data_type=Value("report", output_field=CharField()),
+                protocols=Sum("protocols_received"),
+                reports=Sum("reports_finalized"),
             )
-        )
-
-        # Combine the results
-        combined_data = {}
-        for item in protocol_counts:
-            analysis_type = item["analysis_type"]
-            if analysis_type not in combined_data:
-                combined_data[analysis_type] = {"protocols": 0, "reports": 0}
-            combined_data[analysis_type]["protocols"] = item["count"]
-
-        for item in report_counts:
-            analysis_type = item["analysis_type"]
-            if analysis_type not in combined_data:
-                combined_data[analysis_type] = {"protocols": 0, "reports": 0}
-            combined_data[analysis_type]["reports"] = item["count"]
+            .order_by()
+        }
 
         # Initialize result structure
         result = {
@@ -368,92 +349,96 @@ class DashboardTATView(
     Get turnaround time metrics.
 
     GET /api/dashboard/tat
+    GET /api/dashboard/tat?format=json
     """
 
     def get(self, request, *args, **kwargs):
         """Return TAT metrics for both analysis types."""
+        as_json = request.GET.get("format") == "json"
         try:
-            # Cache TAT data for 3 minutes (moderate frequency)
-            cache_key = "dashboard_tat_metrics"
-            tat_data = cache.get(cache_key)
-
-            if tat_data is None:
-                tat_data = self._calculate_tat_metrics()
-                cache.set(cache_key, tat_data, 180)  # Cache for 3 minutes
+            tat_data = dashboard_cache.get_or_compute("dashboard_tat_metrics")
 
+            if as_json:
+                return JsonResponse(tat_data)
             return render(request, "pages/api/tat_widget.html", tat_data)
         except Exception as e:
+            if as_json:
+                return JsonResponse(
+                    {"error": f"Error calculating TAT metrics: {str(e)}"},
+                    status=500,
+                )
             return render(
                 request,
                 "pages/api/tat_widget.html",
                 {"error": f"Error calculating TAT metrics: {str(e)}"},
             )
 
-    def _calculate_tat_metrics(self) -> Dict:
-        """Calculate TAT metrics for both analysis types - OPTIMIZED VERSION."""
-        from django.db.models import (
-            Avg,
-            Case,
-            Count,
-            F,
-            IntegerField,
-            Max,
-            Min,
-            When,
-        )
+    # Percentiles reported by the widget, keyed by result field
+    TAT_PERCENTILES = {
+        "tat_mediana_dias": 0.5,
+        "tat_p90_dias": 0.9,
+        "tat_p95_dias": 0.95,
+    }
 
-        # Get completed reports from last 30 days
+    def _calculate_tat_metrics(self) -> Dict:
+        """
+        Calculate TAT metrics for both analysis types.
+
+        TAT runs from received_at to finalized_at, both stamped once on the
+        protocol, so later report edits do not move it. Count, average,
+        extremes, on-target share and the p50/p90/p95 percentiles come from
+        a single grouped query over protocols, served by the partial
+        (finalized_at, analysis_type, received_at) index; on PostgreSQL the
+        percentiles use percentile_cont so no TAT values leave the database.
+        """
+        # Protocols whose report was finalized in the last 30 days
         thirty_days_ago = timezone.now() - timedelta(days=30)
 
-        # OPTIMIZED: Use database aggregation instead of Python loops
-        tat_data = (
-            Report.objects.filter(
-                status=Report.Status.FINALIZED,
-                updated_at__gte=thirty_days_ago,
-                protocol__reception_date__isnull=False,
-            )
-            .annotate(
-                tat_days=Case(
-                    When(
-                        protocol__reception_date__isnull=False,
-                        then=F("updated_at__date")
-                        - F("protocol__reception_date"),
-                    ),
-                    default=0,
-                    output_field=IntegerField(),
-                )
-            )
-            .values("protocol__analysis_type")
-            .annotate(
-                count=Count("id"),
-                avg_tat=Avg("tat_days"),
-                min_tat=Min("tat_days"),
-                max_tat=Max("tat_days"),
-                within_target_7=Count("id", filter=Q(tat_days__lte=7)),
-                within_target_3=Count("id", filter=Q(tat_days__lte=3)),
+        finalized = Protocol.objects.filter(
+            finalized_at__gte=thirty_days_ago,
+            received_at__isnull=False,
+        ).annotate(
+            tat_days=DaysBetween(
+                TruncDate("finalized_at"), TruncDate("received_at")
             )
         )
 
+        aggregates = {
+            "count": Count("id"),
+            "avg_tat": Avg("tat_days"),
+            "min_tat": Min("tat_days"),
+            "max_tat": Max("tat_days"),
+            "within_target_7": Count("id", filter=Q(tat_days__lte=7)),
+            "within_target_3": Count("id", filter=Q(tat_days__lte=3)),
+        }
+        in_database_percentiles = connection.vendor == "postgresql"
+        if in_database_percentiles:
+            for field, fraction in self.TAT_PERCENTILES.items():
+                aggregates[field] = PercentileCont("tat_days", fraction)
+
+        tat_data = (
+            finalized.values("analysis_type").annotate(**aggregates).order_by()
+        )
+        if not in_database_percentiles:
+            tat_data = self._with_python_percentiles(list(tat_data), finalized)
+
+        empty_metrics = {
+            "tat_promedio_dias": 0.0,
+            "tat_mediana_dias": 0,
+            "tat_p90_dias": 0,
+            "tat_p95_dias": 0,
+            "tat_minimo_dias": 0,
+            "tat_maximo_dias": 0,
+            "dentro_objetivo": 0,
+        }
         result = {
-            "histopatologia": {
-                "tat_promedio_dias": 0.0,
-                "tat_mediana_dias": 0,
-                "tat_minimo_dias": 0,
-                "tat_maximo_dias": 0,
-                "dentro_objetivo": 0,
-            },
-            "citologia": {
-                "tat_promedio_dias": 0.0,
-                "tat_mediana_dias": 0,
-                "tat_minimo_dias": 0,
-                "tat_maximo_dias": 0,
-                "dentro_objetivo": 0,
-            },
+            "histopatologia": dict(empty_metrics),
+            "citologia": dict(empty_metrics),
         }
 
         # Process aggregated results
         for item in tat_data:
-            analysis_type = item["protocol__analysis_type"]
+            analysis_type = item["analysis_type"]
             count = item["count"]
 
             if count == 0:
@@ -480,39 +465,43 @@ class DashboardTATView(
             result[result_key]["dentro_objetivo"] = round(
                 (within_target_count / count) * 100 if count > 0 else 0
             )
+            for field in self.TAT_PERCENTILES:
+                result[result_key][field] = round(item[field] or 0, 1)
 
-            # For median, we need a separate query (database limitation)
-            # This is still much better than loading all reports into memory
-            median_reports = (
-                Report.objects.filter(
-                    status=Report.Status.FINALIZED,
-                    updated_at__gte=thirty_days_ago,
-                    protocol__reception_date__isnull=False,
-                    protocol__analysis_type=analysis_type,
-                )
-                .annotate(
-                    tat_days=Case(
-                        When(
-                            protocol__reception_date__isnull=False,
-                            then=F("updated_at__date")
-                            - F("protocol__reception_date"),
-                        ),
-                        default=0,
-                        output_field=IntegerField(),
-                    )
-                )
-                .values_list("tat_days", flat=True)
-                .order_by("tat_days")
-            )
+        return result
 
-            if median_reports:
-                median_list = list(median_reports)
-                n = len(median_list)
-                result[result_key]["tat_mediana_dias"] = (
-                    median_list[n // 2] if n > 0 else 0
-                )
+    def _with_python_percentiles(self, tat_data: List[Dict], finalized):
+        """
+        Fill the percentile fields for backends without percentile_cont.
 
-        return result
+        Used by the SQLite development/test database only; interpolates
+        like percentile_cont from one ordered scan of the TAT values.
+        """
+        values_by_type = {}
+        for analysis_type, tat_days in finalized.values_list(
+            "analysis_type", "tat_days"
+        ).order_by("tat_days"):
+            values_by_type.setdefault(analysis_type, []).append(tat_days)
+
+        for item in tat_data:
+            values = values_by_type.get(item["analysis_type"], [])
+            for field, fraction in self.TAT_PERCENTILES.items():
+                item[field] = self._interpolate_percentile(values, fraction)
+        return tat_data
+
+    @staticmethod
+    def _interpolate_percentile(sorted_values: List[int], fraction: float):
+        """Linear interpolation matching PostgreSQL percentile_cont."""
+        if not sorted_values:
+            return None
+        position = fraction * (len(sorted_values) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(sorted_values) - 1)
+        weight = position - lower
+        return (
+            sorted_values[lower]
+            + (sorted_values[upper] - sorted_values[lower]) * weight
+        )
 
 
 class DashboardProductivityView(
@@ -529,17 +518,9 @@ class DashboardProductivityView(
         try:
             periodo = request.GET.get("periodo", "mes")
 
-            # Cache productivity data for 3 minutes (moderate frequency)
-            cache_key = f"dashboard_productivity_metrics_{periodo}"
-            productivity_data = cache.get(cache_key)
-
-            if productivity_data is None:
-                productivity_data = self._calculate_productivity_metrics(
-                    periodo
-                )
-                cache.set(
-                    cache_key, productivity_data, 180
-                )  # Cache for 3 minutes
+            productivity_data = dashboard_cache.get_or_compute(
+                "dashboard_productivity_metrics", periodo
+            )
 
             return render(
                 request,
@@ -554,9 +535,7 @@ class DashboardProductivityView(
             )
 
     def _calculate_productivity_metrics(self, periodo: str) -> Dict:
-        """Calculate productivity metrics per histopathologist - OPTIMIZED VERSION."""
-        from django.db.models import Avg, Case, F, IntegerField, When
-
+        """Calculate productivity metrics per histopathologist from rollups."""
         now = timezone.now()
 
         # Calculate date range based on period
@@ -573,35 +552,24 @@ class DashboardProductivityView(
         else:
             date_from = now - timedelta(days=30)
 
-        # SINGLE OPTIMIZED QUERY - eliminates N+1 problem
-        # This replaces the loop that was causing N+1 queries
+        # Read pre-aggregated daily counters (see DailyMetricsRollup)
         histopathologist_data = (
-            Report.objects.filter(
-                status=Report.Status.FINALIZED,
-                updated_at__gte=date_from,
-                histopathologist__user__is_histopathologist=True,
+            DailyMetricsRollup.objects.filter(
+                date__gte=date_from.date(),
+                histopathologist__user__role=User.Role.HISTOPATOLOGO,
                 histopathologist__user__is_active=True,
             )
-            .select_related("histopathologist__user", "protocol")
             .values(
                 "histopathologist__user__first_name",
                 "histopathologist__user__last_name",
                 "histopathologist__user__email",
             )
             .annotate(
-                informes_enviados=Count("id"),
-                tat_promedio_dias=Avg(
-                    Case(
-                        When(
-                            protocol__reception_date__isnull=False,
-                            then=F("updated_at__date")
-                            - F("protocol__reception_date"),
-                        ),
-                        default=0,
-                        output_field=IntegerField(),
-                    )
-                ),
+                informes_enviados=Sum("reports_finalized"),
+                tat_reports=Sum("tat_reports"),
+                tat_days_total=Sum("tat_days_total"),
             )
+            .filter(informes_enviados__gt=0)
             .order_by("-informes_enviados")
         )
 
@@ -627,8 +595,10 @@ class DashboardProductivityView(
                         item["informes_enviados"] / weeks, 2
                     ),
                     "tat_promedio_dias": round(
-                        item["tat_promedio_dias"] or 0, 1
-                    ),
+                        item["tat_days_total"] / item["tat_reports"], 1
+                    )
+                    if item["tat_reports"]
+                    else 0.0,
                 }
             )
 
@@ -651,13 +621,9 @@ class DashboardAgingView(
     def get(self, request, *args, **kwargs):
         """Return sample aging metrics and overdue samples."""
         try:
-            # Cache aging data for 1 minute (most frequently changing)
-            cache_key = "dashboard_aging_metrics"
-            aging_data = cache.get(cache_key)
-
-            if aging_data is None:
-                aging_data = self._calculate_aging_metrics()
-                cache.set(cache_key, aging_data, 60)  # Cache for 1 minute
+            aging_data = dashboard_cache.get_or_compute(
+                "dashboard_aging_metrics"
+            )
 
             return render(request, "pages/api/aging_widget.html", aging_data)
         except Exception as e:
@@ -667,20 +633,70 @@ class DashboardAgingView(
                 {"error": f"Error calculating aging metrics: {str(e)}"},
             )
 
+    AGING_STATUSES = [
+        Protocol.Status.RECEIVED,
+        Protocol.Status.PROCESSING,
+        Protocol.Status.READY,
+    ]
+
     def _calculate_aging_metrics(self) -> Dict:
-        """Calculate sample aging metrics and identify overdue samples - OPTIMIZED VERSION."""
-        now = timezone.now().date()
-
-        # OPTIMIZED: Single query to get all active protocols with related data
-        # This is much more efficient than the original loop approach
-        active_protocols = (
-            Protocol.objects.filter(
-                status__in=[
-                    Protocol.Status.RECEIVED,
-                    Protocol.Status.PROCESSING,
-                    Protocol.Status.READY,
-                ],
-                reception_date__isnull=False,
+        """
+        Calculate sample aging buckets and the top 10 overdue samples.
+
+        Buckets are one conditional aggregate; the overdue list is an
+        ORDER BY received_at LIMIT 10 served by the (status, received_at)
+        index, so neither grows with the active backlog.
+        Day boundaries are compared as datetimes so the index stays usable.
+        """
+        today = timezone.localdate()
+
+        def received_before(days_ago: int):
+            """Start of the local day `days_ago` days before today."""
+            return timezone.make_aware(
+                datetime.combine(today - timedelta(days=days_ago), time.min)
+            )
+
+        active_protocols = Protocol.objects.filter(
+            status__in=self.AGING_STATUSES,
+            received_at__isnull=False,
+        )
+
+        buckets = active_protocols.aggregate(
+            b0_3=Count("id", filter=Q(received_at__gte=received_before(3))),
+            b4_7=Count(
+                "id",
+                filter=Q(
+                    received_at__gte=received_before(7),
+                    received_at__lt=received_before(3),
+                ),
+            ),
+            b8_14=Count(
+                "id",
+                filter=Q(
+                    received_at__gte=received_before(14),
+                    received_at__lt=received_before(7),
+                ),
+            ),
+            b15=Count("id", filter=Q(received_at__lt=received_before(14))),
+        )
+        aging_buckets = {
+            "0_3_dias": buckets["b0_3"],
+            "4_7_dias": buckets["b4_7"],
+            "8_14_dias": buckets["b8_14"],
+            "mas_14_dias": buckets["b15"],
+        }
+
+        # Beyond target TAT: 7 days for histopathology, 3 for cytology
+        overdue = (
+            active_protocols.filter(
+                Q(
+                    analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+                    received_at__lt=received_before(7),
+                )
+                | Q(
+                    analysis_type=Protocol.AnalysisType.CYTOLOGY,
+                    received_at__lt=received_before(3),
+                )
             )
             .select_related("veterinarian__user")
             .only(
@@ -688,73 +704,41 @@ class DashboardAgingView(
                 "animal_identification",
                 "species",
                 "status",
-                "reception_date",
-                "analysis_type",
+                "received_at",
                 "veterinarian__user__first_name",
                 "veterinarian__user__last_name",
                 "veterinarian__user__email",
             )
+            .order_by("received_at")[:10]
         )
 
-        # Initialize buckets
-        aging_buckets = {
-            "0_3_dias": 0,
-            "4_7_dias": 0,
-            "8_14_dias": 0,
-            "mas_14_dias": 0,
-        }
-
         overdue_protocols = []
+        for protocol in overdue:
+            days_since_reception = (
+                today - timezone.localtime(protocol.received_at).date()
+            ).days
+
+            # Build veterinarian name
+            first_name = protocol.veterinarian.user.first_name or ""
+            last_name = protocol.veterinarian.user.last_name or ""
+            vet_name = (
+                f"{first_name} {last_name}".strip()
+                or protocol.veterinarian.user.email
+            )
 
-        # Process protocols in Python (still much faster than original approach)
-        for protocol in active_protocols:
-            reception_date = protocol.reception_date
-            if hasattr(reception_date, "date"):
-                reception_date = reception_date.date()
-
-            days_since_reception = (now - reception_date).days
-
-            # Categorize by age
-            if days_since_reception <= 3:
-                aging_buckets["0_3_dias"] += 1
-            elif days_since_reception <= 7:
-                aging_buckets["4_7_dias"] += 1
-            elif days_since_reception <= 14:
-                aging_buckets["8_14_dias"] += 1
-            else:
-                aging_buckets["mas_14_dias"] += 1
-
-            # Identify overdue samples (beyond target TAT)
-            target_days = (
-                7 if protocol.analysis_type == "histopathology" else 3
-            )
-            if days_since_reception > target_days:
-                # Build veterinarian name
-                first_name = protocol.veterinarian.user.first_name or ""
-                last_name = protocol.veterinarian.user.last_name or ""
-                vet_name = (
-                    f"{first_name} {last_name}".strip()
-                    or protocol.veterinarian.user.email
-                )
-
-                overdue_protocols.append(
-                    {
-                        "protocolo_numero": protocol.protocol_number,
-                        "animal": f"{protocol.animal_identification} - {protocol.species}",
-                        "dias_desde_recepcion": days_since_reception,
-                        "estado": protocol.get_status_display(),
-                        "veterinario": vet_name,
-                    }
-                )
-
-        # Sort overdue protocols by days (most overdue first)
-        overdue_protocols.sort(
-            key=lambda x: x["dias_desde_recepcion"], reverse=True
-        )
+            overdue_protocols.append(
+                {
+                    "protocolo_numero": protocol.protocol_number,
+                    "animal": f"{protocol.animal_identification} - {protocol.species}",
+                    "dias_desde_recepcion": days_since_reception,
+                    "estado": protocol.get_status_display(),
+                    "veterinario": vet_name,
+                }
+            )
 
         return {
             "por_rango": aging_buckets,
-            "protocolos_vencidos": overdue_protocols[:10],  # Limit to top 10
+            "protocolos_vencidos": overdue_protocols,
         }
 
 
@@ -764,19 +748,16 @@ class DashboardAlertsView(
     """
     Get system alerts for overdue samples and bottlenecks.
 
-    GET /api/dashboard/alerts
+    Alerts come from the configurable AlertRule table (see pages.tasks
+    evaluate_alert_rules). GET /api/dashboard/alerts
     """
 
     def get(self, request, *args, **kwargs):
         """Return system alerts and bottlenecks."""
         try:
-            # Cache alerts data for 2 minutes (moderate frequency)
-            cache_key = "dashboard_alerts_metrics"
-            alerts_data = cache.get(cache_key)
-
-            if alerts_data is None:
-                alerts_data = self._calculate_alerts()
-                cache.set(cache_key, alerts_data, 120)  # Cache for 2 minutes
+            alerts_data = dashboard_cache.get_or_compute(
+                "dashboard_alerts_metrics"
+            )
 
             return render(request, "pages/api/alerts_widget.html", alerts_data)
         except Exception as e:
@@ -787,111 +768,185 @@ class DashboardAlertsView(
             )
 
     def _calculate_alerts(self) -> Dict:
-        """Calculate system alerts and bottlenecks."""
-        alerts = []
-
-        # Check for TAT exceeded alerts
-        tat_alerts = self._check_tat_alerts()
-        if tat_alerts:
-            alerts.extend(tat_alerts)
-
-        # Check for bottleneck alerts
-        bottleneck_alerts = self._check_bottleneck_alerts()
-        if bottleneck_alerts:
-            alerts.extend(bottleneck_alerts)
-
-        return {"alerts": alerts}
-
-    def _check_tat_alerts(self) -> List[Dict]:
-        """Check for protocols exceeding target TAT."""
-        now = timezone.now().date()
-        alerts = []
-
-        # Get overdue protocols
-        overdue_protocols = Protocol.objects.filter(
-            status__in=[
-                Protocol.Status.RECEIVED,
-                Protocol.Status.PROCESSING,
-                Protocol.Status.READY,
-                Protocol.Status.REPORT_DRAFT,
-            ],
-            reception_date__isnull=False,
-        ).select_related("veterinarian__user")
-
-        histo_overdue = []
-        cyto_overdue = []
-
-        for protocol in overdue_protocols:
-            days_since_reception = (now - protocol.reception_date).days
-            target_days = (
-                7 if protocol.analysis_type == "histopathology" else 3
-            )
-
-            if days_since_reception > target_days:
-                if protocol.analysis_type == "histopathology":
-                    histo_overdue.append(protocol.protocol_number)
-                else:
-                    cyto_overdue.append(protocol.protocol_number)
-
-        # Create alerts for each type
-        if histo_overdue:
-            alerts.append(
-                {
-                    "tipo": "tat_excedido",
-                    "severidad": "alta",
-                    "mensaje": f"{len(histo_overdue)} protocolos de histopatología exceden TAT objetivo",
-                    "protocolos": histo_overdue[:5],  # Limit to 5
-                }
-            )
+        """
+        Read the alerts stored by the last rule evaluation.
+
+        Rules are evaluated periodically by the evaluate_alert_rules task,
+        so this is a single read of the triggered rules.
+        """
+        rules = AlertRule.objects.filter(
+            is_active=True, last_count__gt=F("threshold")
+        )
+        return {"alerts": [rule.as_alert() for rule in rules]}
 
-        if cyto_overdue:
-            alerts.append(
-                {
-                    "tipo": "tat_excedido",
-                    "severidad": "alta",
-                    "mensaje": f"{len(cyto_overdue)} protocolos de citología exceden TAT objetivo",
-                    "protocolos": cyto_overdue[:5],  # Limit to 5
-                }
-            )
 
-        return alerts
+# Cached widget calculators (see pages.dashboard_cache.get_or_compute)
+dashboard_cache.register(
+    "dashboard_wip_metrics",
+    [dashboard_cache.WIP],
+    lambda: DashboardWIPView()._calculate_wip_metrics(),
+)
+dashboard_cache.register(
+    "dashboard_volume_metrics",
+    [dashboard_cache.VOLUME],
+    lambda periodo, tipo: DashboardVolumeView()._calculate_volume_metrics(
+        periodo, tipo
+    ),
+)
+dashboard_cache.register(
+    "dashboard_tat_metrics",
+    [dashboard_cache.TAT],
+    lambda: DashboardTATView()._calculate_tat_metrics(),
+)
+dashboard_cache.register(
+    "dashboard_productivity_metrics",
+    [dashboard_cache.PRODUCTIVITY],
+    lambda periodo: (
+        DashboardProductivityView()._calculate_productivity_metrics(periodo)
+    ),
+)
+dashboard_cache.register(
+    "dashboard_aging_metrics",
+    [dashboard_cache.AGING],
+    lambda: DashboardAgingView()._calculate_aging_metrics(),
+)
+dashboard_cache.register(
+    "dashboard_alerts_metrics",
+    [dashboard_cache.ALERTS],
+    lambda: DashboardAlertsView()._calculate_alerts(),
+)
 
-    def _check_bottleneck_alerts(self) -> List[Dict]:
-        """Check for processing bottlenecks."""
-        alerts = []
 
-        # Check for samples waiting for diagnosis
-        ready_for_diagnosis = Protocol.objects.filter(
-            status=Protocol.Status.READY
-        ).count()
+class DashboardBatchView(
+    LoginRequiredMixin, ManagementDashboardRequiredMixin, View
+):
+    """
+    Get every management dashboard widget in one response.
 
-        if ready_for_diagnosis > 5:
-            alerts.append(
-                {
-                    "tipo": "cuello_botella",
-                    "severidad": "media",
-                    "mensaje": f"{ready_for_diagnosis} muestras esperando diagnóstico",
-                    "etapa": "listo_diagnostico",
-                }
-            )
+    GET /api/dashboard/all/?volumen_periodo=mes&volumen_tipo=ambos
+        &productividad_periodo=mes
 
-        # Check for samples in processing for too long
-        long_processing = Protocol.objects.filter(
-            status=Protocol.Status.PROCESSING,
-            updated_at__lt=timezone.now() - timedelta(days=3),
-        ).count()
+    Each widget fragment is wrapped for an HTMX out-of-band swap into its
+    container. All cached payloads are read with one cache round-trip and
+    only the misses are computed. The ETag is derived from the versioned
+    cache keys, so a poll with nothing invalidated gets a 304 without
+    reading any payload.
+    """
+
+    # (container id, widget template, dashboard_cache entry)
+    WIDGETS = [
+        ("wip-content", "pages/api/wip_widget.html", "dashboard_wip_metrics"),
+        (
+            "volume-content",
+            "pages/api/volume_widget.html",
+            "dashboard_volume_metrics",
+        ),
+        ("tat-content", "pages/api/tat_widget.html", "dashboard_tat_metrics"),
+        (
+            "productivity-content",
+            "pages/api/productivity_widget.html",
+            "dashboard_productivity_metrics",
+        ),
+        (
+            "aging-content",
+            "pages/api/aging_widget.html",
+            "dashboard_aging_metrics",
+        ),
+        (
+            "alerts-content",
+            "pages/api/alerts_widget.html",
+            "dashboard_alerts_metrics",
+        ),
+    ]
 
-        if long_processing > 3:
-            alerts.append(
+    def get(self, request, *args, **kwargs):
+        """Return all widget fragments, or 304 if none changed."""
+        entries = self._entries(request)
+        keys = dashboard_cache.versioned_keys(entries)
+        etag = self._etag(keys)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        results = dashboard_cache.get_or_compute_many(entries, keys)
+        fragments = []
+        for (target, template, name), (data, outcome) in zip(
+            self.WIDGETS, results
+        ):
+            if outcome == dashboard_cache.ERROR:
+                context = {"error": f"Error calculating {name}: {str(data)}"}
+            else:
+                context = dict(data)
+                context["timestamp"] = timezone.now().isoformat()
+            fragments.append(
                 {
-                    "tipo": "cuello_botella",
-                    "severidad": "media",
-                    "mensaje": f"{long_processing} muestras en procesamiento por más de 3 días",
-                    "etapa": "procesamiento",
+                    "target": target,
+                    "html": render_to_string(template, context, request),
                 }
             )
 
-        return alerts
+        response = render(
+            request, "pages/api/dashboard_batch.html", {"fragments": fragments}
+        )
+        patch_cache_control(response, private=True, no_cache=True)
+
+        outcomes = {outcome for _data, outcome in results}
+        if dashboard_cache.ERROR in outcomes:
+            return response
+        if dashboard_cache.STALE in outcomes:
+            # Stale payloads must not be revalidated as current ones
+            etag = self._etag(keys, stale=True)
+        response.headers["ETag"] = etag
+        return response
+
+    def _entries(self, request):
+        """Cache entries of each widget, in WIDGETS order."""
+        volumen_periodo = request.GET.get("volumen_periodo", "mes")
+        volumen_tipo = request.GET.get("volumen_tipo", "ambos")
+        productividad_periodo = request.GET.get("productividad_periodo", "mes")
+        parts = {
+            "dashboard_volume_metrics": (volumen_periodo, volumen_tipo),
+            "dashboard_productivity_metrics": (productividad_periodo,),
+        }
+        return [(name, parts.get(name, ())) for _t, _tpl, name in self.WIDGETS]
+
+    @staticmethod
+    def _etag(keys: List[str], stale: bool = False) -> str:
+        digest = hashlib.md5(
+            "|".join(keys).encode(), usedforsecurity=False
+        ).hexdigest()
+        return f'W/"{digest}{"-stale" if stale else ""}"'
+
+
+async def dashboard_events(request):
+    """
+    Stream "metric family changed" events for the management dashboard.
+
+    GET /api/dashboard/events/ (text/event-stream)
+
+    Clients re-fetch only the widgets of the families announced. Only
+    served under ASGI (see pages.live_events); a WSGI request gets 204,
+    which tells EventSource not to reconnect.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if not has_management_access(user):
+        raise PermissionDenied
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        live_events.event_stream(
+            last_event_id=request.headers.get("Last-Event-ID"),
+        ),
+        content_type="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # Let nginx pass events through as they are written
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 class ServerStatsView(LoginRequiredMixin, AdminDashboardRequiredMixin, View):
@@ -913,3 +968,64 @@ class ServerStatsView(LoginRequiredMixin, AdminDashboardRequiredMixin, View):
                 status=503,
             )
         return JsonResponse(snapshot.payload)
+
+
+class ServerStatsHistoryView(
+    LoginRequiredMixin, AdminDashboardRequiredMixin, View
+):
+    """
+    Get server stats history for trend charts.
+
+    Admin-only. GET /api/dashboard/server-stats/history/
+        ?desde=<ISO datetime>&hasta=<ISO datetime>&resolucion=raw|5min|hour
+
+    Defaults to the last 24 hours. Without `resolucion` the finest
+    resolution still retained at `desde` is used (see ServerStatsSample).
+    """
+
+    def get(self, request, *args, **kwargs):
+        """Return samples in the requested range as JSON."""
+        from pages.models import ServerStatsSample
+
+        now = timezone.now()
+        try:
+            end = self._parse_datetime(request.GET.get("hasta"), now)
+            start = self._parse_datetime(
+                request.GET.get("desde"), end - timedelta(hours=24)
+            )
+        except ValueError:
+            return JsonResponse(
+                {"error": "Fechas inválidas; usar formato ISO 8601."},
+                status=400,
+            )
+        if start > end:
+            return JsonResponse(
+                {"error": "'desde' debe ser anterior a 'hasta'."}, status=400
+            )
+
+        resolution = request.GET.get("resolucion") or None
+        if resolution not in (None, *ServerStatsSample.Resolution.values):
+            return JsonResponse({"error": "Resolución inválida."}, status=400)
+
+        resolution, samples = ServerStatsSample.get_range(
+            start, end, resolution, now
+        )
+        return JsonResponse(
+            {
+                "desde": start.isoformat(),
+                "hasta": end.isoformat(),
+                "resolucion": resolution,
+                "points": [sample.as_point() for sample in samples],
+            }
+        )
+
+    @staticmethod
+    def _parse_datetime(value, default):
+        if not value:
+            return default
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
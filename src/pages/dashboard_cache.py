@@ -0,0 +1,300 @@
+"""
+Versioned cache keys for the management dashboard.
+
+Every dashboard cache entry belongs to one or more metric families. Saves
+and transitions on the workflow models bump the generation counter of the
+families they affect (see pages.signals), and cache keys embed the current
+generation of their families. A bump therefore makes every dependent entry
+unreachable at once, so entries can live for DASHBOARD_CACHE_TIMEOUT instead
+of a short blind TTL and are never stale after a reception or finalization.
+
+Keys also embed the local date: aging buckets and period windows move at
+midnight even when nothing is saved.
+
+Entries are read through get_or_compute(), which avoids dogpiles when a key
+is invalidated: the last computed value of the entry is kept under a
+generation-independent stale key, and while exactly one worker (holding a
+cache lock, SET NX on Redis) recomputes the entry every other request gets
+that stale value. With DASHBOARD_CACHE_ASYNC_REFRESH the lock holder hands
+the recomputation to Celery and serves the stale value as well.
+get_or_compute_many() does the same for several entries with a single
+get_many() of their current and stale values.
+"""
+
+import logging
+import time
+from collections import Counter
+from importlib import import_module
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Metric families
+WIP = "wip"
+VOLUME = "volume"
+TAT = "tat"
+PRODUCTIVITY = "productivity"
+AGING = "aging"
+ALERTS = "alerts"
+REPORTS = "reports"
+
+FAMILIES = (WIP, VOLUME, TAT, PRODUCTIVITY, AGING, ALERTS, REPORTS)
+
+# Families affected by a save/delete of each workflow model. Volume and
+# productivity are read from DailyMetricsRollup, so they are bumped when the
+# rollup is rebuilt rather than on every protocol or report save. Alerts are
+# read from the results stored on AlertRule by the periodic evaluation.
+MODEL_FAMILIES = {
+    "AlertRule": (ALERTS,),
+    "Protocol": (WIP, TAT, AGING),
+    "Cassette": (WIP,),
+    "Slide": (WIP,),
+    "Report": (TAT, REPORTS),
+}
+
+GENERATION_KEY = "dashboard_generation_{family}"
+STALE_KEY = "{name}:stale"
+LOCK_KEY = "{key}:lock"
+STATS_KEY = "dashboard_cache_stats_{outcome}"
+
+# get_or_compute() outcomes
+HIT = "hit"
+MISS = "miss"
+STALE = "stale"
+OUTCOMES = (HIT, MISS, STALE)
+ERROR = "error"  # get_or_compute_many() only; not counted
+
+# Modules registering calculators; imported on demand by Celery workers,
+# which do not load the URLconf.
+CALCULATOR_MODULES = ("pages.api_views", "pages.views", "protocols.views")
+
+_calculators = {}
+
+
+def _initial_generation() -> int:
+    """
+    Seed for a missing counter.
+
+    Time-based so a counter lost to eviction never restarts at a value an
+    older cache entry was stored under.
+    """
+    return int(time.time() * 1000)
+
+
+def get_generations(families: Iterable[str]) -> Dict[str, int]:
+    """Return the current generation of each family (one cache round-trip)."""
+    keys = {
+        family: GENERATION_KEY.format(family=family) for family in families
+    }
+    found = cache.get_many(list(keys.values()))
+
+    generations = {}
+    for family, key in keys.items():
+        if key not in found:
+            cache.add(key, _initial_generation(), None)
+            found[key] = cache.get(key, 0)
+        generations[family] = found[key]
+    return generations
+
+
+def bump_generation(*families: str) -> None:
+    """Invalidate every cache entry depending on the given families."""
+    for family in families:
+        key = GENERATION_KEY.format(family=family)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_generation(), None)
+
+
+def _build_key(name, families, parts, generations) -> str:
+    version = ".".join(str(generations[family]) for family in families)
+    return ":".join(
+        [
+            name,
+            *(str(part) for part in parts),
+            timezone.localdate().isoformat(),
+            f"g{version}",
+        ]
+    )
+
+
+def versioned_key(name: str, families: Iterable[str], *parts) -> str:
+    """
+    Build the cache key for a dashboard entry.
+
+    `parts` are the entry's own parameters (period, type, user id...).
+    """
+    families = tuple(families)
+    return _build_key(name, families, parts, get_generations(families))
+
+
+def versioned_keys(entries: Iterable[Tuple[str, tuple]]) -> List[str]:
+    """
+    Build the keys of several registered entries, given as (name, parts).
+
+    The generations of all their families are read in one round-trip.
+    """
+    entries = list(entries)
+    calculators = [_get_calculator(name)[0] for name, _parts in entries]
+    generations = get_generations(
+        {family for families in calculators for family in families}
+    )
+    return [
+        _build_key(name, families, tuple(parts), generations)
+        for (name, parts), families in zip(entries, calculators)
+    ]
+
+
+def register(name: str, families: Iterable[str], calculate: Callable):
+    """
+    Register how to compute dashboard entry `name`.
+
+    `calculate` receives the entry's parts (see versioned_key) and must be
+    importable from CALCULATOR_MODULES so Celery can run refreshes.
+    """
+    _calculators[name] = (tuple(families), calculate)
+
+
+def _get_calculator(name: str):
+    if name not in _calculators:
+        for module in CALCULATOR_MODULES:
+            import_module(module)
+    return _calculators[name]
+
+
+def _stale_key(name: str, parts) -> str:
+    return STALE_KEY.format(
+        name=":".join([name, *(str(part) for part in parts)])
+    )
+
+
+def record(outcome: str, count: int = 1) -> None:
+    """Add `count` to the hit/miss/stale counter for `outcome`."""
+    key = STATS_KEY.format(outcome=outcome)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        if not cache.add(key, count, None):
+            cache.incr(key, count)
+
+
+def record_many(outcomes: Iterable[str]) -> None:
+    """
+    Count the outcomes of a batch with one increment per distinct outcome,
+    so a warm batch costs a single cache round-trip.
+    """
+    for outcome, count in Counter(outcomes).items():
+        if outcome in OUTCOMES:
+            record(outcome, count)
+
+
+def get_counters() -> Dict[str, int]:
+    """Return the hit/miss/stale counters (one cache round-trip)."""
+    keys = {outcome: STATS_KEY.format(outcome=outcome) for outcome in OUTCOMES}
+    found = cache.get_many(list(keys.values()))
+    return {outcome: found.get(key, 0) for outcome, key in keys.items()}
+
+
+def refresh(name: str, parts, key: str):
+    """
+    Compute entry `name` and store it under `key` and its stale key.
+
+    Releases the refresh lock taken by get_or_compute() for `key`.
+    """
+    _families, calculate = _get_calculator(name)
+    try:
+        value = calculate(*parts)
+        cache.set(key, value, settings.DASHBOARD_CACHE_TIMEOUT)
+        cache.set(
+            _stale_key(name, parts),
+            value,
+            settings.DASHBOARD_CACHE_STALE_TIMEOUT,
+        )
+        return value
+    finally:
+        cache.delete(LOCK_KEY.format(key=key))
+
+
+def _resolve(name: str, parts, key: str, found: Dict):
+    """
+    Resolve one entry from a get_many() result holding its key and stale
+    key. Returns (value, outcome).
+
+    The outcome is not counted here; callers pass it to record() or
+    record_many(). A current entry is a hit. When the entry is missing but a stale value
+    exists, only the request that takes the refresh lock recomputes it
+    (inline, or through Celery with DASHBOARD_CACHE_ASYNC_REFRESH); the
+    others are served the stale value. Without a stale value (cold cache)
+    the entry is computed inline.
+    """
+    if key in found:
+        return found[key], HIT
+
+    stale_key = _stale_key(name, parts)
+    has_stale = stale_key in found
+    locked = cache.add(
+        LOCK_KEY.format(key=key), True, settings.DASHBOARD_CACHE_LOCK_TIMEOUT
+    )
+    if has_stale and not locked:
+        return found[stale_key], STALE
+
+    if has_stale and settings.DASHBOARD_CACHE_ASYNC_REFRESH:
+        from pages.tasks import refresh_dashboard_entry
+
+        try:
+            refresh_dashboard_entry.delay(name, list(parts), key)
+            return found[stale_key], STALE
+        except Exception as e:
+            logger.warning("Could not enqueue dashboard refresh: %s", e)
+
+    if not locked:
+        # Cold cache while another worker refreshes; do not steal its lock.
+        _families, calculate = _get_calculator(name)
+        return calculate(*parts), MISS
+    return refresh(name, parts, key), MISS
+
+
+def get_or_compute(name: str, *parts):
+    """Return dashboard entry `name` for `parts`, computing it if needed."""
+    key = versioned_key(name, _get_calculator(name)[0], *parts)
+    found = cache.get_many([key, _stale_key(name, parts)])
+    value, outcome = _resolve(name, parts, key, found)
+    record(outcome)
+    return value
+
+
+def get_or_compute_many(entries, keys: Optional[List[str]] = None):
+    """
+    Resolve several registered entries, given as (name, parts).
+
+    All current and stale values are fetched with a single get_many()
+    (MGET on Redis); only the misses are computed. `keys` may be passed
+    when the caller already built them with versioned_keys().
+
+    Returns a list of (value, outcome) in entry order. An entry whose
+    calculation raises gets (exception, ERROR) so the others can still be
+    served.
+    """
+    entries = [(name, tuple(parts)) for name, parts in entries]
+    if keys is None:
+        keys = versioned_keys(entries)
+
+    lookup = list(keys)
+    for name, parts in entries:
+        lookup.append(_stale_key(name, parts))
+    found = cache.get_many(lookup)
+
+    results = []
+    for (name, parts), key in zip(entries, keys):
+        try:
+            results.append(_resolve(name, parts, key, found))
+        except Exception as e:
+            logger.warning("Dashboard entry %s failed: %s", name, e)
+            results.append((e, ERROR))
+    record_many(outcome for _value, outcome in results)
+    return results
@@ -0,0 +1,182 @@
+"""
+Live "metric family changed" events for the management dashboard.
+
+Workflow saves bump the generation counter of the dashboard metric
+families they affect (see pages.dashboard_cache). A single watcher task
+per process polls those counters with one cache round-trip per interval
+and fans the families that changed out to every open event stream, so
+the cost of idle connections does not grow with their number: each one is
+only an asyncio queue waiting on the watcher.
+
+Streams are served by pages.api_views.dashboard_events, only under ASGI
+(the "events" uvicorn service, see config/asgi.py): a WSGI worker would be
+held by every open dashboard, so without that service
+(DASHBOARD_EVENTS_ENABLED unset) the page keeps to its periodic batch
+refresh instead.
+
+Every event id encodes the generations it was computed from. EventSource
+sends it back as Last-Event-ID when it reconnects, so changes made while
+a client was disconnected are announced as soon as it is back.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from pages import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 32
+
+
+class GenerationWatcher:
+    """
+    Poll dashboard generation counters and notify subscribed streams.
+
+    The polling task is started by the first subscriber on the running
+    event loop and stops once the last subscriber leaves.
+    """
+
+    def __init__(self):
+        self._queues: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._generations: Optional[Dict[str, int]] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._queues)
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a stream; its queue receives (families, generations)
+        tuples.
+        """
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._queues.add(queue)
+        loop = asyncio.get_running_loop()
+        if (
+            self._task is None
+            or self._task.done()
+            or self._task.get_loop() is not loop
+        ):
+            self._generations = None
+            self._task = loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+        if not self._queues and self._task is not None:
+            # Do not leave a sleeping task behind on a loop that may close
+            self._task.cancel()
+            self._task = None
+
+    async def poll(self) -> List[str]:
+        """Read the counters once and return the families that changed."""
+        generations = await read_generations()
+        previous, self._generations = self._generations, generations
+        if previous is None:
+            return []
+        return changed_families(previous, generations)
+
+    def publish(self, families: List[str]) -> None:
+        """Hand `families` and the current generations to subscribers."""
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait((families, self._generations))
+            except asyncio.QueueFull:
+                # A slow client only needs to know what changed, not how
+                # many times: drop its backlog and resend everything.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(
+                    (list(dashboard_cache.FAMILIES), self._generations)
+                )
+
+    async def _run(self):
+        while self._queues:
+            try:
+                changed = await self.poll()
+                if changed:
+                    self.publish(changed)
+            except Exception as e:
+                logger.warning("Dashboard event watcher poll failed: %s", e)
+            await asyncio.sleep(settings.DASHBOARD_EVENTS_POLL_INTERVAL)
+
+
+watcher = GenerationWatcher()
+
+
+async def read_generations() -> Dict[str, int]:
+    return await sync_to_async(dashboard_cache.get_generations)(
+        dashboard_cache.FAMILIES
+    )
+
+
+def changed_families(previous: Dict, current: Dict[str, int]) -> List[str]:
+    return [
+        family
+        for family in dashboard_cache.FAMILIES
+        if current[family] != previous.get(family)
+    ]
+
+
+def encode_event_id(generations: Dict[str, int]) -> str:
+    return ".".join(
+        str(generations[family]) for family in dashboard_cache.FAMILIES
+    )
+
+
+def decode_event_id(event_id: Optional[str]) -> Optional[Dict[str, int]]:
+    """Generations encoded in a Last-Event-ID header, if it is valid."""
+    if not event_id:
+        return None
+    values = event_id.split(".")
+    if len(values) != len(dashboard_cache.FAMILIES):
+        return None
+    try:
+        return dict(zip(dashboard_cache.FAMILIES, map(int, values)))
+    except ValueError:
+        return None
+
+
+def format_event(families: List[str], generations: Dict[str, int]) -> str:
+    """Server-sent event announcing that `families` changed."""
+    return (
+        f"id: {encode_event_id(generations)}\n"
+        "event: changed\n"
+        f"data: {json.dumps({'families': families})}\n\n"
+    )
+
+
+async def event_stream(last_event_id: Optional[str] = None):
+    """Yield server-sent events until the client disconnects."""
+    queue = watcher.subscribe()
+    try:
+        generations = await read_generations()
+        yield (
+            f"retry: {settings.DASHBOARD_EVENTS_RETRY_MS}\n"
+            f"id: {encode_event_id(generations)}\n\n"
+        )
+
+        previous = decode_event_id(last_event_id)
+        if previous is not None:
+            missed = changed_families(previous, generations)
+            if missed:
+                yield format_event(missed, generations)
+
+        while True:
+            try:
+                families, generations = await asyncio.wait_for(
+                    queue.get(), settings.DASHBOARD_EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(families, generations)
+    finally:
+        watcher.unsubscribe(queue)
@@ -0,0 +1,90 @@
+"""
+Management command to (re)build DailyMetricsRollup for a date range.
+
+Run once after deploying the rollup table, or to repair a range after a
+data fix. Days are processed in chunks so long histories do not hold a
+single large transaction:
+
+  make manage ARGS="backfill_metrics_rollup"
+  make manage ARGS="backfill_metrics_rollup --from 2024-01-01 --to 2024-12-31"
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from pages.models import DailyMetricsRollup
+from protocols.models import Protocol, Report
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily metrics rollup used by the management dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            help="First day (YYYY-MM-DD). Defaults to the oldest protocol or report.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            help="Last day (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="Days rebuilt per transaction (default: 31).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            date_to = (
+                date.fromisoformat(options["date_to"])
+                if options["date_to"]
+                else timezone.localdate()
+            )
+            date_from = (
+                date.fromisoformat(options["date_from"])
+                if options["date_from"]
+                else self._oldest_day(date_to)
+            )
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}") from e
+
+        if date_from > date_to:
+            raise CommandError("--from must be before --to")
+
+        chunk = max(1, options["chunk_days"])
+        rows = 0
+        start = date_from
+        while start <= date_to:
+            end = min(start + timedelta(days=chunk - 1), date_to)
+            rows += DailyMetricsRollup.rebuild_range(start, end)
+            self.stdout.write(f"  {start.isoformat()} .. {end.isoformat()}")
+            start = end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollup rebuilt from {date_from.isoformat()} to "
+                f"{date_to.isoformat()} ({rows} rows)"
+            )
+        )
+
+    def _oldest_day(self, default):
+        """Return the earliest day with protocol or report activity."""
+        oldest_protocol = Protocol.objects.aggregate(
+            first=Min("submission_date")
+        )["first"]
+        oldest_report = Report.objects.aggregate(first=Min("updated_at"))[
+            "first"
+        ]
+        candidates = [default]
+        if oldest_protocol:
+            candidates.append(oldest_protocol)
+        if oldest_report:
+            candidates.append(timezone.localtime(oldest_report).date())
+        return min(candidates)
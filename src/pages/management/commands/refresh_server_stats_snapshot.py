@@ -26,8 +26,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Import failed: {e}"))
             return
 
+        previous = ServerStatsSnapshot.get_latest()
         payload = {
-            "system": get_system_stats(),
+            "system": get_system_stats(
+                previous.payload.get("system") if previous else None
+            ),
             "docker": get_docker_stats(),
             "storage": get_media_bucket_stats(),
         }
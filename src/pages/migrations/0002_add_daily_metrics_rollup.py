@@ -0,0 +1,97 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0008_migrate_histopathologists_to_laboratory_staff"),
+        ("pages", "0001_add_server_stats_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyMetricsRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Fecha")),
+                (
+                    "analysis_type",
+                    models.CharField(
+                        choices=[
+                            ("cytology", "Citología"),
+                            ("histopathology", "Histopatología"),
+                        ],
+                        max_length=20,
+                        verbose_name="Tipo de análisis",
+                    ),
+                ),
+                (
+                    "protocols_received",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Protocolos recibidos"
+                    ),
+                ),
+                (
+                    "reports_finalized",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Informes finalizados"
+                    ),
+                ),
+                (
+                    "tat_reports",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Informes finalizados cuyo protocolo tiene fecha de recepción",
+                        verbose_name="Informes con TAT",
+                    ),
+                ),
+                (
+                    "tat_days_total",
+                    models.IntegerField(
+                        default=0, verbose_name="Suma de días TAT"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Actualizado"
+                    ),
+                ),
+                (
+                    "histopathologist",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_metrics",
+                        to="accounts.histopathologist",
+                        verbose_name="Histopatólogo",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Métrica diaria del dashboard",
+                "verbose_name_plural": "Métricas diarias del dashboard",
+                "indexes": [
+                    models.Index(
+                        fields=["date", "analysis_type"],
+                        name="pages_daily_date_ffefd2_idx",
+                    ),
+                    models.Index(
+                        fields=["histopathologist", "date"],
+                        name="pages_daily_histopa_36de30_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
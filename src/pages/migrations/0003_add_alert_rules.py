@@ -0,0 +1,166 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0002_add_daily_metrics_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="Nombre"
+                    ),
+                ),
+                (
+                    "alert_type",
+                    models.CharField(
+                        choices=[
+                            ("tat_excedido", "TAT excedido"),
+                            ("cuello_botella", "Cuello de botella"),
+                        ],
+                        max_length=20,
+                        verbose_name="Tipo de alerta",
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("alta", "Alta"),
+                            ("media", "Media"),
+                            ("baja", "Baja"),
+                        ],
+                        default="media",
+                        max_length=10,
+                        verbose_name="Severidad",
+                    ),
+                ),
+                (
+                    "statuses",
+                    models.JSONField(
+                        default=list,
+                        help_text='Estados de protocolo incluidos, p. ej. ["received", "processing"]',
+                        verbose_name="Estados",
+                    ),
+                ),
+                (
+                    "analysis_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("cytology", "Citología"),
+                            ("histopathology", "Histopatología"),
+                        ],
+                        help_text="Vacío para incluir ambos tipos",
+                        max_length=20,
+                        verbose_name="Tipo de análisis",
+                    ),
+                ),
+                (
+                    "age_field",
+                    models.CharField(
+                        choices=[
+                            ("reception_date", "Fecha de recepción"),
+                            ("updated_at", "Última actualización"),
+                        ],
+                        default="reception_date",
+                        max_length=20,
+                        verbose_name="Antigüedad según",
+                    ),
+                ),
+                (
+                    "min_age_days",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Solo protocolos con más de N días; vacío para no filtrar",
+                        null=True,
+                        verbose_name="Días mínimos",
+                    ),
+                ),
+                (
+                    "threshold",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="La alerta se dispara cuando la cantidad supera este valor",
+                        verbose_name="Umbral",
+                    ),
+                ),
+                (
+                    "message",
+                    models.CharField(
+                        help_text="Usar {count} para la cantidad de protocolos",
+                        max_length=200,
+                        verbose_name="Mensaje",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        blank=True,
+                        help_text="Etapa mostrada en alertas de cuello de botella",
+                        max_length=50,
+                        verbose_name="Etapa",
+                    ),
+                ),
+                (
+                    "sample_size",
+                    models.PositiveSmallIntegerField(
+                        default=5,
+                        help_text="Cantidad de protocolos listados en la alerta (0 = ninguno)",
+                        verbose_name="Protocolos de ejemplo",
+                    ),
+                ),
+                (
+                    "position",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Orden"
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Activa"),
+                ),
+                (
+                    "last_count",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Última cantidad"
+                    ),
+                ),
+                (
+                    "last_sample",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        verbose_name="Últimos protocolos",
+                    ),
+                ),
+                (
+                    "last_evaluated_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Última evaluación"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Regla de alerta",
+                "verbose_name_plural": "Reglas de alerta",
+                "ordering": ["position", "name"],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+"""
+Data migration seeding the default dashboard alert rules.
+
+The rules reproduce the alerts previously hard-coded in
+DashboardAlertsView: TAT exceeded per analysis type and the two processing
+bottlenecks.
+"""
+
+from django.db import migrations
+
+OPEN_STATUSES = ["received", "processing", "ready"]
+
+DEFAULT_RULES = [
+    {
+        "name": "TAT excedido - Histopatología",
+        "alert_type": "tat_excedido",
+        "severity": "alta",
+        "statuses": OPEN_STATUSES,
+        "analysis_type": "histopathology",
+        "age_field": "reception_date",
+        "min_age_days": 7,
+        "threshold": 0,
+        "message": "{count} protocolos de histopatología exceden TAT objetivo",
+        "position": 10,
+    },
+    {
+        "name": "TAT excedido - Citología",
+        "alert_type": "tat_excedido",
+        "severity": "alta",
+        "statuses": OPEN_STATUSES,
+        "analysis_type": "cytology",
+        "age_field": "reception_date",
+        "min_age_days": 3,
+        "threshold": 0,
+        "message": "{count} protocolos de citología exceden TAT objetivo",
+        "position": 20,
+    },
+    {
+        "name": "Muestras esperando diagnóstico",
+        "alert_type": "cuello_botella",
+        "severity": "media",
+        "statuses": ["ready"],
+        "threshold": 5,
+        "message": "{count} muestras esperando diagnóstico",
+        "stage": "listo_diagnostico",
+        "sample_size": 0,
+        "position": 30,
+    },
+    {
+        "name": "Procesamiento prolongado",
+        "alert_type": "cuello_botella",
+        "severity": "media",
+        "statuses": ["processing"],
+        "age_field": "updated_at",
+        "min_age_days": 3,
+        "threshold": 3,
+        "message": "{count} muestras en procesamiento por más de 3 días",
+        "stage": "procesamiento",
+        "sample_size": 0,
+        "position": 40,
+    },
+]
+
+
+def create_default_rules(apps, schema_editor):
+    AlertRule = apps.get_model("pages", "AlertRule")
+    for rule in DEFAULT_RULES:
+        fields = dict(rule)
+        AlertRule.objects.get_or_create(
+            name=fields.pop("name"), defaults=fields
+        )
+
+
+def delete_default_rules(apps, schema_editor):
+    AlertRule = apps.get_model("pages", "AlertRule")
+    AlertRule.objects.filter(
+        name__in=[rule["name"] for rule in DEFAULT_RULES]
+    ).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0003_add_alert_rules"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_rules, delete_default_rules),
+    ]
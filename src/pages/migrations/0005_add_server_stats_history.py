@@ -0,0 +1,101 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0004_seed_default_alert_rules"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServerStatsSample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("raw", "Sin agregar"),
+                            ("5min", "5 minutos"),
+                            ("hour", "1 hora"),
+                        ],
+                        default="raw",
+                        max_length=4,
+                        verbose_name="Resolución",
+                    ),
+                ),
+                (
+                    "timestamp",
+                    models.DateTimeField(
+                        help_text="Momento de la muestra o inicio del intervalo agregado",
+                        verbose_name="Momento",
+                    ),
+                ),
+                (
+                    "sample_count",
+                    models.PositiveIntegerField(
+                        default=1, verbose_name="Muestras"
+                    ),
+                ),
+                (
+                    "cpu_percent",
+                    models.FloatField(null=True, verbose_name="CPU %"),
+                ),
+                (
+                    "ram_percent",
+                    models.FloatField(null=True, verbose_name="RAM %"),
+                ),
+                (
+                    "ram_used",
+                    models.BigIntegerField(
+                        null=True, verbose_name="RAM usada"
+                    ),
+                ),
+                (
+                    "disk_percent",
+                    models.FloatField(null=True, verbose_name="Disco %"),
+                ),
+                (
+                    "io_read_bytes",
+                    models.BigIntegerField(
+                        null=True, verbose_name="Bytes leídos"
+                    ),
+                ),
+                (
+                    "io_write_bytes",
+                    models.BigIntegerField(
+                        null=True, verbose_name="Bytes escritos"
+                    ),
+                ),
+                (
+                    "containers",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Memoria y CPU por nombre de contenedor",
+                        verbose_name="Contenedores",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Muestra de estadísticas del servidor",
+                "verbose_name_plural": "Muestras de estadísticas del servidor",
+                "ordering": ["resolution", "timestamp"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("resolution", "timestamp"),
+                        name="server_stats_sample_unique_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0005_add_server_stats_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaPrefixUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "prefix",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Prefijo"
+                    ),
+                ),
+                (
+                    "object_count",
+                    models.BigIntegerField(default=0, verbose_name="Objetos"),
+                ),
+                (
+                    "total_size_bytes",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Tamaño total (bytes)"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Actualizado"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Uso de almacenamiento por prefijo",
+                "verbose_name_plural": "Uso de almacenamiento por prefijo",
+                "ordering": ["prefix"],
+            },
+        ),
+        migrations.CreateModel(
+            name="MediaReconciliation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "continuation_token",
+                    models.TextField(
+                        blank=True, verbose_name="Token de continuación"
+                    ),
+                ),
+                (
+                    "partial_totals",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        verbose_name="Totales parciales",
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Inicio de la pasada",
+                    ),
+                ),
+                (
+                    "last_completed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Última conciliación completa",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Conciliación de almacenamiento",
+                "verbose_name_plural": "Conciliaciones de almacenamiento",
+            },
+        ),
+    ]
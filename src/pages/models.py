@@ -1,10 +1,22 @@
 """
 Models for the pages app.
 
-Stores dashboard-related data such as cached server stats snapshots.
+Stores dashboard-related data such as cached server stats snapshots and
+their downsampled history, the daily metrics rollup read by the management
+dashboard widgets and the configurable alert rules.
 """
 
-from django.db import models
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from pages import dashboard_cache
+from protocols.models import Protocol, Report
 
 
 class ServerStatsSnapshot(models.Model):
@@ -50,3 +62,792 @@ class ServerStatsSnapshot(models.Model):
             obj.payload = payload
             obj.save(update_fields=["payload", "updated_at"])
         return obj
+
+
+class ServerStatsSample(models.Model):
+    """
+    Time-series history of server stats for trend charts.
+
+    refresh_server_stats records a raw sample on every run. The
+    maintain_server_stats_history beat task averages completed raw samples
+    into 5-minute buckets and those into hourly buckets, then deletes rows
+    past each resolution's retention (SERVER_STATS_RAW_RETENTION_HOURS,
+    SERVER_STATS_5MIN_RETENTION_DAYS, SERVER_STATS_HOURLY_RETENTION_DAYS),
+    so the table stays bounded.
+    """
+
+    class Resolution(models.TextChoices):
+        RAW = "raw", "Sin agregar"
+        FIVE_MINUTES = "5min", "5 minutos"
+        HOURLY = "hour", "1 hora"
+
+    # Bucket width of each aggregated resolution and the one it is built from
+    BUCKETS = {
+        Resolution.FIVE_MINUTES: (timedelta(minutes=5), Resolution.RAW),
+        Resolution.HOURLY: (timedelta(hours=1), Resolution.FIVE_MINUTES),
+    }
+    # Averaged on downsampling; I/O counters are cumulative and keep the
+    # last value of the bucket instead.
+    AVERAGED_FIELDS = (
+        "cpu_percent",
+        "ram_percent",
+        "ram_used",
+        "disk_percent",
+    )
+    COUNTER_FIELDS = ("io_read_bytes", "io_write_bytes")
+    CONTAINER_FIELDS = ("memory_usage_bytes", "memory_percent", "cpu_percent")
+
+    resolution = models.CharField(
+        verbose_name="Resolución",
+        max_length=4,
+        choices=Resolution.choices,
+        default=Resolution.RAW,
+    )
+    timestamp = models.DateTimeField(
+        verbose_name="Momento",
+        help_text="Momento de la muestra o inicio del intervalo agregado",
+    )
+    sample_count = models.PositiveIntegerField(
+        verbose_name="Muestras", default=1
+    )
+    cpu_percent = models.FloatField(verbose_name="CPU %", null=True)
+    ram_percent = models.FloatField(verbose_name="RAM %", null=True)
+    ram_used = models.BigIntegerField(verbose_name="RAM usada", null=True)
+    disk_percent = models.FloatField(verbose_name="Disco %", null=True)
+    io_read_bytes = models.BigIntegerField(
+        verbose_name="Bytes leídos", null=True
+    )
+    io_write_bytes = models.BigIntegerField(
+        verbose_name="Bytes escritos", null=True
+    )
+    containers = models.JSONField(
+        verbose_name="Contenedores",
+        help_text="Memoria y CPU por nombre de contenedor",
+        default=dict,
+    )
+
+    class Meta:
+        verbose_name = "Muestra de estadísticas del servidor"
+        verbose_name_plural = "Muestras de estadísticas del servidor"
+        ordering = ["resolution", "timestamp"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "timestamp"],
+                name="server_stats_sample_unique_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.resolution} @ {self.timestamp.isoformat()}"
+
+    @classmethod
+    def record(cls, payload, at=None):
+        """Store a raw sample from a server_stats_service payload."""
+        system = payload.get("system") or {}
+        cpu = system.get("cpu") or {}
+        ram = system.get("ram") or {}
+        disk = system.get("disk") or {}
+        io = system.get("io") or {}
+        containers = {
+            container["name"]: {
+                field: container.get(field) for field in cls.CONTAINER_FIELDS
+            }
+            for container in (payload.get("docker") or {}).get(
+                "containers", []
+            )
+            if container.get("name")
+        }
+        return cls.objects.create(
+            resolution=cls.Resolution.RAW,
+            timestamp=at or timezone.now(),
+            cpu_percent=cpu.get("percent"),
+            ram_percent=ram.get("percent"),
+            ram_used=ram.get("used"),
+            disk_percent=disk.get("percent"),
+            io_read_bytes=io.get("read_bytes"),
+            io_write_bytes=io.get("write_bytes"),
+            containers=containers,
+        )
+
+    @staticmethod
+    def _bucket_start(moment, width):
+        seconds = int(width.total_seconds())
+        epoch = int(moment.timestamp())
+        return datetime.fromtimestamp(
+            epoch - epoch % seconds, tz=moment.tzinfo
+        )
+
+    @classmethod
+    def _average(cls, rows, timestamp, resolution):
+        """Combine `rows` (oldest first) into one sample, weighted by count."""
+
+        def mean(pairs):
+            pairs = [
+                (value, weight) for value, weight in pairs if value is not None
+            ]
+            total = sum(weight for _value, weight in pairs)
+            if not total:
+                return None
+            return sum(value * weight for value, weight in pairs) / total
+
+        sample = cls(
+            resolution=resolution,
+            timestamp=timestamp,
+            sample_count=sum(row.sample_count for row in rows),
+        )
+        for field in cls.AVERAGED_FIELDS:
+            value = mean(
+                (getattr(row, field), row.sample_count) for row in rows
+            )
+            if value is not None and field == "ram_used":
+                value = round(value)
+            setattr(sample, field, value)
+        for field in cls.COUNTER_FIELDS:
+            values = [getattr(row, field) for row in rows]
+            setattr(
+                sample,
+                field,
+                next((v for v in reversed(values) if v is not None), None),
+            )
+
+        names = {name for row in rows for name in row.containers}
+        sample.containers = {
+            name: {
+                field: mean(
+                    (
+                        row.containers.get(name, {}).get(field),
+                        row.sample_count,
+                    )
+                    for row in rows
+                )
+                for field in cls.CONTAINER_FIELDS
+            }
+            for name in sorted(names)
+        }
+        return sample
+
+    @classmethod
+    def downsample(cls, resolution, now=None):
+        """
+        Build the completed `resolution` buckets missing since the last one.
+
+        Returns the number of buckets created.
+        """
+        width, source = cls.BUCKETS[resolution]
+        now = now or timezone.now()
+        end = cls._bucket_start(now, width)
+
+        last = (
+            cls.objects.filter(resolution=resolution)
+            .order_by("-timestamp")
+            .values_list("timestamp", flat=True)
+            .first()
+        )
+        rows = cls.objects.filter(resolution=source, timestamp__lt=end)
+        if last is not None:
+            rows = rows.filter(timestamp__gte=last + width)
+
+        buckets = defaultdict(list)
+        for row in rows.order_by("timestamp"):
+            buckets[cls._bucket_start(row.timestamp, width)].append(row)
+
+        samples = [
+            cls._average(bucket_rows, timestamp, resolution)
+            for timestamp, bucket_rows in buckets.items()
+        ]
+        cls.objects.bulk_create(samples, ignore_conflicts=True)
+        return len(samples)
+
+    @classmethod
+    def enforce_retention(cls, now=None):
+        """Delete samples past their resolution's retention."""
+        now = now or timezone.now()
+        retention = {
+            cls.Resolution.RAW: timedelta(
+                hours=settings.SERVER_STATS_RAW_RETENTION_HOURS
+            ),
+            cls.Resolution.FIVE_MINUTES: timedelta(
+                days=settings.SERVER_STATS_5MIN_RETENTION_DAYS
+            ),
+            cls.Resolution.HOURLY: timedelta(
+                days=settings.SERVER_STATS_HOURLY_RETENTION_DAYS
+            ),
+        }
+        deleted = 0
+        for resolution, keep in retention.items():
+            count, _ = cls.objects.filter(
+                resolution=resolution, timestamp__lt=now - keep
+            ).delete()
+            deleted += count
+        return deleted
+
+    @classmethod
+    def resolution_for(cls, start, now=None):
+        """Finest resolution still retained at `start`."""
+        now = now or timezone.now()
+        if start >= now - timedelta(
+            hours=settings.SERVER_STATS_RAW_RETENTION_HOURS
+        ):
+            return cls.Resolution.RAW
+        if start >= now - timedelta(
+            days=settings.SERVER_STATS_5MIN_RETENTION_DAYS
+        ):
+            return cls.Resolution.FIVE_MINUTES
+        return cls.Resolution.HOURLY
+
+    @classmethod
+    def get_range(cls, start, end, resolution=None, now=None):
+        """Samples between `start` and `end` for charting, oldest first."""
+        resolution = resolution or cls.resolution_for(start, now)
+        return resolution, cls.objects.filter(
+            resolution=resolution, timestamp__gte=start, timestamp__lte=end
+        ).order_by("timestamp")
+
+    def as_point(self):
+        """Compact JSON-serializable representation for charts."""
+        return {
+            "t": self.timestamp.isoformat(),
+            "n": self.sample_count,
+            "cpu_percent": self.cpu_percent,
+            "ram_percent": self.ram_percent,
+            "ram_used": self.ram_used,
+            "disk_percent": self.disk_percent,
+            "io_read_bytes": self.io_read_bytes,
+            "io_write_bytes": self.io_write_bytes,
+            "containers": self.containers,
+        }
+
+
+class DailyMetricsRollup(models.Model):
+    """
+    Pre-aggregated daily counters backing the management dashboard.
+
+    One row per (date, analysis_type, histopathologist). Protocol intake is
+    stored on rows without histopathologist; finalized reports are
+    attributed to the histopathologist who signed them, on the day their
+    protocol was first finalized, with TAT measured from received_at to
+    finalized_at like the TAT widget. Rows for a day are
+    rebuilt from the source tables by rebuild_range(), which is called by
+    the refresh_daily_metrics task and the backfill_metrics_rollup command.
+    """
+
+    COUNTER_FIELDS = (
+        "protocols_received",
+        "reports_finalized",
+        "tat_reports",
+        "tat_days_total",
+    )
+
+    date = models.DateField(verbose_name="Fecha")
+    analysis_type = models.CharField(
+        verbose_name="Tipo de análisis",
+        max_length=20,
+        choices=Protocol.AnalysisType.choices,
+    )
+    histopathologist = models.ForeignKey(
+        "accounts.Histopathologist",
+        on_delete=models.CASCADE,
+        related_name="daily_metrics",
+        null=True,
+        blank=True,
+        verbose_name="Histopatólogo",
+    )
+    protocols_received = models.PositiveIntegerField(
+        verbose_name="Protocolos recibidos",
+        default=0,
+    )
+    reports_finalized = models.PositiveIntegerField(
+        verbose_name="Informes finalizados",
+        default=0,
+    )
+    tat_reports = models.PositiveIntegerField(
+        verbose_name="Informes con TAT",
+        help_text="Informes finalizados cuyo protocolo tiene fecha de recepción",
+        default=0,
+    )
+    tat_days_total = models.IntegerField(
+        verbose_name="Suma de días TAT",
+        default=0,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Actualizado",
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "Métrica diaria del dashboard"
+        verbose_name_plural = "Métricas diarias del dashboard"
+        indexes = [
+            models.Index(fields=["date", "analysis_type"]),
+            models.Index(fields=["histopathologist", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.analysis_type} ({self.histopathologist_id})"
+
+    @classmethod
+    def rebuild_range(cls, date_from, date_to):
+        """
+        Recompute every rollup row for the days in [date_from, date_to].
+
+        Uses one grouped query for protocols and one narrow scan of the
+        finalized reports in the range, then replaces the rows for those
+        days in a single transaction. When the stored rows already match,
+        nothing is written and the dashboard caches are left alone, so the
+        periodic reconcile does not invalidate widgets for nothing. Returns
+        the number of rows for the range.
+        """
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(date_from, time.min), tz)
+        end = timezone.make_aware(
+            datetime.combine(date_to + timedelta(days=1), time.min), tz
+        )
+
+        buckets = defaultdict(lambda: dict.fromkeys(cls.COUNTER_FIELDS, 0))
+
+        protocol_counts = (
+            Protocol.objects.filter(
+                submission_date__gte=date_from,
+                submission_date__lte=date_to,
+            )
+            .values("submission_date", "analysis_type")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for item in protocol_counts:
+            key = (item["submission_date"], item["analysis_type"], None)
+            buckets[key]["protocols_received"] = item["count"]
+
+        reports = (
+            Report.objects.filter(
+                status__in=[Report.Status.FINALIZED, Report.Status.SENT],
+                protocol__finalized_at__gte=start,
+                protocol__finalized_at__lt=end,
+            )
+            .values_list(
+                "protocol__finalized_at",
+                "protocol__analysis_type",
+                "histopathologist_id",
+                "protocol__received_at",
+            )
+            .order_by()
+        )
+        for (
+            finalized_at,
+            analysis_type,
+            histo_id,
+            received_at,
+        ) in reports.iterator():
+            day = timezone.localtime(finalized_at, tz).date()
+            bucket = buckets[(day, analysis_type, histo_id)]
+            bucket["reports_finalized"] += 1
+            if received_at is not None:
+                bucket["tat_reports"] += 1
+                bucket["tat_days_total"] += (
+                    day - timezone.localtime(received_at, tz).date()
+                ).days
+
+        rows = [
+            cls(
+                date=day,
+                analysis_type=analysis_type,
+                histopathologist_id=histo_id,
+                **counters,
+            )
+            for (day, analysis_type, histo_id), counters in buckets.items()
+        ]
+        with transaction.atomic():
+            existing = cls.objects.filter(
+                date__gte=date_from, date__lte=date_to
+            )
+            stored = [
+                (
+                    (day, analysis_type, histo_id),
+                    dict(zip(cls.COUNTER_FIELDS, counters)),
+                )
+                for day, analysis_type, histo_id, *counters in (
+                    existing.values_list(
+                        "date",
+                        "analysis_type",
+                        "histopathologist_id",
+                        *cls.COUNTER_FIELDS,
+                    )
+                )
+            ]
+            if len(stored) == len(rows) and dict(stored) == buckets:
+                return len(rows)
+
+            existing.delete()
+            cls.objects.bulk_create(rows)
+            transaction.on_commit(
+                lambda: dashboard_cache.bump_generation(
+                    dashboard_cache.VOLUME, dashboard_cache.PRODUCTIVITY
+                )
+            )
+        return len(rows)
+
+
+class AlertRule(models.Model):
+    """
+    Configurable management dashboard alert.
+
+    A rule selects protocols by status, optionally narrowed by analysis type
+    and by age (days since reception or since the last update), and fires
+    when the number of matches exceeds `threshold`. Evaluation runs one
+    COUNT plus, when the rule fires, one sample query bounded by
+    `sample_size`; the outcome is stored on the row by the
+    evaluate_alert_rules task so the alerts widget only reads.
+    """
+
+    class AlertType(models.TextChoices):
+        TAT_EXCEEDED = "tat_excedido", "TAT excedido"
+        BOTTLENECK = "cuello_botella", "Cuello de botella"
+
+    class Severity(models.TextChoices):
+        HIGH = "alta", "Alta"
+        MEDIUM = "media", "Media"
+        LOW = "baja", "Baja"
+
+    class AgeField(models.TextChoices):
+        RECEPTION_DATE = "reception_date", "Fecha de recepción"
+        UPDATED_AT = "updated_at", "Última actualización"
+
+    name = models.CharField(verbose_name="Nombre", max_length=100, unique=True)
+    alert_type = models.CharField(
+        verbose_name="Tipo de alerta",
+        max_length=20,
+        choices=AlertType.choices,
+    )
+    severity = models.CharField(
+        verbose_name="Severidad",
+        max_length=10,
+        choices=Severity.choices,
+        default=Severity.MEDIUM,
+    )
+    statuses = models.JSONField(
+        verbose_name="Estados",
+        help_text='Estados de protocolo incluidos, p. ej. ["received", "processing"]',
+        default=list,
+    )
+    analysis_type = models.CharField(
+        verbose_name="Tipo de análisis",
+        max_length=20,
+        choices=Protocol.AnalysisType.choices,
+        blank=True,
+        help_text="Vacío para incluir ambos tipos",
+    )
+    age_field = models.CharField(
+        verbose_name="Antigüedad según",
+        max_length=20,
+        choices=AgeField.choices,
+        default=AgeField.RECEPTION_DATE,
+    )
+    min_age_days = models.PositiveIntegerField(
+        verbose_name="Días mínimos",
+        null=True,
+        blank=True,
+        help_text="Solo protocolos con más de N días; vacío para no filtrar",
+    )
+    threshold = models.PositiveIntegerField(
+        verbose_name="Umbral",
+        default=0,
+        help_text="La alerta se dispara cuando la cantidad supera este valor",
+    )
+    message = models.CharField(
+        verbose_name="Mensaje",
+        max_length=200,
+        help_text="Usar {count} para la cantidad de protocolos",
+    )
+    stage = models.CharField(
+        verbose_name="Etapa",
+        max_length=50,
+        blank=True,
+        help_text="Etapa mostrada en alertas de cuello de botella",
+    )
+    sample_size = models.PositiveSmallIntegerField(
+        verbose_name="Protocolos de ejemplo",
+        default=5,
+        help_text="Cantidad de protocolos listados en la alerta (0 = ninguno)",
+    )
+    position = models.PositiveSmallIntegerField(
+        verbose_name="Orden",
+        default=0,
+    )
+    is_active = models.BooleanField(verbose_name="Activa", default=True)
+
+    # Result of the last evaluation
+    last_count = models.PositiveIntegerField(
+        verbose_name="Última cantidad",
+        null=True,
+        blank=True,
+    )
+    last_sample = models.JSONField(
+        verbose_name="Últimos protocolos",
+        default=list,
+        blank=True,
+    )
+    last_evaluated_at = models.DateTimeField(
+        verbose_name="Última evaluación",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = "Regla de alerta"
+        verbose_name_plural = "Reglas de alerta"
+        ordering = ["position", "name"]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_triggered(self):
+        """Whether the last evaluation exceeded the threshold."""
+        return self.last_count is not None and self.last_count > self.threshold
+
+    def matching_protocols(self):
+        """Protocols selected by this rule (single indexed predicate)."""
+        queryset = Protocol.objects.filter(status__in=self.statuses)
+        if self.analysis_type:
+            queryset = queryset.filter(analysis_type=self.analysis_type)
+        if self.min_age_days is not None:
+            # "More than N days" in local days, compared against the start
+            # of that day so (status, <date column>) indexes stay usable.
+            cutoff = timezone.make_aware(
+                datetime.combine(
+                    timezone.localdate() - timedelta(days=self.min_age_days),
+                    time.min,
+                )
+            )
+            queryset = queryset.filter(**{f"{self.age_field}__lt": cutoff})
+        return queryset
+
+    def evaluate(self):
+        """Run the rule and store its outcome. Returns the match count."""
+        queryset = self.matching_protocols()
+        count = queryset.count()
+        sample = []
+        if count > self.threshold and self.sample_size:
+            sample = list(
+                queryset.order_by(self.age_field, "pk").values_list(
+                    "protocol_number", flat=True
+                )[: self.sample_size]
+            )
+
+        sample = [number for number in sample if number]
+        self.last_evaluated_at = timezone.now()
+        if count == self.last_count and sample == self.last_sample:
+            # Unchanged outcome: record the run without sending post_save,
+            # so the alerts widget generation (and its ETag) stays put.
+            AlertRule.objects.filter(pk=self.pk).update(
+                last_evaluated_at=self.last_evaluated_at
+            )
+            return count
+
+        self.last_count = count
+        self.last_sample = sample
+        self.save(
+            update_fields=["last_count", "last_sample", "last_evaluated_at"]
+        )
+        return count
+
+    def clean(self):
+        super().clean()
+        errors = {}
+        valid_statuses = set(Protocol.Status.values)
+        if not isinstance(self.statuses, list) or not all(
+            isinstance(status, str) and status in valid_statuses
+            for status in self.statuses
+        ):
+            errors["statuses"] = (
+                "Debe ser una lista de estados de protocolo válidos: "
+                + ", ".join(Protocol.Status.values)
+            )
+        try:
+            self.message.format(count=0)
+        except (KeyError, ValueError, IndexError):
+            errors["message"] = (
+                "Mensaje inválido: solo se admite el marcador {count}."
+            )
+        if errors:
+            raise ValidationError(errors)
+
+    def formatted_message(self):
+        """`message` with the last count filled in."""
+        try:
+            return self.message.format(count=self.last_count)
+        except (KeyError, ValueError, IndexError):
+            # Rules saved without clean() (shell, fixtures) may be invalid
+            return self.message
+
+    def as_alert(self):
+        """Alert dict in the shape rendered by the alerts widget."""
+        alert = {
+            "tipo": self.alert_type,
+            "severidad": self.severity,
+            "mensaje": self.formatted_message(),
+        }
+        if self.last_sample:
+            alert["protocolos"] = self.last_sample
+        if self.stage:
+            alert["etapa"] = self.stage
+        return alert
+
+
+class MediaPrefixUsage(models.Model):
+    """
+    Running object count and size of the media storage per top-level prefix.
+
+    config.storage.AccountedStorageMixin updates the row of the first path
+    segment (signatures, reports, work_orders...) on every save and delete,
+    so the admin dashboard reads the bucket totals without listing it. The
+    reconcile_media_usage task overwrites the counters with a fresh listing
+    from time to time to correct any drift.
+    """
+
+    prefix = models.CharField(
+        verbose_name="Prefijo",
+        max_length=255,
+        unique=True,
+    )
+    object_count = models.BigIntegerField(verbose_name="Objetos", default=0)
+    total_size_bytes = models.BigIntegerField(
+        verbose_name="Tamaño total (bytes)", default=0
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Actualizado",
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "Uso de almacenamiento por prefijo"
+        verbose_name_plural = "Uso de almacenamiento por prefijo"
+        ordering = ["prefix"]
+
+    def __str__(self):
+        return f"{self.prefix}: {self.object_count}"
+
+    @staticmethod
+    def prefix_for(name):
+        """Top-level prefix of a storage path ("" for root objects)."""
+        head, sep, _ = name.lstrip("/").partition("/")
+        return head if sep else ""
+
+    @classmethod
+    def record_change(cls, name, count_delta, size_delta):
+        """Add the deltas to the counters of `name`'s prefix atomically."""
+        prefix = cls.prefix_for(name)
+        cls.objects.get_or_create(prefix=prefix)
+        cls.objects.filter(prefix=prefix).update(
+            object_count=models.F("object_count") + count_delta,
+            total_size_bytes=models.F("total_size_bytes") + size_delta,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def get_totals(cls):
+        """Totals and per-prefix breakdown (one small query)."""
+        prefixes = {
+            row.prefix: {
+                "object_count": row.object_count,
+                "total_size_bytes": row.total_size_bytes,
+            }
+            for row in cls.objects.all()
+        }
+        return {
+            "object_count": sum(p["object_count"] for p in prefixes.values()),
+            "total_size_bytes": sum(
+                p["total_size_bytes"] for p in prefixes.values()
+            ),
+            "prefixes": prefixes,
+        }
+
+    @classmethod
+    def replace_totals(cls, totals):
+        """Overwrite all counters with reconciled `totals` by prefix."""
+        with transaction.atomic():
+            cls.objects.exclude(prefix__in=list(totals)).delete()
+            for prefix, values in totals.items():
+                cls.objects.update_or_create(
+                    prefix=prefix,
+                    defaults={
+                        "object_count": values["object_count"],
+                        "total_size_bytes": values["total_size_bytes"],
+                    },
+                )
+
+
+class MediaReconciliation(models.Model):
+    """
+    Singleton progress of the resumable media bucket reconciliation.
+
+    Each reconcile_media_usage run lists at most
+    MEDIA_RECONCILE_PAGES_PER_RUN pages of the bucket starting at
+    `continuation_token` and adds them to `partial_totals`. When the
+    listing is exhausted the partial totals replace MediaPrefixUsage and a
+    new pass starts on the next run.
+    """
+
+    SINGLETON_PK = 1
+
+    continuation_token = models.TextField(
+        verbose_name="Token de continuación", blank=True
+    )
+    partial_totals = models.JSONField(
+        verbose_name="Totales parciales", default=dict, blank=True
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Inicio de la pasada", null=True, blank=True
+    )
+    last_completed_at = models.DateTimeField(
+        verbose_name="Última conciliación completa", null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = "Conciliación de almacenamiento"
+        verbose_name_plural = "Conciliaciones de almacenamiento"
+
+    def __str__(self):
+        return f"Conciliación @ {self.last_completed_at}"
+
+    @classmethod
+    def get_state(cls):
+        obj, _ = cls.objects.get_or_create(pk=cls.SINGLETON_PK)
+        return obj
+
+    def run(self, client, bucket_name, max_pages, page_size=1000):
+        """
+        List up to `max_pages` pages of the bucket from the saved position.
+
+        Returns True when this call finished a full pass.
+        """
+        if not self.continuation_token:
+            self.partial_totals = {}
+            self.started_at = timezone.now()
+
+        completed = False
+        for _ in range(max_pages):
+            kwargs = {"Bucket": bucket_name, "MaxKeys": page_size}
+            if self.continuation_token:
+                kwargs["ContinuationToken"] = self.continuation_token
+            page = client.list_objects_v2(**kwargs)
+            for obj in page.get("Contents") or []:
+                prefix = MediaPrefixUsage.prefix_for(obj["Key"])
+                totals = self.partial_totals.setdefault(
+                    prefix, {"object_count": 0, "total_size_bytes": 0}
+                )
+                totals["object_count"] += 1
+                totals["total_size_bytes"] += obj.get("Size", 0)
+            if page.get("IsTruncated"):
+                self.continuation_token = page["NextContinuationToken"]
+                continue
+            completed = True
+            break
+
+        if completed:
+            MediaPrefixUsage.replace_totals(self.partial_totals)
+            self.continuation_token = ""
+            self.partial_totals = {}
+            self.last_completed_at = timezone.now()
+        self.save()
+        return completed
@@ -114,43 +114,64 @@ def monitor_performance(operation_name: str = "operation"):
 
 
 def get_cache_stats() -> Dict:
-    """Get cache statistics for dashboard metrics."""
-    cache_keys = [
-        "dashboard_wip_metrics",
-        "dashboard_volume_metrics_mes_ambos",
-        "dashboard_productivity_metrics_mes",
-        "dashboard_aging_metrics",
-        "dashboard_alerts_metrics",
-    ]
-
-    stats = {}
-    for key in cache_keys:
-        stats[key] = cache.get(key) is not None
+    """Get cache statistics for dashboard metrics (default parameters)."""
+    from pages import dashboard_cache
+
+    cache_keys = {
+        "dashboard_wip_metrics": dashboard_cache.versioned_key(
+            "dashboard_wip_metrics", [dashboard_cache.WIP]
+        ),
+        "dashboard_volume_metrics": dashboard_cache.versioned_key(
+            "dashboard_volume_metrics",
+            [dashboard_cache.VOLUME],
+            "mes",
+            "ambos",
+        ),
+        "dashboard_tat_metrics": dashboard_cache.versioned_key(
+            "dashboard_tat_metrics", [dashboard_cache.TAT]
+        ),
+        "dashboard_productivity_metrics": dashboard_cache.versioned_key(
+            "dashboard_productivity_metrics",
+            [dashboard_cache.PRODUCTIVITY],
+            "mes",
+        ),
+        "dashboard_aging_metrics": dashboard_cache.versioned_key(
+            "dashboard_aging_metrics", [dashboard_cache.AGING]
+        ),
+        "dashboard_alerts_metrics": dashboard_cache.versioned_key(
+            "dashboard_alerts_metrics", [dashboard_cache.ALERTS]
+        ),
+    }
 
+    cached = cache.get_many(list(cache_keys.values()))
+    stats = {name: key in cached for name, key in cache_keys.items()}
+    stats["generations"] = dashboard_cache.get_generations(
+        dashboard_cache.FAMILIES
+    )
+
+    # Outcomes of dashboard_cache.get_or_compute; stale responses were
+    # served from cache, so they count towards the hit ratio.
+    counters = dashboard_cache.get_counters()
+    total = sum(counters.values())
+    stats["counters"] = counters
+    stats["hit_ratio"] = (
+        round(
+            (counters[dashboard_cache.HIT] + counters[dashboard_cache.STALE])
+            / total,
+            3,
+        )
+        if total
+        else None
+    )
     return stats
 
 
 def clear_dashboard_cache():
-    """Clear all dashboard-related cache entries."""
-    cache_keys = [
-        "dashboard_wip_metrics",
-        "dashboard_aging_metrics",
-        "dashboard_alerts_metrics",
-    ]
-
-    # Clear volume cache (multiple period/type combinations)
-    for periodo in ["semana", "mes", "año"]:
-        for tipo in ["ambos", "histopathology", "cytology"]:
-            cache_keys.append(f"dashboard_volume_metrics_{periodo}_{tipo}")
-
-    # Clear productivity cache (multiple periods)
-    for periodo in ["semana", "mes", "año"]:
-        cache_keys.append(f"dashboard_productivity_metrics_{periodo}")
-
-    for key in cache_keys:
-        cache.delete(key)
+    """Invalidate all dashboard-related cache entries."""
+    from pages import dashboard_cache
 
-    return len(cache_keys)
+    dashboard_cache.bump_generation(*dashboard_cache.FAMILIES)
+    return len(dashboard_cache.FAMILIES)
 
 
 class PerformanceThresholds:
@@ -164,11 +185,11 @@ class PerformanceThresholds:
     ALERTS_RESPONSE_TIME = 0.2
 
     # Query count thresholds
-    WIP_MAX_QUERIES = 5
+    WIP_MAX_QUERIES = 2  # UNION of protocol/cassette/slide counts + auth
     VOLUME_MAX_QUERIES = 3
     PRODUCTIVITY_MAX_QUERIES = 2  # Should be 1 after optimization
     AGING_MAX_QUERIES = 2
-    ALERTS_MAX_QUERIES = 3
+    ALERTS_MAX_QUERIES = 2  # stored AlertRule results + auth
 
     # Query time thresholds (seconds)
     MAX_QUERY_TIME = 0.1
@@ -0,0 +1,140 @@
+"""
+Signal handlers keeping dashboard data in sync with the protocol workflow.
+
+Saves and deletions of workflow models bump the dashboard cache generation
+of the metric families they affect (see pages.dashboard_cache). Protocol
+and report changes also enqueue a rebuild of the DailyMetricsRollup rows
+for the days they are counted on (the submission date and the day the
+protocol was first finalized), and for the days a protocol was loaded with
+when those changed; enqueueing is debounced through the cache so a burst of
+transitions on the same day results in a single Celery task.
+Both happen only once the surrounding transaction commits. Alert rule
+edits and evaluations invalidate the alerts widget.
+"""
+
+import logging
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from pages import dashboard_cache
+from pages.models import AlertRule
+from protocols.models import Cassette, Protocol, Report, Slide
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_PENDING_KEY = "metrics_rollup_pending_{day}"
+ROLLUP_REFRESH_COUNTDOWN = 30  # seconds; coalesces bursts of transitions
+ROLLUP_PENDING_TIMEOUT = 600
+
+# Fields giving the rollup days a protocol is counted on: intake on its
+# submission date, its reports on the day it was first finalized
+ROLLUP_DAY_FIELDS = ("submission_date", "finalized_at")
+
+
+def schedule_rollup_refresh(days):
+    """
+    Enqueue refresh_daily_metrics for the given days once the current
+    transaction commits. Days that already have a refresh pending are
+    skipped.
+    """
+    normalized = set()
+    for day in days:
+        if isinstance(day, datetime):
+            day = timezone.localtime(day).date()
+        elif isinstance(day, str):
+            # Unsaved instances may still hold the raw form value
+            day = date.fromisoformat(day[:10])
+        if day is not None:
+            normalized.add(day.isoformat())
+
+    if not normalized:
+        return
+
+    def _enqueue():
+        from pages.tasks import refresh_daily_metrics
+
+        pending = sorted(
+            day
+            for day in normalized
+            if cache.add(
+                ROLLUP_PENDING_KEY.format(day=day),
+                True,
+                ROLLUP_PENDING_TIMEOUT,
+            )
+        )
+        if not pending:
+            return
+        try:
+            refresh_daily_metrics.apply_async(
+                args=[pending], countdown=ROLLUP_REFRESH_COUNTDOWN
+            )
+        except Exception as e:
+            # Beat reconciles recent days; do not fail the request.
+            cache.delete_many(
+                [ROLLUP_PENDING_KEY.format(day=day) for day in pending]
+            )
+            logger.warning("Could not enqueue rollup refresh: %s", e)
+
+    transaction.on_commit(_enqueue)
+
+
+def invalidate_dashboard_cache(model):
+    """Bump the cache generation of the families `model` feeds, on commit."""
+    families = dashboard_cache.MODEL_FAMILIES[model.__name__]
+    transaction.on_commit(lambda: dashboard_cache.bump_generation(*families))
+
+
+@receiver(post_init, sender=Protocol)
+def remember_rollup_days(sender, instance, **kwargs):
+    """Keep the loaded rollup days so a change also refreshes the old days."""
+    # __dict__ lookup: a deferred field must not trigger a query here
+    instance._rollup_days = [
+        instance.__dict__.get(field) for field in ROLLUP_DAY_FIELDS
+    ]
+
+
+@receiver(post_save, sender=Protocol)
+@receiver(post_delete, sender=Protocol)
+def protocol_changed(sender, instance, **kwargs):
+    """Invalidate protocol-fed widgets and refresh its rollup days."""
+    invalidate_dashboard_cache(sender)
+    days = [getattr(instance, field) for field in ROLLUP_DAY_FIELDS]
+    schedule_rollup_refresh([*days, *getattr(instance, "_rollup_days", [])])
+    instance._rollup_days = days
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def report_changed(sender, instance, **kwargs):
+    """Invalidate report-fed widgets and refresh the finalization day."""
+    invalidate_dashboard_cache(sender)
+    if Report.protocol.is_cached(instance):
+        finalized_at = instance.protocol.finalized_at
+    else:
+        finalized_at = (
+            Protocol.objects.filter(pk=instance.protocol_id)
+            .values_list("finalized_at", flat=True)
+            .first()
+        )
+    schedule_rollup_refresh([finalized_at])
+
+
+@receiver(post_save, sender=Cassette)
+@receiver(post_delete, sender=Cassette)
+@receiver(post_save, sender=Slide)
+@receiver(post_delete, sender=Slide)
+def processing_item_changed(sender, instance, **kwargs):
+    """Cassette and slide stages feed the WIP board."""
+    invalidate_dashboard_cache(sender)
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+def alert_rule_changed(sender, instance, **kwargs):
+    """Rule edits and stored evaluations feed the alerts widget."""
+    invalidate_dashboard_cache(sender)
@@ -1,14 +1,27 @@
 """
 Celery tasks for the pages app.
 
-Refreshes server stats snapshot for the admin dashboard.
+Refreshes server stats snapshot and history for the admin dashboard, the
+media bucket usage counters, the daily metrics rollup read by the
+management dashboard, the stored results of the dashboard alert rules and
+stale dashboard cache entries.
 """
 
 import logging
+from datetime import date, timedelta
 
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
-from pages.models import ServerStatsSnapshot
+from pages.models import (
+    AlertRule,
+    DailyMetricsRollup,
+    MediaReconciliation,
+    ServerStatsSample,
+    ServerStatsSnapshot,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +31,10 @@ def refresh_server_stats():
     """
     Collect server stats and save to ServerStatsSnapshot (singleton).
 
-    Called by Celery Beat every 5 seconds. The API endpoint reads from
-    ServerStatsSnapshot only; it does not call the stats service.
+    Called by Celery Beat every SERVER_STATS_REFRESH_INTERVAL seconds. The
+    API endpoint reads from ServerStatsSnapshot only; it does not call the
+    stats service. Each run also records a raw ServerStatsSample for the
+    history charts.
     """
     try:
         from services.server_stats_service import (
@@ -28,7 +43,11 @@ def refresh_server_stats():
             get_system_stats,
         )
 
-        system = get_system_stats()
+        # CPU and I/O rates are deltas against the previous snapshot
+        previous = ServerStatsSnapshot.get_latest()
+        system = get_system_stats(
+            previous.payload.get("system") if previous else None
+        )
         docker = get_docker_stats()
         storage = get_media_bucket_stats()
         payload = {
@@ -37,5 +56,128 @@ def refresh_server_stats():
             "storage": storage,
         }
         ServerStatsSnapshot.update_payload(payload)
+        ServerStatsSample.record(payload)
     except Exception as e:
         logger.warning("refresh_server_stats failed: %s", e, exc_info=True)
+
+
+@shared_task(name="pages.tasks.maintain_server_stats_history")
+def maintain_server_stats_history():
+    """
+    Downsample and trim the ServerStatsSample history.
+
+    Called by Celery Beat every 5 minutes: completed raw samples are
+    averaged into 5-minute buckets, completed 5-minute buckets into hourly
+    ones, and rows past their retention are deleted.
+    """
+    try:
+        now = timezone.now()
+        created = {
+            resolution: ServerStatsSample.downsample(resolution, now)
+            for resolution in (
+                ServerStatsSample.Resolution.FIVE_MINUTES,
+                ServerStatsSample.Resolution.HOURLY,
+            )
+        }
+        deleted = ServerStatsSample.enforce_retention(now)
+        return {"created": created, "deleted": deleted}
+    except Exception as e:
+        logger.warning(
+            "maintain_server_stats_history failed: %s", e, exc_info=True
+        )
+
+
+@shared_task(name="pages.tasks.reconcile_media_usage")
+def reconcile_media_usage():
+    """
+    Walk the media bucket in chunks and correct MediaPrefixUsage drift.
+
+    Called by Celery Beat every 15 minutes; each run lists at most
+    MEDIA_RECONCILE_PAGES_PER_RUN pages and resumes from the stored
+    continuation token, so a large bucket is reconciled over several runs
+    without any single one listing it all. No-op unless USE_S3_STORAGE.
+    """
+    if settings.TESTING or not settings.USE_S3_STORAGE:
+        return None
+    try:
+        from django.core.files.storage import default_storage
+
+        client = default_storage.connection.meta.client
+        state = MediaReconciliation.get_state()
+        return state.run(
+            client,
+            default_storage.bucket_name,
+            settings.MEDIA_RECONCILE_PAGES_PER_RUN,
+        )
+    except Exception as e:
+        logger.warning("reconcile_media_usage failed: %s", e, exc_info=True)
+
+
+@shared_task(name="pages.tasks.refresh_daily_metrics")
+def refresh_daily_metrics(days=None):
+    """
+    Rebuild DailyMetricsRollup rows.
+
+    With a list of ISO dates (enqueued by pages.signals on state
+    transitions) only those days are rebuilt. Without arguments (Celery
+    Beat) the trailing METRICS_ROLLUP_REFRESH_DAYS days are reconciled.
+    """
+    from pages.signals import ROLLUP_PENDING_KEY
+
+    try:
+        if days:
+            for day in sorted({date.fromisoformat(d) for d in days}):
+                # Clear the marker first so transitions that happen while
+                # the rebuild runs enqueue a new refresh.
+                cache.delete(ROLLUP_PENDING_KEY.format(day=day.isoformat()))
+                DailyMetricsRollup.rebuild_range(day, day)
+        else:
+            today = timezone.localdate()
+            date_from = today - timedelta(
+                days=max(1, settings.METRICS_ROLLUP_REFRESH_DAYS) - 1
+            )
+            DailyMetricsRollup.rebuild_range(date_from, today)
+    except Exception as e:
+        logger.warning("refresh_daily_metrics failed: %s", e, exc_info=True)
+
+
+@shared_task(name="pages.tasks.evaluate_alert_rules")
+def evaluate_alert_rules():
+    """
+    Evaluate every active AlertRule and store its result.
+
+    Called by Celery Beat. Each rule costs one COUNT query plus one bounded
+    sample query when it fires; the alerts widget only reads the stored
+    results. A failing rule is logged and does not stop the others.
+    """
+    evaluated = 0
+    for rule in AlertRule.objects.filter(is_active=True):
+        try:
+            rule.evaluate()
+            evaluated += 1
+        except Exception as e:
+            logger.warning(
+                "Alert rule %s evaluation failed: %s",
+                rule.name,
+                e,
+                exc_info=True,
+            )
+    return evaluated
+
+
+@shared_task(name="pages.tasks.refresh_dashboard_entry")
+def refresh_dashboard_entry(name, parts, key):
+    """
+    Recompute a dashboard cache entry served stale by get_or_compute().
+
+    Enqueued by pages.dashboard_cache when DASHBOARD_CACHE_ASYNC_REFRESH is
+    enabled; releases the refresh lock when done.
+    """
+    from pages import dashboard_cache
+
+    try:
+        dashboard_cache.refresh(name, parts, key)
+    except Exception as e:
+        logger.warning(
+            "refresh_dashboard_entry %s failed: %s", name, e, exc_info=True
+        )
@@ -0,0 +1,209 @@
+"""
+Tests for the configurable dashboard alert rules.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Veterinarian
+from pages import dashboard_cache
+from pages.models import AlertRule
+from pages.tasks import evaluate_alert_rules
+from protocols.models import Protocol
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "alert-rule-tests",
+    }
+}
+
+
+class AlertRuleTestCase(TestCase):
+    """Base fixture: one vet and protocols at different ages."""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            username="vet",
+            email="vet@example.com",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        self.old_histo = self._protocol(
+            "HP 24/001", Protocol.AnalysisType.HISTOPATHOLOGY, 10
+        )
+        self._protocol("HP 24/002", Protocol.AnalysisType.HISTOPATHOLOGY, 2)
+        self._protocol("CT 24/001", Protocol.AnalysisType.CYTOLOGY, 1)
+
+    def _protocol(self, number, analysis_type, days_ago):
+        return Protocol.objects.create(
+            veterinarian=self.vet,
+            protocol_number=number,
+            analysis_type=analysis_type,
+            status=Protocol.Status.RECEIVED,
+            submission_date=timezone.localdate(),
+            reception_date=timezone.now() - timedelta(days=days_ago),
+            animal_identification="Max",
+            species="Canino",
+        )
+
+
+class AlertRuleEvaluateTest(AlertRuleTestCase):
+    """Tests for AlertRule.evaluate."""
+
+    def test_default_rules_are_seeded(self):
+        self.assertEqual(AlertRule.objects.filter(is_active=True).count(), 4)
+
+    def test_triggered_rule_stores_count_and_sample(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+
+        with self.assertNumQueries(3):  # count, sample, save
+            count = rule.evaluate()
+
+        rule.refresh_from_db()
+        self.assertEqual(count, 1)
+        self.assertTrue(rule.is_triggered)
+        self.assertEqual(rule.last_sample, ["HP 24/001"])
+        self.assertIsNotNone(rule.last_evaluated_at)
+
+    def test_untriggered_rule_skips_sample_query(self):
+        rule = AlertRule.objects.get(analysis_type="cytology")
+
+        with self.assertNumQueries(2):  # count, save
+            rule.evaluate()
+
+        self.assertFalse(rule.is_triggered)
+        self.assertEqual(rule.last_sample, [])
+
+    def test_as_alert_formats_message(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+        rule.evaluate()
+
+        self.assertEqual(
+            rule.as_alert(),
+            {
+                "tipo": "tat_excedido",
+                "severidad": "alta",
+                "mensaje": "1 protocolos de histopatología exceden TAT "
+                "objetivo",
+                "protocolos": ["HP 24/001"],
+            },
+        )
+
+
+class AlertsWidgetTest(AlertRuleTestCase):
+    """The alerts widget reads stored rule results."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(email="staff@example.com", password="testpass123")
+
+    def test_widget_does_not_evaluate_rules(self):
+        response = self.client.get(reverse("pages_api:dashboard_alerts"))
+
+        self.assertContains(response, "Sin alertas")
+
+    def test_widget_shows_alerts_after_evaluation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluated = evaluate_alert_rules()
+
+        response = self.client.get(reverse("pages_api:dashboard_alerts"))
+
+        self.assertEqual(evaluated, 4)
+        self.assertContains(response, "exceden TAT objetivo")
+        self.assertContains(response, "HP 24/001")
+        self.assertNotContains(response, "Sin alertas")
+
+    def test_inactive_rule_is_not_shown(self):
+        evaluate_alert_rules()
+        with self.captureOnCommitCallbacks(execute=True):
+            for rule in AlertRule.objects.all():
+                rule.is_active = False
+                rule.save()
+
+        response = self.client.get(reverse("pages_api:dashboard_alerts"))
+
+        self.assertContains(response, "Sin alertas")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AlertRuleChangeTest(AlertRuleTestCase):
+    """Re-evaluations and rule validation."""
+
+    def _generation(self):
+        return dashboard_cache.get_generations([dashboard_cache.ALERTS])
+
+    def test_unchanged_evaluation_keeps_alerts_generation(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.evaluate()
+        generation = self._generation()
+        evaluated_at = rule.last_evaluated_at
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            rule.evaluate()
+
+        rule.refresh_from_db()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(
+            self._generation(),
+            generation,
+        )
+        self.assertGreater(rule.last_evaluated_at, evaluated_at)
+
+    def test_changed_evaluation_bumps_alerts_generation(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.evaluate()
+        generation = self._generation()
+        self._protocol("HP 24/003", Protocol.AnalysisType.HISTOPATHOLOGY, 20)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.evaluate()
+
+        self.assertNotEqual(
+            self._generation(),
+            generation,
+        )
+
+    def test_clean_rejects_invalid_message_and_statuses(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+        rule.message = "{total} protocolos {"
+        rule.statuses = ["received", "nope"]
+
+        with self.assertRaises(ValidationError) as ctx:
+            rule.full_clean()
+
+        self.assertEqual(
+            set(ctx.exception.message_dict), {"message", "statuses"}
+        )
+
+    def test_as_alert_falls_back_to_raw_invalid_message(self):
+        rule = AlertRule.objects.get(analysis_type="histopathology")
+        rule.evaluate()
+        rule.message = "Revisar {protocolos}"
+
+        self.assertEqual(rule.as_alert()["mensaje"], "Revisar {protocolos}")
@@ -7,7 +7,10 @@ Tests the dashboard API endpoints for WIP, volume, TAT, productivity, aging, and
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -28,6 +31,9 @@ class DashboardAPITestCase(TestCase):
 
     def setUp(self):
         """Set up test data."""
+        # Dashboard entries are versioned per commit; TestCase never commits
+        cache.clear()
+
         # Create test users
         self.lab_staff = User.objects.create_user(
             username="staff",
@@ -130,6 +136,7 @@ class DashboardAPITestCase(TestCase):
             status=Protocol.Status.READY,
             submission_date=self.week_ago.date(),
             reception_date=self.week_ago,
+            finalized_at=self.now,
             animal_identification="Rocky",
             species="Canino",
         )
@@ -273,6 +280,24 @@ class DashboardWIPViewTest(DashboardAPITestCase):
         # Should show ready protocols
         self.assertContains(response, "Listo Diagnóstico")  # ready status
 
+    def test_wip_metrics_computed_in_single_query(self):
+        """WIP board (protocols, cassettes, slides) is one round-trip."""
+        from pages.api_views import DashboardWIPView
+
+        with self.assertNumQueries(1):
+            wip_data = DashboardWIPView()._calculate_wip_metrics()
+
+        histo = wip_data["histopatologia"]
+        self.assertEqual(histo["pendiente_recepcion"], 1)
+        self.assertEqual(histo["recibido"], 1)
+        self.assertEqual(histo["listo_diagnostico"], 1)
+        self.assertEqual(
+            histo["procesando"],
+            {"encasetado": 1, "fijacion": 1, "corte": 1, "coloracion": 1},
+        )
+        self.assertEqual(wip_data["citologia"]["pendiente_recepcion"], 1)
+        self.assertEqual(wip_data["citologia"]["listo_diagnostico"], 1)
+
 
 class DashboardVolumeViewTest(DashboardAPITestCase):
     """Test volume dashboard API."""
@@ -350,6 +375,42 @@ class DashboardTATViewTest(DashboardAPITestCase):
         self.assertContains(response, "días")
         self.assertContains(response, "Objetivo")
 
+    def test_tat_view_json_exposes_percentiles(self):
+        """p50/p90/p95 are interpolated like percentile_cont."""
+        for days in (1, 2, 10, 20):
+            protocol = Protocol.objects.create(
+                veterinarian=self.vet_profile,
+                analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+                status=Protocol.Status.READY,
+                submission_date=self.month_ago.date(),
+                reception_date=self.now - timedelta(days=days),
+                finalized_at=self.now,
+                animal_identification=f"TAT {days}",
+                species="Canino",
+            )
+            Report.objects.create(
+                protocol=protocol,
+                histopathologist=self.histo_profile,
+                veterinarian=self.vet_profile,
+                diagnosis="Test diagnosis",
+                status=Report.Status.FINALIZED,
+            )
+
+        self.client.login(email="staff@example.com", password="testpass123")
+        response = self.client.get(
+            reverse("pages_api:dashboard_tat") + "?format=json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        histo = response.json()["histopatologia"]
+        # TAT values: 1, 2, 7, 10, 20 days
+        self.assertEqual(histo["tat_mediana_dias"], 7.0)
+        self.assertEqual(histo["tat_p90_dias"], 16.0)
+        self.assertEqual(histo["tat_p95_dias"], 18.0)
+        self.assertEqual(histo["tat_minimo_dias"], 1)
+        self.assertEqual(histo["tat_maximo_dias"], 20)
+        self.assertEqual(histo["dentro_objetivo"], 60)
+
 
 class DashboardProductivityViewTest(DashboardAPITestCase):
     """Test productivity dashboard API."""
@@ -423,6 +484,48 @@ class DashboardAgingViewTest(DashboardAPITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Muestras Vencidas")
 
+    def test_aging_metrics_computed_in_sql(self):
+        """Buckets and the overdue list take two bounded queries."""
+        from pages.api_views import DashboardAgingView
+
+        with self.assertNumQueries(2):
+            aging_data = DashboardAgingView()._calculate_aging_metrics()
+
+        self.assertEqual(
+            aging_data["por_rango"],
+            {"0_3_dias": 1, "4_7_dias": 3, "8_14_dias": 0, "mas_14_dias": 0},
+        )
+        # Only the cytology sample exceeds its 3-day target
+        self.assertEqual(len(aging_data["protocolos_vencidos"]), 1)
+        overdue = aging_data["protocolos_vencidos"][0]
+        self.assertEqual(overdue["protocolo_numero"], "CT 24/002")
+        self.assertEqual(overdue["dias_desde_recepcion"], 7)
+
+    def test_aging_overdue_list_is_oldest_first_and_bounded(self):
+        """At most 10 overdue samples, oldest reception first."""
+        from pages.api_views import DashboardAgingView
+
+        for days in range(20, 8, -1):
+            Protocol.objects.create(
+                veterinarian=self.vet_profile,
+                analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+                status=Protocol.Status.PROCESSING,
+                submission_date=self.month_ago.date(),
+                reception_date=self.now - timedelta(days=days),
+                animal_identification=f"Old {days}",
+                species="Canino",
+            )
+
+        overdue = DashboardAgingView()._calculate_aging_metrics()[
+            "protocolos_vencidos"
+        ]
+
+        self.assertEqual(len(overdue), 10)
+        self.assertEqual(
+            [item["dias_desde_recepcion"] for item in overdue],
+            list(range(20, 10, -1)),
+        )
+
 
 class DashboardAlertsViewTest(DashboardAPITestCase):
     """Test alerts dashboard API."""
@@ -452,6 +555,86 @@ class DashboardAlertsViewTest(DashboardAPITestCase):
         self.assertContains(response, "Sin alertas")
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "dashboard-batch-tests",
+        }
+    }
+)
+class DashboardBatchViewTest(DashboardAPITestCase):
+    """Test the batched dashboard endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("pages_api:dashboard_batch")
+
+    def test_batch_view_requires_management_access(self):
+        self.client.login(email="vet@example.com", password="testpass123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_batch_view_returns_every_widget_fragment(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        for target in (
+            "wip-content",
+            "volume-content",
+            "tat-content",
+            "productivity-content",
+            "aging-content",
+            "alerts-content",
+        ):
+            self.assertContains(
+                response, f'<div id="{target}" hx-swap-oob="innerHTML">'
+            )
+        self.assertContains(response, "Sin alertas")
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+
+    def test_unchanged_poll_gets_not_modified(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        etag = self.client.get(self.url).headers["ETag"]
+
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_warm_poll_reads_payloads_from_cache(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        # Only session/auth queries remain; no widget is recomputed
+        self.assertFalse(
+            [q["sql"] for q in queries if "protocols_" in q["sql"]]
+        )
+
+    def test_invalidation_changes_etag(self):
+        from pages import dashboard_cache
+
+        self.client.login(email="staff@example.com", password="testpass123")
+        etag = self.client.get(self.url).headers["ETag"]
+
+        dashboard_cache.bump_generation(dashboard_cache.WIP)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_periods_are_forwarded_to_widgets(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        week = self.client.get(self.url + "?volumen_periodo=semana")
+        month = self.client.get(self.url + "?volumen_periodo=mes")
+
+        self.assertNotEqual(week.headers["ETag"], month.headers["ETag"])
+
+
 class ManagementDashboardViewTest(DashboardAPITestCase):
     """Test management dashboard view."""
 
@@ -507,7 +690,9 @@ class ManagementDashboardViewTest(DashboardAPITestCase):
         self.assertContains(response, "hx-get=")
         self.assertContains(response, "hx-trigger=")
         self.assertContains(response, "hx-indicator=")
-        self.assertContains(response, "hx-target=")
+        # Widgets are filled by out-of-band swaps from one batched request
+        self.assertContains(response, reverse("pages_api:dashboard_batch"))
+        self.assertContains(response, 'hx-swap="none"')
 
 
 class DashboardPerformanceTest(DashboardAPITestCase):
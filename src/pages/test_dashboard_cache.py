@@ -0,0 +1,305 @@
+"""
+Tests for the versioned, event-driven dashboard cache.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Veterinarian
+from pages import dashboard_cache
+from pages.models import DailyMetricsRollup
+from pages.performance_monitor import get_cache_stats
+from protocols.models import Cassette, HistopathologySample, Protocol
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "dashboard-cache-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VersionedKeyTest(TestCase):
+    """Tests for generation counters and key building."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_only_dependent_keys(self):
+        wip_key = dashboard_cache.versioned_key(
+            "dashboard_wip_metrics", [dashboard_cache.WIP]
+        )
+        volume_key = dashboard_cache.versioned_key(
+            "dashboard_volume_metrics", [dashboard_cache.VOLUME], "mes"
+        )
+
+        dashboard_cache.bump_generation(dashboard_cache.WIP)
+
+        self.assertNotEqual(
+            wip_key,
+            dashboard_cache.versioned_key(
+                "dashboard_wip_metrics", [dashboard_cache.WIP]
+            ),
+        )
+        self.assertEqual(
+            volume_key,
+            dashboard_cache.versioned_key(
+                "dashboard_volume_metrics", [dashboard_cache.VOLUME], "mes"
+            ),
+        )
+
+    def test_key_embeds_parameters_and_local_date(self):
+        key = dashboard_cache.versioned_key(
+            "dashboard_volume_metrics",
+            [dashboard_cache.VOLUME],
+            "mes",
+            "ambos",
+        )
+
+        self.assertTrue(key.startswith("dashboard_volume_metrics:mes:ambos:"))
+        self.assertIn(timezone.localdate().isoformat(), key)
+
+    def test_lost_counter_restarts_above_previous_value(self):
+        before = dashboard_cache.get_generations([dashboard_cache.TAT])
+        cache.delete(
+            dashboard_cache.GENERATION_KEY.format(family=dashboard_cache.TAT)
+        )
+
+        after = dashboard_cache.get_generations([dashboard_cache.TAT])
+
+        self.assertGreaterEqual(
+            after[dashboard_cache.TAT], before[dashboard_cache.TAT]
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ModelEventInvalidationTest(TestCase):
+    """Saves on workflow models bump only the families they feed."""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            username="vet",
+            email="vet@example.com",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        self.protocol = Protocol.objects.create(
+            protocol_number="HP 26/001",
+            veterinarian=self.vet,
+            analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+            status=Protocol.Status.PROCESSING,
+            submission_date=timezone.localdate(),
+            reception_date=timezone.now(),
+            animal_identification="Max",
+            species="Canino",
+        )
+        self.sample = HistopathologySample.objects.create(
+            protocol=self.protocol,
+            veterinarian=self.vet,
+            material_submitted="Material",
+            number_of_containers=1,
+        )
+
+    def _generations(self):
+        return dashboard_cache.get_generations(dashboard_cache.FAMILIES)
+
+    def test_cassette_save_bumps_wip_only(self):
+        before = self._generations()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Cassette.objects.create(
+                histopathology_sample=self.sample,
+                material_incluido="Material",
+            )
+
+        after = self._generations()
+        self.assertGreater(
+            after[dashboard_cache.WIP], before[dashboard_cache.WIP]
+        )
+        for family in (dashboard_cache.VOLUME, dashboard_cache.AGING):
+            self.assertEqual(after[family], before[family])
+
+    def test_rollup_rebuild_bumps_volume_and_productivity(self):
+        before = self._generations()
+
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyMetricsRollup.rebuild_range(today, today)
+
+        after = self._generations()
+        for family in (dashboard_cache.VOLUME, dashboard_cache.PRODUCTIVITY):
+            self.assertGreater(after[family], before[family])
+        self.assertEqual(
+            after[dashboard_cache.WIP], before[dashboard_cache.WIP]
+        )
+
+    def test_unchanged_rollup_rebuild_does_not_bump(self):
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyMetricsRollup.rebuild_range(today, today)
+        before = self._generations()
+        updated_at = list(
+            DailyMetricsRollup.objects.values_list("updated_at", flat=True)
+        )
+        self.assertTrue(updated_at)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            DailyMetricsRollup.rebuild_range(today, today)
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self._generations(), before)
+        self.assertEqual(
+            list(
+                DailyMetricsRollup.objects.values_list("updated_at", flat=True)
+            ),
+            updated_at,
+        )
+
+    def test_wip_widget_served_from_cache_until_invalidated(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        url = reverse("pages_api:dashboard_wip")
+        self.client.get(url)
+
+        # Without a commit the generation is not bumped: cached value wins
+        Cassette.objects.create(
+            histopathology_sample=self.sample,
+            material_incluido="Material",
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            response.context["histopatologia"]["procesando"]["encasetado"], 0
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Cassette.objects.create(
+                histopathology_sample=self.sample,
+                material_incluido="Material",
+            )
+
+        response = self.client.get(url)
+        self.assertEqual(
+            response.context["histopatologia"]["procesando"]["encasetado"], 2
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StaleWhileRevalidateTest(TestCase):
+    """Tests for get_or_compute single-flight refreshes."""
+
+    NAME = "test_widget"
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+        dashboard_cache.register(
+            self.NAME, [dashboard_cache.WIP], self._calculate
+        )
+
+    def tearDown(self):
+        dashboard_cache._calculators.pop(self.NAME, None)
+
+    def _calculate(self, periodo):
+        self.calls.append(periodo)
+        return {"periodo": periodo, "version": len(self.calls)}
+
+    def _lock_current_key(self):
+        key = dashboard_cache.versioned_key(
+            self.NAME, [dashboard_cache.WIP], "mes"
+        )
+        cache.add(dashboard_cache.LOCK_KEY.format(key=key), True)
+
+    def test_miss_then_hit(self):
+        first = dashboard_cache.get_or_compute(self.NAME, "mes")
+        second = dashboard_cache.get_or_compute(self.NAME, "mes")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, ["mes"])
+        counters = dashboard_cache.get_counters()
+        self.assertEqual(counters[dashboard_cache.MISS], 1)
+        self.assertEqual(counters[dashboard_cache.HIT], 1)
+
+    def test_stale_value_served_while_another_worker_refreshes(self):
+        dashboard_cache.get_or_compute(self.NAME, "mes")
+        dashboard_cache.bump_generation(dashboard_cache.WIP)
+        self._lock_current_key()
+
+        value = dashboard_cache.get_or_compute(self.NAME, "mes")
+
+        self.assertEqual(value["version"], 1)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(
+            dashboard_cache.get_counters()[dashboard_cache.STALE], 1
+        )
+
+    def test_lock_holder_refreshes_and_releases_lock(self):
+        dashboard_cache.get_or_compute(self.NAME, "mes")
+        dashboard_cache.bump_generation(dashboard_cache.WIP)
+
+        value = dashboard_cache.get_or_compute(self.NAME, "mes")
+
+        self.assertEqual(value["version"], 2)
+        key = dashboard_cache.versioned_key(
+            self.NAME, [dashboard_cache.WIP], "mes"
+        )
+        self.assertIsNone(cache.get(dashboard_cache.LOCK_KEY.format(key=key)))
+
+    @override_settings(DASHBOARD_CACHE_ASYNC_REFRESH=True)
+    def test_async_refresh_serves_stale_and_enqueues_task(self):
+        dashboard_cache.get_or_compute(self.NAME, "mes")
+        dashboard_cache.bump_generation(dashboard_cache.WIP)
+
+        # Celery runs eagerly in tests, so the entry is refreshed at once
+        value = dashboard_cache.get_or_compute(self.NAME, "mes")
+
+        self.assertEqual(value["version"], 1)
+        self.assertEqual(
+            dashboard_cache.get_or_compute(self.NAME, "mes")["version"], 2
+        )
+
+    def test_warm_batch_counts_hits_with_one_increment(self):
+        entries = [(self.NAME, (periodo,)) for periodo in "abcdef"]
+        dashboard_cache.get_or_compute_many(entries)
+
+        with patch.object(cache, "incr", wraps=cache.incr) as incr:
+            results = dashboard_cache.get_or_compute_many(entries)
+
+        self.assertEqual(
+            [outcome for _value, outcome in results],
+            [dashboard_cache.HIT] * 6,
+        )
+        incr.assert_called_once()
+        counters = dashboard_cache.get_counters()
+        self.assertEqual(counters[dashboard_cache.HIT], 6)
+        self.assertEqual(counters[dashboard_cache.MISS], 6)
+
+    def test_cache_stats_report_counters(self):
+        dashboard_cache.get_or_compute(self.NAME, "mes")
+        dashboard_cache.get_or_compute(self.NAME, "mes")
+
+        stats = get_cache_stats()
+
+        self.assertEqual(stats["counters"], {"hit": 1, "miss": 1, "stale": 0})
+        self.assertEqual(stats["hit_ratio"], 0.5)
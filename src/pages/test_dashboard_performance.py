@@ -15,6 +15,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 from accounts.models import Histopathologist, Veterinarian
+from pages import dashboard_cache
 from pages.performance_monitor import (
     check_performance_thresholds,
     monitor_performance,
@@ -248,9 +249,12 @@ class DashboardPerformanceTest(TestCase):
         client.force_login(self.lab_staff)
 
         # Clear cache before test
-        cache.delete("dashboard_wip_metrics")
+        cache_key = dashboard_cache.versioned_key(
+            "dashboard_wip_metrics", [dashboard_cache.WIP]
+        )
+        cache.delete(cache_key)
         self.assertIsNone(
-            cache.get("dashboard_wip_metrics"),
+            cache.get(cache_key),
             "Cache should be empty before first request",
         )
 
@@ -259,7 +263,7 @@ class DashboardPerformanceTest(TestCase):
             response1 = client.get(reverse("pages_api:dashboard_wip"))
 
         # Verify cache was set after first request
-        cached_data = cache.get("dashboard_wip_metrics")
+        cached_data = cache.get(cache_key)
         self.assertIsNotNone(
             cached_data,
             "Cache should be set after first request",
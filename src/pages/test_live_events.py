@@ -0,0 +1,159 @@
+"""
+Tests for the management dashboard live event stream.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Veterinarian
+from pages import dashboard_cache, live_events
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "live-events-tests",
+    }
+}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    DASHBOARD_EVENTS_POLL_INTERVAL=0.01,
+)
+class DashboardEventsTest(TestCase):
+    """Tests for pages.live_events and the events endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("pages_api:dashboard_events")
+        User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            username="vet",
+            email="vet@example.com",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+
+    def test_events_require_management_access(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+        self.client.login(email="vet@example.com", password="testpass123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_wsgi_request_gets_no_content(self):
+        """Under WSGI the stream would hold a worker: EventSource stops."""
+        self.client.login(email="staff@example.com", password="testpass123")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 204)
+
+    async def test_asgi_request_streams_current_event_id(self):
+        await self.async_client.alogin(
+            email="staff@example.com", password="testpass123"
+        )
+        generations = await sync_to_async(dashboard_cache.get_generations)(
+            dashboard_cache.FAMILIES
+        )
+
+        response = await self.async_client.get(self.url)
+        try:
+            first = await anext(aiter(response.streaming_content))
+        finally:
+            await response.streaming_content.aclose()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn(
+            f"id: {live_events.encode_event_id(generations)}", first.decode()
+        )
+
+    async def test_reconnect_announces_families_changed_meanwhile(self):
+        generations = await sync_to_async(dashboard_cache.get_generations)(
+            dashboard_cache.FAMILIES
+        )
+        last_event_id = live_events.encode_event_id(generations)
+        await sync_to_async(dashboard_cache.bump_generation)(
+            dashboard_cache.AGING
+        )
+
+        stream = live_events.event_stream(last_event_id=last_event_id)
+        try:
+            await anext(stream)  # retry and current id
+            event = await anext(stream)
+        finally:
+            await stream.aclose()
+
+        self.assertIn("event: changed", event)
+        self.assertIn('{"families": ["aging"]}', event)
+
+    def test_dashboard_does_not_open_stream_under_wsgi(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+
+        response = self.client.get(reverse("pages:dashboard_management"))
+
+        self.assertFalse(response.context["live_events_enabled"])
+        self.assertNotContains(response, "new EventSource")
+        self.assertContains(response, "every 60s")
+
+    @override_settings(DASHBOARD_EVENTS_ENABLED=True)
+    def test_dashboard_opens_stream_when_events_service_enabled(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+
+        response = self.client.get(reverse("pages:dashboard_management"))
+
+        self.assertContains(response, "new EventSource")
+        self.assertContains(response, "every 300s")
+
+    async def test_dashboard_opens_stream_under_asgi(self):
+        await self.async_client.alogin(
+            email="staff@example.com", password="testpass123"
+        )
+
+        response = await self.async_client.get(
+            reverse("pages:dashboard_management")
+        )
+
+        self.assertContains(response, "new EventSource")
+
+    async def test_open_stream_pushes_changed_family(self):
+        stream = live_events.event_stream()
+        try:
+            await anext(stream)  # retry and current id
+            # Let the watcher take its baseline reading
+            await asyncio.sleep(0.05)
+            await sync_to_async(dashboard_cache.bump_generation)(
+                dashboard_cache.WIP
+            )
+
+            event = await asyncio.wait_for(anext(stream), timeout=2)
+        finally:
+            await stream.aclose()
+
+        self.assertIn('{"families": ["wip"]}', event)
+        self.assertEqual(live_events.watcher.subscriber_count, 0)
+
+    def test_invalid_last_event_id_is_ignored(self):
+        self.assertIsNone(live_events.decode_event_id("1.2"))
+        self.assertIsNone(live_events.decode_event_id("a.b.c.d.e.f.g"))
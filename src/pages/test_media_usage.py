@@ -0,0 +1,115 @@
+"""
+Tests for the incremental media bucket accounting.
+"""
+
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+
+from config.storage import AccountedStorageMixin
+from pages.models import MediaPrefixUsage, MediaReconciliation
+from pages.tasks import reconcile_media_usage
+
+
+class AccountedFileSystemStorage(AccountedStorageMixin, FileSystemStorage):
+    pass
+
+
+def usage(prefix):
+    return MediaPrefixUsage.objects.values_list(
+        "object_count", "total_size_bytes"
+    ).get(prefix=prefix)
+
+
+class AccountedStorageTest(TestCase):
+    """Saves and deletes update the per-prefix counters."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = AccountedFileSystemStorage(location=self.location)
+
+    def test_save_and_delete_update_prefix_counters(self):
+        first = self.storage.save(
+            "signatures/lab_staff/a.png", ContentFile(b"x" * 10)
+        )
+        self.storage.save("signatures/b.png", ContentFile(b"x" * 5))
+        self.storage.save("reports/c.pdf", ContentFile(b"x" * 7))
+
+        self.assertEqual(usage("signatures"), (2, 15))
+        self.assertEqual(usage("reports"), (1, 7))
+
+        self.storage.delete(first)
+
+        self.assertEqual(usage("signatures"), (1, 5))
+
+    def test_deleting_missing_file_changes_nothing(self):
+        self.storage.delete("signatures/missing.png")
+
+        self.assertFalse(MediaPrefixUsage.objects.exists())
+
+    def test_root_objects_use_empty_prefix(self):
+        self.assertEqual(MediaPrefixUsage.prefix_for("a.txt"), "")
+        self.assertEqual(MediaPrefixUsage.prefix_for("/reports/x"), "reports")
+
+
+def listing(pages):
+    """Fake S3 client returning `pages` (lists of (key, size)) in order."""
+    client = MagicMock()
+    responses = []
+    for index, objects in enumerate(pages):
+        response = {
+            "Contents": [{"Key": key, "Size": size} for key, size in objects]
+        }
+        if index < len(pages) - 1:
+            response["IsTruncated"] = True
+            response["NextContinuationToken"] = f"token-{index + 1}"
+        responses.append(response)
+    client.list_objects_v2.side_effect = responses
+    return client
+
+
+class MediaReconciliationTest(TestCase):
+    """The bucket walk resumes across runs and replaces the counters."""
+
+    def test_walk_resumes_and_replaces_totals(self):
+        MediaPrefixUsage.record_change("signatures/a.png", 5, 999)
+        MediaPrefixUsage.record_change("old/x", 1, 1)
+        client = listing(
+            [
+                [("signatures/a.png", 10), ("reports/b.pdf", 20)],
+                [("signatures/c.png", 30)],
+            ]
+        )
+        state = MediaReconciliation.get_state()
+
+        self.assertFalse(state.run(client, "adlab-media", max_pages=1))
+        # Counters are untouched until the pass completes
+        self.assertEqual(usage("signatures"), (5, 999))
+
+        state = MediaReconciliation.get_state()
+        self.assertEqual(state.continuation_token, "token-1")
+        self.assertTrue(state.run(client, "adlab-media", max_pages=1))
+
+        self.assertEqual(usage("signatures"), (2, 40))
+        self.assertEqual(usage("reports"), (1, 20))
+        self.assertFalse(MediaPrefixUsage.objects.filter(prefix="old"))
+        self.assertEqual(
+            client.list_objects_v2.call_args.kwargs["ContinuationToken"],
+            "token-1",
+        )
+        state.refresh_from_db()
+        self.assertEqual(state.continuation_token, "")
+        self.assertIsNotNone(state.last_completed_at)
+
+    def test_task_is_noop_without_s3(self):
+        self.assertIsNone(reconcile_media_usage())
+
+    @override_settings(TESTING=False, USE_S3_STORAGE=True)
+    def test_task_failure_is_logged(self):
+        with self.assertLogs("pages.tasks", level="WARNING"):
+            self.assertIsNone(reconcile_media_usage())
@@ -0,0 +1,278 @@
+"""
+Tests for the daily metrics rollup behind the management dashboard.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Histopathologist, Veterinarian
+from pages.models import DailyMetricsRollup
+from pages.tasks import refresh_daily_metrics
+from protocols.models import Protocol, Report
+
+User = get_user_model()
+
+
+class DailyMetricsRollupTestCase(TestCase):
+    """Base fixture: one vet, one histopathologist, a few protocols."""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+
+        self.staff = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            username="vet",
+            email="vet@example.com",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        histo_user = User.objects.create_user(
+            username="histo",
+            email="histo@example.com",
+            password="testpass123",
+            first_name="Ana",
+            last_name="López",
+            role=User.Role.HISTOPATOLOGO,
+        )
+        self.histo = Histopathologist.objects.create(
+            user=histo_user,
+            first_name="Ana",
+            last_name="López",
+            license_number="HISTO-1",
+        )
+
+        self.histo_protocol = self._protocol(
+            Protocol.AnalysisType.HISTOPATHOLOGY, self.today
+        )
+        self._protocol(Protocol.AnalysisType.HISTOPATHOLOGY, self.today)
+        self.cyto_protocol = self._protocol(
+            Protocol.AnalysisType.CYTOLOGY, self.yesterday
+        )
+
+    def _protocol(self, analysis_type, submission_date):
+        return Protocol.objects.create(
+            veterinarian=self.vet,
+            analysis_type=analysis_type,
+            status=Protocol.Status.SUBMITTED,
+            submission_date=submission_date,
+            reception_date=timezone.now() - timedelta(days=4),
+            animal_identification="Max",
+            species="Canino",
+        )
+
+    def _finalized_report(self, protocol, finalized_at=None):
+        report = Report.objects.create(
+            protocol=protocol,
+            histopathologist=self.histo,
+            veterinarian=self.vet,
+            diagnosis="Diagnóstico",
+            status=Report.Status.FINALIZED,
+        )
+        protocol.mark_report_finalized(finalized_at)
+        return report
+
+
+class RebuildRangeTest(DailyMetricsRollupTestCase):
+    """Tests for DailyMetricsRollup.rebuild_range."""
+
+    def test_counts_protocols_per_day_and_type(self):
+        DailyMetricsRollup.rebuild_range(self.yesterday, self.today)
+
+        today_histo = DailyMetricsRollup.objects.get(
+            date=self.today,
+            analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+            histopathologist__isnull=True,
+        )
+        yesterday_cyto = DailyMetricsRollup.objects.get(
+            date=self.yesterday,
+            analysis_type=Protocol.AnalysisType.CYTOLOGY,
+            histopathologist__isnull=True,
+        )
+        self.assertEqual(today_histo.protocols_received, 2)
+        self.assertEqual(yesterday_cyto.protocols_received, 1)
+
+    def test_attributes_reports_and_tat_to_histopathologist(self):
+        self._finalized_report(self.histo_protocol)
+
+        DailyMetricsRollup.rebuild_range(self.today, self.today)
+
+        row = DailyMetricsRollup.objects.get(
+            date=self.today, histopathologist=self.histo
+        )
+        self.assertEqual(row.reports_finalized, 1)
+        self.assertEqual(row.tat_reports, 1)
+        self.assertEqual(row.tat_days_total, 4)
+
+    def test_rebuild_replaces_existing_rows(self):
+        DailyMetricsRollup.rebuild_range(self.today, self.today)
+        DailyMetricsRollup.rebuild_range(self.today, self.today)
+
+        self.assertEqual(
+            DailyMetricsRollup.objects.filter(date=self.today).count(), 1
+        )
+
+
+class RollupRefreshTest(DailyMetricsRollupTestCase):
+    """Tests for the refresh task, signals and backfill command."""
+
+    def test_report_transition_enqueues_refresh_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._finalized_report(self.histo_protocol)
+
+        self.assertTrue(
+            DailyMetricsRollup.objects.filter(
+                date=self.today,
+                histopathologist=self.histo,
+                reports_finalized=1,
+            ).exists()
+        )
+
+    def test_submission_date_change_refreshes_previous_day(self):
+        old_day = self.today - timedelta(days=10)
+        protocol = self._protocol(Protocol.AnalysisType.CYTOLOGY, old_day)
+        DailyMetricsRollup.rebuild_range(old_day, old_day)
+
+        protocol = Protocol.objects.get(pk=protocol.pk)
+        protocol.submission_date = self.today
+        with self.captureOnCommitCallbacks(execute=True):
+            protocol.save()
+
+        self.assertFalse(
+            DailyMetricsRollup.objects.filter(date=old_day).exists()
+        )
+        self.assertEqual(
+            DailyMetricsRollup.objects.get(
+                date=self.today,
+                analysis_type=Protocol.AnalysisType.CYTOLOGY,
+            ).protocols_received,
+            1,
+        )
+
+    def test_report_edit_keeps_finalization_day(self):
+        old_day = self.today - timedelta(days=10)
+        report = self._finalized_report(
+            self.histo_protocol, timezone.now() - timedelta(days=10)
+        )
+        DailyMetricsRollup.rebuild_range(old_day, self.today)
+
+        report = Report.objects.get(pk=report.pk)
+        report.diagnosis = "Diagnóstico corregido"
+        with self.captureOnCommitCallbacks(execute=True):
+            report.save()
+
+        self.assertTrue(
+            DailyMetricsRollup.objects.filter(
+                date=old_day, histopathologist=self.histo, reports_finalized=1
+            ).exists()
+        )
+        self.assertFalse(
+            DailyMetricsRollup.objects.filter(
+                date=self.today, histopathologist=self.histo
+            ).exists()
+        )
+
+    def test_second_report_refreshes_finalization_day(self):
+        old_day = self.today - timedelta(days=10)
+        self._finalized_report(
+            self.histo_protocol, timezone.now() - timedelta(days=10)
+        )
+        DailyMetricsRollup.rebuild_range(old_day, old_day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._finalized_report(self.histo_protocol)
+
+        self.assertEqual(
+            DailyMetricsRollup.objects.get(
+                date=old_day, histopathologist=self.histo
+            ).reports_finalized,
+            2,
+        )
+
+    def test_sent_report_stays_on_finalization_day(self):
+        report = self._finalized_report(self.histo_protocol)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.mark_as_sent("vet@example.com")
+
+        self.assertEqual(
+            DailyMetricsRollup.objects.get(
+                date=self.today, histopathologist=self.histo
+            ).reports_finalized,
+            1,
+        )
+
+    def test_task_without_days_reconciles_recent_days(self):
+        refresh_daily_metrics()
+
+        self.assertEqual(
+            set(DailyMetricsRollup.objects.values_list("date", flat=True)),
+            {self.today, self.yesterday},
+        )
+
+    def test_backfill_command(self):
+        out = StringIO()
+        call_command(
+            "backfill_metrics_rollup",
+            "--from",
+            self.yesterday.isoformat(),
+            "--to",
+            self.today.isoformat(),
+            stdout=out,
+        )
+
+        self.assertIn("Rollup rebuilt", out.getvalue())
+        self.assertEqual(DailyMetricsRollup.objects.count(), 2)
+
+
+class RollupDashboardViewsTest(DailyMetricsRollupTestCase):
+    """Volume and productivity widgets read from the rollup."""
+
+    def setUp(self):
+        super().setUp()
+        self._finalized_report(self.histo_protocol)
+        DailyMetricsRollup.rebuild_range(self.yesterday, self.today)
+        self.client.login(email="staff@example.com", password="testpass123")
+
+    def test_volume_view_reads_rollup(self):
+        response = self.client.get(
+            reverse("pages_api:dashboard_volume") + "?periodo=semana"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["total"],
+            {"protocolos_recibidos": 3, "informes_enviados": 1},
+        )
+
+    def test_productivity_view_reads_rollup(self):
+        response = self.client.get(
+            reverse("pages_api:dashboard_productivity") + "?periodo=semana"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_informes"], 1)
+        histo = response.context["histopatologos"][0]
+        self.assertEqual(histo["nombre"], "Ana López")
+        self.assertEqual(histo["tat_promedio_dias"], 4.0)
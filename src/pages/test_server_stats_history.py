@@ -0,0 +1,202 @@
+"""
+Tests for the downsampled server stats history.
+"""
+
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pages.models import ServerStatsSample
+from pages.tasks import maintain_server_stats_history, refresh_server_stats
+
+User = get_user_model()
+
+NOW = datetime(2026, 3, 10, 12, 2, 30, tzinfo=dt_timezone.utc)
+
+
+def payload(cpu, ram_used=1000, read_bytes=0, container_mem=None):
+    containers = []
+    if container_mem is not None:
+        containers.append(
+            {
+                "name": "web",
+                "memory_usage_bytes": container_mem,
+                "memory_percent": 10.0,
+                "cpu_percent": None,
+            }
+        )
+    return {
+        "system": {
+            "cpu": {"percent": cpu},
+            "ram": {"percent": 50.0, "used": ram_used},
+            "disk": {"percent": 70.0},
+            "io": {"read_bytes": read_bytes, "write_bytes": None},
+        },
+        "docker": {"containers": containers, "error": None},
+        "storage": None,
+    }
+
+
+Resolution = ServerStatsSample.Resolution
+
+
+class ServerStatsSampleTest(TestCase):
+    """Tests for recording, downsampling and retention."""
+
+    def test_record_extracts_metrics_and_containers(self):
+        sample = ServerStatsSample.record(
+            payload(12.5, container_mem=2048), at=NOW
+        )
+
+        self.assertEqual(sample.resolution, Resolution.RAW)
+        self.assertEqual(sample.cpu_percent, 12.5)
+        self.assertEqual(sample.ram_used, 1000)
+        self.assertEqual(sample.containers["web"]["memory_usage_bytes"], 2048)
+
+    def test_downsample_averages_completed_buckets_only(self):
+        start = datetime(2026, 3, 10, 11, 50, tzinfo=dt_timezone.utc)
+        for minute, cpu in enumerate([10, 20, 30, 40, 50, 60, 70]):
+            ServerStatsSample.record(
+                payload(cpu, read_bytes=minute * 100),
+                at=start + timedelta(minutes=minute),
+            )
+        # 12:00 bucket is still open
+        ServerStatsSample.record(payload(90), at=NOW)
+
+        created = ServerStatsSample.downsample(Resolution.FIVE_MINUTES, NOW)
+
+        self.assertEqual(created, 2)
+        first, second = ServerStatsSample.objects.filter(
+            resolution=Resolution.FIVE_MINUTES
+        )
+        self.assertEqual(first.timestamp, start)
+        self.assertEqual(first.sample_count, 5)
+        self.assertEqual(first.cpu_percent, 30.0)
+        # Cumulative I/O counters keep the last value of the bucket
+        self.assertEqual(first.io_read_bytes, 400)
+        self.assertEqual(second.cpu_percent, 65.0)
+
+    def test_downsample_is_incremental(self):
+        start = datetime(2026, 3, 10, 11, 50, tzinfo=dt_timezone.utc)
+        ServerStatsSample.record(payload(10), at=start)
+        ServerStatsSample.downsample(Resolution.FIVE_MINUTES, NOW)
+
+        self.assertEqual(
+            ServerStatsSample.downsample(Resolution.FIVE_MINUTES, NOW), 0
+        )
+
+    def test_hourly_average_is_weighted_by_sample_count(self):
+        hour = datetime(2026, 3, 10, 10, 0, tzinfo=dt_timezone.utc)
+        ServerStatsSample.objects.create(
+            resolution=Resolution.FIVE_MINUTES,
+            timestamp=hour,
+            sample_count=4,
+            cpu_percent=10.0,
+        )
+        ServerStatsSample.objects.create(
+            resolution=Resolution.FIVE_MINUTES,
+            timestamp=hour + timedelta(minutes=5),
+            sample_count=1,
+            cpu_percent=60.0,
+        )
+
+        ServerStatsSample.downsample(Resolution.HOURLY, NOW)
+
+        hourly = ServerStatsSample.objects.get(resolution=Resolution.HOURLY)
+        self.assertEqual(hourly.sample_count, 5)
+        self.assertEqual(hourly.cpu_percent, 20.0)
+
+    @override_settings(
+        SERVER_STATS_RAW_RETENTION_HOURS=24,
+        SERVER_STATS_5MIN_RETENTION_DAYS=30,
+    )
+    def test_retention_deletes_old_rows_per_resolution(self):
+        ServerStatsSample.record(payload(1), at=NOW - timedelta(hours=25))
+        ServerStatsSample.record(payload(2), at=NOW - timedelta(hours=23))
+        ServerStatsSample.objects.create(
+            resolution=Resolution.FIVE_MINUTES,
+            timestamp=NOW - timedelta(days=2),
+        )
+
+        deleted = ServerStatsSample.enforce_retention(NOW)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            ServerStatsSample.objects.filter(
+                resolution=Resolution.RAW
+            ).count(),
+            1,
+        )
+
+    def test_tasks_record_and_maintain_history(self):
+        refresh_server_stats()
+        result = maintain_server_stats_history()
+
+        self.assertEqual(
+            ServerStatsSample.objects.filter(
+                resolution=Resolution.RAW
+            ).count(),
+            1,
+        )
+        self.assertIn("created", result)
+
+
+class ServerStatsHistoryViewTest(TestCase):
+    """Tests for the history range API."""
+
+    def setUp(self):
+        self.url = reverse("pages_api:dashboard_server_stats_history")
+        User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",
+            role=User.Role.ADMIN,
+        )
+        User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+
+    def test_history_requires_admin(self):
+        self.client.login(email="staff@example.com", password="testpass123")
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_history_returns_points_in_range(self):
+        old = ServerStatsSample.record(payload(10))
+        old.timestamp -= timedelta(hours=30)
+        old.save()
+        ServerStatsSample.record(payload(20))
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["resolucion"], Resolution.RAW)
+        self.assertEqual(
+            [point["cpu_percent"] for point in data["points"]], [20]
+        )
+
+    def test_older_ranges_use_coarser_resolution(self):
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        response = self.client.get(
+            self.url, {"desde": "2020-01-01T00:00:00+00:00"}
+        )
+
+        self.assertEqual(response.json()["resolucion"], Resolution.HOURLY)
+
+    def test_invalid_parameters_return_400(self):
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        self.assertEqual(
+            self.client.get(self.url, {"desde": "ayer"}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(self.url, {"resolucion": "1d"}).status_code, 400
+        )
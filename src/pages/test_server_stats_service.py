@@ -1,19 +1,41 @@
 """
 Tests for server statistics service (admin dashboard monitoring).
 
-Tests get_system_stats() and get_docker_stats() with mocked psutil and docker.
+Tests get_system_stats() and get_docker_stats() with mocked psutil and docker,
+and get_media_bucket_stats() against the stored usage counters.
 """
 
+import socket
+import threading
+import time
+from collections import namedtuple
 from unittest.mock import MagicMock, patch
 
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
+from pages.models import MediaPrefixUsage
 from services.server_stats_service import (
     get_docker_stats,
     get_media_bucket_stats,
     get_system_stats,
+    reset_docker_client,
 )
 
+CpuTimes = namedtuple("CpuTimes", "user system idle iowait guest")
+
+
+def mock_counters(mock_psutil, busy=0.0, idle=0.0, read_count=0, bytes_sent=0):
+    """Configure cumulative CPU time and network counters."""
+    mock_psutil.cpu_times.return_value = CpuTimes(busy, 0.0, idle, 0.0, 0.0)
+    mock_psutil.boot_time.return_value = 1000.0
+    mock_psutil.net_io_counters.return_value = MagicMock(
+        bytes_sent=bytes_sent, bytes_recv=0
+    )
+    io = mock_psutil.disk_io_counters.return_value
+    if io is not None:
+        io.read_count = read_count
+        io.write_count = 0
+
 
 class GetSystemStatsTest(SimpleTestCase):
     """Tests for get_system_stats()."""
@@ -37,6 +59,8 @@ class GetSystemStatsTest(SimpleTestCase):
         mock_io = MagicMock(read_bytes=1000, write_bytes=2000)
         mock_psutil.disk_io_counters.return_value = mock_io
 
+        mock_counters(mock_psutil)
+
         result = get_system_stats()
 
         self.assertIn("cpu", result)
@@ -68,6 +92,7 @@ class GetSystemStatsTest(SimpleTestCase):
             total=1024, used=512, free=512, percent=50.0
         )
         mock_psutil.disk_io_counters.return_value = None
+        mock_counters(mock_psutil)
 
         result = get_system_stats()
 
@@ -76,10 +101,7 @@ class GetSystemStatsTest(SimpleTestCase):
         self.assertEqual(result["io"]["read_human"], "—")
         self.assertEqual(result["io"]["write_human"], "—")
 
-    @patch("services.server_stats_service.psutil")
-    def test_cpu_percent_called_with_interval(self, mock_psutil):
-        """cpu_percent is called with interval=0.1 for sampling."""
-        mock_psutil.cpu_percent.return_value = 5.0
+    def _mock_system(self, mock_psutil, read_bytes=0, **counters):
         mock_psutil.virtual_memory.return_value = MagicMock(
             total=1024, used=256, available=768, percent=25.0
         )
@@ -87,17 +109,117 @@ class GetSystemStatsTest(SimpleTestCase):
             total=1024, used=256, free=768, percent=25.0
         )
         mock_psutil.disk_io_counters.return_value = MagicMock(
-            read_bytes=0, write_bytes=0
+            read_bytes=read_bytes, write_bytes=0
+        )
+        mock_counters(mock_psutil, **counters)
+
+    @patch("services.server_stats_service.time")
+    @patch("services.server_stats_service.psutil")
+    def test_cpu_and_rates_from_counter_deltas(self, mock_psutil, mock_time):
+        """CPU % and I/O rates come from deltas against the previous sample."""
+        mock_time.time.return_value = 1000.0
+        self._mock_system(mock_psutil, busy=100.0, idle=300.0)
+        previous = get_system_stats()
+
+        mock_time.time.return_value = 1010.0
+        self._mock_system(
+            mock_psutil,
+            read_bytes=20480,
+            busy=130.0,
+            idle=310.0,
+            read_count=50,
+            bytes_sent=1000,
+        )
+        result = get_system_stats(previous)
+
+        mock_psutil.cpu_percent.assert_called_once_with(interval=None)
+        self.assertEqual(result["cpu"]["percent"], 75.0)
+        self.assertEqual(result["interval_seconds"], 10.0)
+        self.assertEqual(result["io"]["read_bytes_per_sec"], 2048.0)
+        self.assertEqual(result["io"]["read_rate_human"], "2.0 KB/s")
+        self.assertEqual(result["io"]["read_iops"], 5.0)
+        self.assertEqual(result["net"]["sent_per_sec"], 100.0)
+
+    @patch("services.server_stats_service.psutil")
+    def test_cpu_percent_never_blocks(self, mock_psutil):
+        """Without a previous sample cpu_percent is read with interval=None."""
+        mock_psutil.cpu_percent.return_value = 5.0
+        self._mock_system(mock_psutil)
+
+        result = get_system_stats()
+
+        mock_psutil.cpu_percent.assert_called_once_with(interval=None)
+        self.assertEqual(result["cpu"]["percent"], 5.0)
+        self.assertIsNone(result["io"]["read_bytes_per_sec"])
+        self.assertEqual(result["net"]["sent_rate_human"], "—")
+
+    @patch("services.server_stats_service.psutil")
+    def test_counter_reset_gives_no_rate(self, mock_psutil):
+        """A counter lower than before (reboot) yields None, not a negative rate."""
+        self._mock_system(mock_psutil, read_bytes=10)
+        previous = {
+            "counters": {
+                "timestamp": 1.0,
+                "host": socket.gethostname(),
+                "boot_time": 1000.0,
+                "read_bytes": 5000,
+                "cpu_total": 0,
+            }
+        }
+
+        result = get_system_stats(previous)
+
+        self.assertIsNone(result["io"]["read_bytes_per_sec"])
+
+    @patch("services.server_stats_service.time")
+    @patch("services.server_stats_service.psutil")
+    def test_sample_from_other_boot_or_host_is_ignored(
+        self, mock_psutil, mock_time
+    ):
+        """Grown counters from another boot or host give no rate."""
+        mock_time.time.return_value = 1000.0
+        self._mock_system(mock_psutil, busy=100.0, idle=300.0)
+        previous = get_system_stats()
+        mock_time.time.return_value = 1010.0
+        self._mock_system(
+            mock_psutil, read_bytes=20480, busy=130.0, idle=310.0
         )
 
-        get_system_stats()
+        for key, value in (("boot_time", 500.0), ("host", "other-host")):
+            with self.subTest(key=key):
+                mock_psutil.cpu_percent.return_value = 5.0
+                stale = {"counters": {**previous["counters"], key: value}}
 
-        mock_psutil.cpu_percent.assert_called_once_with(interval=0.1)
+                result = get_system_stats(stale)
+
+                self.assertEqual(result["cpu"]["percent"], 5.0)
+                self.assertIsNone(result["io"]["read_bytes_per_sec"])
+                self.assertIsNone(result["interval_seconds"])
 
 
 class GetDockerStatsTest(SimpleTestCase):
     """Tests for get_docker_stats()."""
 
+    def setUp(self):
+        reset_docker_client()
+        self.addCleanup(reset_docker_client)
+
+    def _container(self, name, stats=None):
+        container = MagicMock()
+        container.name = name
+        container.status = "running"
+        container.image.tags = ["adlab:latest"]
+        container.attrs = {"State": {}}
+        container.stats.side_effect = stats or (lambda stream: {})
+        return container
+
+    def _docker(self, containers):
+        mock_client = MagicMock()
+        mock_client.containers.list.return_value = containers
+        mock_docker = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        return mock_docker
+
     def test_docker_client_exception_returns_error(self):
         """When docker.from_env() raises, returns error and empty containers."""
         mock_docker = MagicMock()
@@ -207,6 +329,74 @@ class GetDockerStatsTest(SimpleTestCase):
         self.assertIsNone(result["containers"][0]["memory_percent"])
         self.assertIsNone(result["containers"][0]["cpu_percent"])
 
+        self.assertEqual(
+            result["containers"][0]["stats_error"], "stats failed"
+        )
+        self.assertTrue(result["partial"])
+
+    def test_client_is_reused_between_calls(self):
+        mock_docker = self._docker([self._container("web")])
+
+        with patch.dict("sys.modules", {"docker": mock_docker}):
+            get_docker_stats()
+            result = get_docker_stats()
+
+        mock_docker.from_env.assert_called_once()
+        self.assertFalse(result["partial"])
+
+    def test_client_is_recreated_after_connection_error(self):
+        mock_docker = self._docker([])
+        client = mock_docker.from_env.return_value
+        client.containers.list.side_effect = [Exception("socket closed"), []]
+
+        with patch.dict("sys.modules", {"docker": mock_docker}):
+            self.assertEqual(get_docker_stats()["error"], "socket closed")
+            self.assertIsNone(get_docker_stats()["error"])
+
+        self.assertEqual(mock_docker.from_env.call_count, 2)
+
+    @override_settings(DOCKER_STATS_TIMEOUT=0.2)
+    def test_stats_are_collected_in_parallel_with_timeout(self):
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def slow(stream):
+            time.sleep(0.1)
+            return {"memory_stats": {"usage": 1, "limit": 2}}
+
+        def stuck(stream):
+            released.wait(5)
+            return {}
+
+        containers = [self._container(f"web-{i}", slow) for i in range(4)]
+        containers.append(self._container("hung", stuck))
+        mock_docker = self._docker(containers)
+
+        started = time.monotonic()
+        with patch.dict("sys.modules", {"docker": mock_docker}):
+            result = get_docker_stats()
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.4)
+        self.assertTrue(result["partial"])
+        by_name = {c["name"]: c for c in result["containers"]}
+        self.assertEqual(by_name["web-3"]["memory_percent"], 50.0)
+        self.assertIsNone(by_name["web-3"]["stats_error"])
+        self.assertEqual(
+            by_name["hung"]["stats_error"], "Tiempo de espera agotado"
+        )
+        self.assertEqual([c["name"] for c in result["containers"]][-1], "hung")
+
+    def test_name_filter_skips_other_containers(self):
+        other = self._container("worker")
+        mock_docker = self._docker([self._container("web"), other])
+
+        with patch.dict("sys.modules", {"docker": mock_docker}):
+            result = get_docker_stats(name_filter="web")
+
+        self.assertEqual([c["name"] for c in result["containers"]], ["web"])
+        other.stats.assert_not_called()
+
 
 class GetMediaBucketStatsTest(SimpleTestCase):
     """Tests for get_media_bucket_stats()."""
@@ -225,54 +415,37 @@ class GetMediaBucketStatsTest(SimpleTestCase):
         mock_settings.USE_S3_STORAGE = False
         self.assertIsNone(get_media_bucket_stats())
 
-    @patch("django.core.cache.cache")
-    @patch("django.conf.settings")
-    def test_returns_stats_when_s3_enabled(self, mock_settings, mock_cache):
-        """When S3 is enabled and storage is mocked, returns bucket stats."""
-        mock_settings.TESTING = False
-        mock_settings.USE_S3_STORAGE = True
-        mock_cache.get.return_value = None
 
-        mock_paginator = MagicMock()
-        mock_paginator.paginate.return_value = [
-            {"Contents": [{"Size": 100}, {"Size": 200}]}
-        ]
-        mock_client = MagicMock()
-        mock_client.get_paginator.return_value = mock_paginator
-        mock_bucket = MagicMock()
-        mock_bucket.name = "adlab-media"
-        mock_storage = MagicMock()
-        mock_storage.bucket = mock_bucket
-        mock_storage.connection.meta.client = mock_client
-
-        with patch("django.core.files.storage.default_storage", mock_storage):
-            result = get_media_bucket_stats()
+@override_settings(TESTING=False, USE_S3_STORAGE=True)
+class GetMediaBucketStatsCountersTest(TestCase):
+    """get_media_bucket_stats() reads the stored usage counters."""
 
-            assert result is not None
-            self.assertEqual(result["bucket"], "adlab-media")
-            self.assertEqual(result["object_count"], 2)
-            self.assertEqual(result["total_size_bytes"], 300)
-            mock_cache.set.assert_called_once()
+    def setUp(self):
+        self.storage = MagicMock(bucket_name="adlab-media")
 
-    @patch("django.core.cache.cache")
-    @patch("django.conf.settings")
-    def test_returns_none_on_list_error(self, mock_settings, mock_cache):
-        """When list_objects_v2 raises, returns None and does not raise."""
-        mock_settings.TESTING = False
-        mock_settings.USE_S3_STORAGE = True
-        mock_cache.get.return_value = None
+    def test_returns_totals_without_listing_bucket(self):
+        MediaPrefixUsage.record_change("signatures/a.png", 1, 100)
+        MediaPrefixUsage.record_change("reports/b.pdf", 1, 200)
 
-        mock_paginator = MagicMock()
-        mock_paginator.paginate.side_effect = Exception("S3 error")
-        mock_client = MagicMock()
-        mock_client.get_paginator.return_value = mock_paginator
-        mock_bucket = MagicMock()
-        mock_bucket.name = "adlab-media"
-        mock_storage = MagicMock()
-        mock_storage.bucket = mock_bucket
-        mock_storage.connection.meta.client = mock_client
-
-        with patch("django.core.files.storage.default_storage", mock_storage):
+        with (
+            patch("django.core.files.storage.default_storage", self.storage),
+            self.assertNumQueries(2),
+        ):
             result = get_media_bucket_stats()
 
-        self.assertIsNone(result)
+        assert result is not None
+        self.assertEqual(result["bucket"], "adlab-media")
+        self.assertEqual(result["object_count"], 2)
+        self.assertEqual(result["total_size_bytes"], 300)
+        self.assertEqual(
+            result["prefixes"]["reports"],
+            {"object_count": 1, "total_size_bytes": 200},
+        )
+        self.assertIsNone(result["reconciled_at"])
+        self.storage.connection.meta.client.get_paginator.assert_not_called()
+
+    def test_returns_none_without_bucket(self):
+        with patch(
+            "django.core.files.storage.default_storage", MagicMock(spec=[])
+        ):
+            self.assertIsNone(get_media_bucket_stats())
@@ -5,12 +5,15 @@ from django import get_version
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Avg, Case, Count, F, IntegerField, Q, When
-from django.db.models.functions import Extract
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncDate
 from django.shortcuts import redirect, render
 from django.utils import timezone
 from django.views.generic import TemplateView, View
 
+from pages import dashboard_cache
+from protocols.db_functions import DaysBetween
 from protocols.models import Protocol, Report
 
 User = get_user_model()
@@ -228,65 +231,9 @@ class LabStaffDashboardView(LoginRequiredMixin, TemplateView):
 
         # Add report-related data if user can create reports
         if self.can_create_reports:
-            from django.core.cache import cache
-
-            from protocols.models import Report
-
-            # Cache report dashboard data for 2 minutes
-            cache_key = f"lab_staff_reports_dashboard_{user.id}"
-            report_data = cache.get(cache_key)
-
-            if report_data is None:
-                # Get report statistics
-                now = timezone.now()
-                month_start = now.replace(
-                    day=1, hour=0, minute=0, second=0, microsecond=0
-                )
-
-                # Get all statistics in one query using aggregation
-                stats = Report.objects.aggregate(
-                    pending_count=Count(
-                        "id", filter=Q(status=Report.Status.DRAFT)
-                    ),
-                    monthly_count=Count(
-                        "id",
-                        filter=Q(
-                            status=Report.Status.FINALIZED,
-                            updated_at__gte=month_start,
-                        ),
-                    ),
-                    avg_tat=Avg(
-                        Case(
-                            When(
-                                status=Report.Status.FINALIZED,
-                                protocol__reception_date__isnull=False,
-                                then=Extract(
-                                    F("updated_at")
-                                    - F("protocol__reception_date"),
-                                    "days",
-                                ),
-                            ),
-                            default=None,
-                            output_field=IntegerField(),
-                        )
-                    ),
-                )
-
-                # Get pending reports list
-                pending_reports_list = (
-                    Report.objects.filter(status=Report.Status.DRAFT)
-                    .select_related("protocol__veterinarian")
-                    .order_by("created_at")[:10]
-                )
-
-                report_data = {
-                    "pending_reports_count": stats["pending_count"] or 0,
-                    "monthly_reports_count": stats["monthly_count"] or 0,
-                    "avg_report_time": round(stats["avg_tat"] or 0, 1),
-                    "pending_reports_list": list(pending_reports_list),
-                }
-
-                cache.set(cache_key, report_data, 120)  # Cache for 2 minutes
+            report_data = dashboard_cache.get_or_compute(
+                "lab_staff_reports_dashboard"
+            )
 
             # Add report data to context
             context.update(
@@ -304,6 +251,57 @@ class LabStaffDashboardView(LoginRequiredMixin, TemplateView):
 
         return context
 
+    @staticmethod
+    def _calculate_report_data():
+        """Lab-wide report statistics shown to staff who create reports."""
+        now = timezone.now()
+        month_start = now.replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+
+        # Get all statistics in one query using aggregation
+        stats = Report.objects.aggregate(
+            pending_count=Count("id", filter=Q(status=Report.Status.DRAFT)),
+            monthly_count=Count(
+                "id",
+                filter=Q(
+                    status=Report.Status.FINALIZED,
+                    updated_at__gte=month_start,
+                ),
+            ),
+        )
+        # Finalization time measured on the protocol stage timestamps
+        avg_tat = Protocol.objects.filter(
+            finalized_at__isnull=False, received_at__isnull=False
+        ).aggregate(
+            avg_tat=Avg(
+                DaysBetween(
+                    TruncDate("finalized_at"), TruncDate("received_at")
+                )
+            )
+        )["avg_tat"]
+
+        # Get pending reports list
+        pending_reports_list = (
+            Report.objects.filter(status=Report.Status.DRAFT)
+            .select_related("protocol__veterinarian")
+            .order_by("created_at")[:10]
+        )
+
+        return {
+            "pending_reports_count": stats["pending_count"] or 0,
+            "monthly_reports_count": stats["monthly_count"] or 0,
+            "avg_report_time": round(avg_tat or 0, 1),
+            "pending_reports_list": list(pending_reports_list),
+        }
+
+
+dashboard_cache.register(
+    "lab_staff_reports_dashboard",
+    [dashboard_cache.REPORTS],
+    LabStaffDashboardView._calculate_report_data,
+)
+
 
 class AdminDashboardView(LoginRequiredMixin, TemplateView):
     """
@@ -353,27 +351,21 @@ class AdminDashboardView(LoginRequiredMixin, TemplateView):
             last_login_at__gte=thirty_days_ago
         ).count()
 
-        # Calculate average TAT (simplified)
-        avg_tat_days = 0
-        completed_protocols = Protocol.objects.filter(
-            status=Protocol.Status.REPORT_SENT, reception_date__isnull=False
-        ).order_by("-updated_at")[:100]
-
-        if completed_protocols:
-            total_days = 0
-            count = 0
-            for protocol in completed_protocols:
-                if protocol.reception_date:
-                    days = (
-                        protocol.updated_at.date()
-                        - protocol.reception_date.date()
-                    ).days
-                    if days >= 0:
-                        total_days += days
-                        count += 1
-
-            if count > 0:
-                avg_tat_days = round(total_days / count, 1)
+        # Average TAT of the last 100 finalized protocols
+        avg_tat_days = (
+            Protocol.objects.filter(
+                finalized_at__isnull=False, received_at__isnull=False
+            )
+            .order_by("-finalized_at")[:100]
+            .aggregate(
+                avg_tat=Avg(
+                    DaysBetween(
+                        TruncDate("finalized_at"), TruncDate("received_at")
+                    )
+                )
+            )["avg_tat"]
+        )
+        avg_tat_days = round(avg_tat_days or 0, 1)
 
         # Get recent activities (simplified)
         recent_activities = [
@@ -441,6 +433,11 @@ class ManagementDashboardView(LoginRequiredMixin, TemplateView):
             {
                 "user": user,
                 "is_management_user": True,
+                # The event stream holds its connection open, so it is only
+                # opened when an ASGI server serves it; otherwise the page
+                # keeps to the batch refresh
+                "live_events_enabled": settings.DASHBOARD_EVENTS_ENABLED
+                or isinstance(self.request, ASGIRequest),
             }
         )
 
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models.functions import Coalesce, Now
 from django.utils.html import format_html, mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -138,6 +139,11 @@ class ProtocolAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
         "get_editable_status",
+        "received_at",
+        "processing_started_at",
+        "ready_at",
+        "finalized_at",
+        "sent_at",
     ]
     date_hierarchy = "submission_date"
 
@@ -208,6 +214,19 @@ class ProtocolAdmin(admin.ModelAdmin):
                 "classes": ("collapse",),
             },
         ),
+        (
+            _("Workflow Timestamps"),
+            {
+                "fields": (
+                    "received_at",
+                    "processing_started_at",
+                    "ready_at",
+                    "finalized_at",
+                    "sent_at",
+                ),
+                "classes": ("collapse",),
+            },
+        ),
         (
             _("Metadata"),
             {
@@ -308,7 +327,8 @@ class ProtocolAdmin(admin.ModelAdmin):
     def mark_as_processing(self, request, queryset):
         """Mark selected protocols as processing."""
         count = queryset.filter(status=Protocol.Status.RECEIVED).update(
-            status=Protocol.Status.PROCESSING
+            status=Protocol.Status.PROCESSING,
+            processing_started_at=Coalesce("processing_started_at", Now()),
         )
 
         # Log status changes
@@ -333,7 +353,8 @@ class ProtocolAdmin(admin.ModelAdmin):
 
         logger = logging.getLogger(__name__)
         count = queryset.filter(status=Protocol.Status.PROCESSING).update(
-            status=Protocol.Status.READY
+            status=Protocol.Status.READY,
+            ready_at=Coalesce("ready_at", Now()),
         )
 
         # Log status changes and send notifications
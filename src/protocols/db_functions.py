@@ -0,0 +1,80 @@
+"""
+Database expressions shared by protocol listings and dashboard metrics.
+"""
+
+from django.db.models import (
+    Aggregate,
+    FloatField,
+    Func,
+    IntegerField,
+    Subquery,
+)
+
+
+class DaysBetween(Func):
+    """
+    Whole days from `start` to `end`, both date expressions.
+
+    Wrap datetime columns in TruncDate() so the day boundary follows the
+    active time zone. PostgreSQL subtracts dates natively (integer result);
+    SQLite goes through julianday().
+    """
+
+    arity = 2
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template="(%(expressions)s)",
+            arg_joiner=" - ",
+            **extra_context,
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+
+class PercentileCont(Aggregate):
+    """
+    PostgreSQL ordered-set aggregate percentile_cont(fraction).
+
+    Returns the interpolated value at `fraction` (0..1) of the ordered
+    input. Only available on PostgreSQL.
+    """
+
+    function = "PERCENTILE_CONT"
+    name = "PercentileCont"
+    output_field = FloatField()
+    template = (
+        "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    )
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class SubqueryCount(Subquery):
+    """
+    Row count of a (correlated) queryset, as a scalar subquery.
+
+    Unlike Count() over a relation, each subquery aggregates its relation
+    on its own, so counting two to-many relations of the same row does not
+    join them against each other.
+    """
+
+    template = "(SELECT COUNT(*) FROM (%(subquery)s) _count)"
+    output_field = IntegerField()
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values("pk"), **extra)
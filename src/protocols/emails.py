@@ -7,6 +7,7 @@ import logging
 
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 
 from protocols.models import EmailLog, NotificationPreference
 from protocols.tasks import send_email
@@ -259,6 +260,56 @@ def send_sample_rejection_notification(protocol):
     )
 
 
+def send_bulk_reception_notification(veterinarian, protocols):
+    """
+    Send one reception notification for a batch of a veterinarian's samples.
+
+    Args:
+        veterinarian: Veterinarian instance
+        protocols: Received Protocol instances of this veterinarian
+
+    Returns:
+        EmailLog or None: Created email log instance, or None if not sent
+    """
+    prefs, _ = NotificationPreference.objects.get_or_create(
+        veterinarian=veterinarian
+    )
+    if not prefs.should_send("sample_reception"):
+        logger.info(
+            f"Bulk reception notification skipped for {veterinarian} (preferences)"
+        )
+        return None
+
+    recipient_email = prefs.get_recipient_email()
+
+    # Plain values: the template needs no model lookups in the worker
+    received = [
+        {
+            "protocol_number": protocol.protocol_number,
+            "analysis_type": protocol.get_analysis_type_display(),
+            "animal_identification": protocol.animal_identification,
+            "species": protocol.species,
+            "protocol_url": build_protocol_url(protocol),
+        }
+        for protocol in protocols
+    ]
+
+    return queue_email(
+        email_type=EmailLog.EmailType.SAMPLE_RECEPTION,
+        recipient_email=recipient_email,
+        subject=f"Muestras recibidas - {len(received)} protocolos",
+        context={
+            "veterinarian": veterinarian,
+            "protocols": received,
+            "reception_date": timezone.localtime(
+                protocols[0].reception_date
+            ).strftime("%d/%m/%Y %H:%M"),
+        },
+        template_name="emails/bulk_sample_reception.html",
+        veterinarian=veterinarian,
+    )
+
+
 def send_report_ready_notification(protocol, report_pdf_path=None):
     """
     Send report ready notification with optional PDF attachment.
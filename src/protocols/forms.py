@@ -921,6 +921,76 @@ class ReceptionForm(forms.Form):
         return cleaned_data
 
 
+class ReceptionBulkForm(forms.Form):
+    """Form to receive a batch of protocols by their temporary codes."""
+
+    MAX_PROTOCOLS = 100
+
+    temporary_codes = forms.CharField(
+        label=_("Códigos temporales"),
+        widget=forms.Textarea(
+            attrs={
+                "class": "block w-full px-3 py-2 border border-gray-300 rounded-lg shadow-sm placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200 font-mono",
+                "rows": 10,
+                "placeholder": _("Un código por línea (escanee cada muestra)"),
+                "autofocus": True,
+            }
+        ),
+        help_text=_(
+            "Escanee o ingrese los códigos temporales de todas las muestras de la caja"
+        ),
+    )
+
+    sample_condition = forms.ChoiceField(
+        label=_("Condición de las muestras"),
+        choices=[
+            choice
+            for choice in Protocol.SampleCondition.choices
+            if choice[0] != Protocol.SampleCondition.REJECTED
+        ],
+        initial=Protocol.SampleCondition.OPTIMAL,
+        widget=forms.RadioSelect(
+            attrs={
+                "class": "h-4 w-4 text-blue-600 focus:ring-blue-500 border-gray-300 rounded transition-colors duration-200"
+            }
+        ),
+        help_text=_(
+            "Las muestras rechazadas o con discrepancias deben recepcionarse individualmente"
+        ),
+    )
+
+    reception_notes = forms.CharField(
+        label=_("Observaciones de recepción"),
+        required=False,
+        widget=forms.Textarea(
+            attrs={
+                "class": "block w-full h-10 px-3 py-2 border border-gray-300 rounded-lg shadow-sm placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200",
+                "rows": 3,
+                "placeholder": _("Observaciones comunes a todas las muestras"),
+            }
+        ),
+    )
+
+    def clean_temporary_codes(self):
+        """Split, normalize and deduplicate the codes, keeping scan order."""
+        raw = self.cleaned_data.get("temporary_codes", "")
+        codes = list(
+            dict.fromkeys(
+                code.strip().upper()
+                for code in raw.replace(",", "\n").splitlines()
+                if code.strip()
+            )
+        )
+        if not codes:
+            raise ValidationError(_("Ingrese al menos un código temporal"))
+        if len(codes) > self.MAX_PROTOCOLS:
+            raise ValidationError(
+                _("No se pueden recepcionar más de %(max)d muestras a la vez")
+                % {"max": self.MAX_PROTOCOLS}
+            )
+        return codes
+
+
 class ProtocolResubmitForm(forms.Form):
     """Form to resubmit a rejected protocol with a reason."""
 
@@ -1401,7 +1471,7 @@ class ReceptionPendingFilterForm(forms.Form):
         widget=forms.TextInput(
             attrs={
                 "class": "block w-full h-10 px-3 py-2 border border-gray-300 rounded-lg shadow-sm focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200",
-                "placeholder": "Nombre del animal",
+                "placeholder": "Animal, propietario, especie...",
             }
         ),
     )
@@ -1460,7 +1530,7 @@ class ReceptionHistoryFilterForm(forms.Form):
         widget=forms.TextInput(
             attrs={
                 "class": "block w-full h-10 px-3 py-2 border border-gray-300 rounded-lg shadow-sm focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200",
-                "placeholder": "Nombre del animal",
+                "placeholder": "Animal, propietario, especie...",
             }
         ),
     )
@@ -0,0 +1,197 @@
+"""
+Management command comparing query plans of partial code lookups.
+
+Seeds a synthetic dataset (200k protocols by default) inside a transaction,
+then runs the reception code and veterinarian identifier lookups with
+EXPLAIN ANALYZE twice: with the pg_trgm indexes from protocols migration
+0018 / accounts migration 0009 and with those indexes dropped inside a
+savepoint. Everything is rolled back at the end unless --keep is given.
+
+PostgreSQL only. Dropping an index takes an exclusive lock on its table,
+so run it against a scratch copy of the database:
+
+  make manage ARGS="benchmark_code_search"
+  make manage ARGS="benchmark_code_search --protocols 50000 -v 2"
+"""
+
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models import Veterinarian
+from protocols.models import Protocol
+from protocols.services.search_service import ProtocolSearchService
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed protocols in a rolled-back transaction and compare plans of "
+        "code/identifier lookups with and without trigram indexes "
+        "(PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--protocols",
+            type=int,
+            default=200_000,
+            help="Protocols to seed (default: 200000).",
+        )
+        parser.add_argument(
+            "--veterinarians",
+            type=int,
+            default=1000,
+            help="Veterinarians to seed (default: 1000).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the seeded data instead of rolling it back.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark requires PostgreSQL.")
+        self.verbosity = options["verbosity"]
+        protocols = max(1, options["protocols"])
+        vets = max(1, options["veterinarians"])
+
+        with transaction.atomic():
+            started = time.monotonic()
+            self._seed(protocols, vets)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE protocols_protocol")
+                cursor.execute("ANALYZE accounts_veterinarian")
+            self.stdout.write(
+                f"Seeded {protocols} protocols and {vets} veterinarians "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+
+            indexes = self._trigram_indexes()
+            if not indexes:
+                self.stdout.write(
+                    self.style.WARNING(
+                        "No trigram indexes found (is pg_trgm installed "
+                        "and migrated?); both plans will be the same."
+                    )
+                )
+            for label, queryset in self._queries(protocols, vets):
+                with_indexes = queryset.explain(analyze=True)
+                savepoint = transaction.savepoint()
+                with connection.cursor() as cursor:
+                    for name in indexes:
+                        cursor.execute(f"DROP INDEX {name}")
+                without_indexes = queryset.explain(analyze=True)
+                transaction.savepoint_rollback(savepoint)
+                self._report(label, without_indexes, with_indexes)
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def _seed(self, protocols, vets):
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create(
+            User(
+                username=f"bench-{tag}-{i}",
+                email=f"bench-{tag}-{i}@example.com",
+                role=User.Role.VETERINARIO,
+            )
+            for i in range(vets)
+        )
+        veterinarians = Veterinarian.objects.bulk_create(
+            Veterinarian(
+                user=user,
+                first_name="Bench",
+                last_name=f"Vet {i}",
+                license_number=f"MP-{tag}-{i:05d}",
+                cuil_cuit=f"20-{30000000 + i}-{i % 10}",
+                dni=f"{30000000 + i}",
+                phone="0",
+                email=user.email,
+            )
+            for i, user in enumerate(users)
+        )
+
+        today = date.today()
+        batch = []
+        for i in range(protocols):
+            kind = "HP" if i % 2 else "CT"
+            submitted = today - timedelta(days=i % 730)
+            batch.append(
+                Protocol(
+                    veterinarian=veterinarians[i % vets],
+                    analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY
+                    if kind == "HP"
+                    else Protocol.AnalysisType.CYTOLOGY,
+                    status=Protocol.Status.READY,
+                    temporary_code=(
+                        f"TMP-{kind}-{submitted:%Y%m%d}-{tag}{i:06d}"
+                    ),
+                    protocol_number=f"{kind} {submitted:%y}/{i:06d}",
+                    submission_date=submitted,
+                    species="Canino",
+                    animal_identification=f"Animal {i}",
+                    presumptive_diagnosis="Benchmark",
+                )
+            )
+            if len(batch) == BATCH_SIZE:
+                Protocol.objects.bulk_create(batch)
+                batch = []
+        Protocol.objects.bulk_create(batch)
+
+    def _queries(self, protocols, vets):
+        """Lookups issued by the reception views, with typical fragments."""
+        search = ProtocolSearchService()
+        middle = protocols // 2
+        return [
+            (
+                "temporary_code icontains",
+                Protocol.objects.filter(
+                    temporary_code__icontains=f"{middle:06d}"
+                ).values("pk"),
+            ),
+            (
+                "protocol code (temporary or number)",
+                Protocol.objects.filter(
+                    search.code_filter(f"/{middle:06d}")
+                ).values("pk"),
+            ),
+            (
+                "veterinarian license/CUIL/DNI",
+                Protocol.objects.filter(
+                    search.veterinarian_filter(f"{30000000 + vets // 2}")
+                ).values("pk"),
+            ),
+        ]
+
+    def _trigram_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE indexdef LIKE '%%gin_trgm_ops%%' "
+                "AND tablename IN ('protocols_protocol', "
+                "'accounts_veterinarian')"
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def _report(self, label, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for title, plan in (("before", before), ("after", after)):
+            lines = plan.splitlines()
+            execution = next(
+                (line for line in lines if line.startswith("Execution Time")),
+                "",
+            )
+            self.stdout.write(f"  {title}: {execution}")
+            # Full plan with -v 2, otherwise only how each table is read
+            shown = [
+                line for line in lines if self.verbosity >= 2 or "Scan" in line
+            ]
+            self.stdout.write("\n".join(f"    {line}" for line in shown))
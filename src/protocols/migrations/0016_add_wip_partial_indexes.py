@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0008_migrate_histopathologists_to_laboratory_staff"),
+        ("protocols", "0015_add_inapp_notifications"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cassette",
+            index=models.Index(
+                condition=models.Q(
+                    ("estado__in", ["pendiente", "en_proceso"])
+                ),
+                fields=["estado"],
+                name="cassette_wip_estado_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="protocol",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        ["submitted", "received", "processing", "ready"],
+                    )
+                ),
+                fields=["analysis_type", "status"],
+                name="protocol_wip_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="slide",
+            index=models.Index(
+                condition=models.Q(("estado__in", ["montado", "coloreado"])),
+                fields=["estado"],
+                name="slide_wip_estado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:36
+"""
+Add Protocol.search_vector for full-text search.
+
+On PostgreSQL a BEFORE INSERT/UPDATE trigger rebuilds the vector from the
+descriptive fields (Spanish configuration, accents removed with unaccent),
+existing rows are backfilled and a GIN index is created. Other backends
+only get the (always NULL) column; see protocols.services.search_service.
+"""
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+CREATE OR REPLACE FUNCTION protocols_protocol_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('spanish', unaccent(
+            coalesce(NEW.animal_identification, '') || ' ' ||
+            coalesce(NEW.owner_last_name, '') || ' ' ||
+            coalesce(NEW.owner_first_name, '')
+        )), 'A') ||
+        setweight(to_tsvector('spanish', unaccent(
+            coalesce(NEW.species, '') || ' ' || coalesce(NEW.breed, '')
+        )), 'B') ||
+        setweight(to_tsvector('spanish', unaccent(
+            coalesce(NEW.presumptive_diagnosis, '')
+        )), 'B') ||
+        setweight(to_tsvector('spanish', unaccent(
+            coalesce(NEW.clinical_history, '')
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER protocols_protocol_search_vector_trigger
+BEFORE INSERT OR UPDATE OF
+    animal_identification, owner_last_name, owner_first_name, species,
+    breed, presumptive_diagnosis, clinical_history
+ON protocols_protocol
+FOR EACH ROW EXECUTE FUNCTION protocols_protocol_search_vector_update();
+
+-- Backfill through the trigger
+UPDATE protocols_protocol SET animal_identification = animal_identification;
+
+CREATE INDEX protocol_search_vector_gin
+ON protocols_protocol USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS protocol_search_vector_gin;
+DROP TRIGGER IF EXISTS protocols_protocol_search_vector_trigger
+ON protocols_protocol;
+DROP FUNCTION IF EXISTS protocols_protocol_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(SEARCH_VECTOR_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0016_add_wip_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocol",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,57 @@
+"""
+pg_trgm GIN indexes for partial protocol code lookups.
+
+Reception staff search fragments of temporary codes and protocol numbers
+with `icontains`, which PostgreSQL runs as UPPER(column::text) LIKE
+'%...%'. B-tree indexes cannot serve that, so these trigram indexes are
+built on exactly the same expressions (see
+protocols.services.search_service).
+
+They only speed lookups up: if pg_trgm is not available on the server, or
+on other backends, the migration does nothing and queries stay correct.
+"""
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "protocol_temp_code_trgm": "temporary_code",
+    "protocol_number_trgm": "protocol_number",
+}
+
+
+def pg_trgm_available(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if not pg_trgm_available(schema_editor):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON protocols_protocol "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0017_add_protocol_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
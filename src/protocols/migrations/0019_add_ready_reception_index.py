@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-17 05:00
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0018_add_code_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="protocol",
+            index=models.Index(
+                models.OrderBy(
+                    django.db.models.functions.comparison.Coalesce(
+                        "reception_date", "created_at"
+                    ),
+                    descending=True,
+                ),
+                models.OrderBy(models.F("id"), descending=True),
+                condition=models.Q(("status", "ready")),
+                name="protocol_ready_reception_idx",
+            ),
+        ),
+    ]
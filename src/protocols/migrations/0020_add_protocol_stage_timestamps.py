@@ -0,0 +1,74 @@
+# Generated by Django 5.2.11 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0019_add_ready_reception_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocol",
+            name="finalized_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="informe finalizado el",
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocol",
+            name="processing_started_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="procesamiento iniciado el",
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocol",
+            name="ready_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="listo el"
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocol",
+            name="received_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="recibido el",
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocol",
+            name="sent_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="informe enviado el",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="protocol",
+            index=models.Index(
+                fields=["status", "received_at"],
+                name="protocol_status_received_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="protocol",
+            index=models.Index(
+                condition=models.Q(("finalized_at__isnull", False)),
+                fields=["finalized_at", "analysis_type", "received_at"],
+                name="protocol_finalized_tat_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+"""
+Data migration filling the protocol stage timestamps from the status
+history (and the reports, for protocols finalized or sent before the
+history recorded it).
+
+Each timestamp is the first time the protocol reached the stage:
+
+- received_at: reception_date; rejected protocols, whose reception_date
+  is the rejection time, only from a RECEIVED history entry.
+- processing_started_at: first PROCESSING entry.
+- ready_at: first READY entry other than the one logged on finalization.
+- finalized_at: first "Report finalized" entry, else the last update of the
+  earliest finalized or sent report.
+- sent_at: earliest report sent_date, else the first REPORT_SENT entry.
+"""
+
+from django.db import migrations
+from django.db.models import F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+FINALIZED_DESCRIPTION = "Report finalized"
+
+
+def backfill_stage_timestamps(apps, schema_editor):
+    Protocol = apps.get_model("protocols", "Protocol")
+    ProtocolStatusHistory = apps.get_model(
+        "protocols", "ProtocolStatusHistory"
+    )
+    Report = apps.get_model("protocols", "Report")
+
+    def first_history(*conditions, **filters):
+        return Subquery(
+            ProtocolStatusHistory.objects.filter(
+                *conditions, protocol=OuterRef("pk"), **filters
+            )
+            .values("protocol")
+            .annotate(first=Min("changed_at"))
+            .values("first")[:1]
+        )
+
+    def first_report(field, **filters):
+        return Subquery(
+            Report.objects.filter(protocol=OuterRef("pk"), **filters)
+            .values("protocol")
+            .annotate(first=Min(field))
+            .values("first")[:1]
+        )
+
+    Protocol.objects.filter(received_at__isnull=True).exclude(
+        status="rejected"
+    ).update(
+        received_at=Coalesce(
+            F("reception_date"), first_history(status="received")
+        )
+    )
+    Protocol.objects.filter(
+        received_at__isnull=True, status="rejected"
+    ).update(received_at=first_history(status="received"))
+    Protocol.objects.filter(processing_started_at__isnull=True).update(
+        processing_started_at=first_history(status="processing")
+    )
+    Protocol.objects.filter(ready_at__isnull=True).update(
+        ready_at=first_history(
+            ~Q(description=FINALIZED_DESCRIPTION), status="ready"
+        )
+    )
+    Protocol.objects.filter(finalized_at__isnull=True).update(
+        finalized_at=Coalesce(
+            first_history(status="ready", description=FINALIZED_DESCRIPTION),
+            first_report("updated_at", status__in=["finalized", "sent"]),
+        )
+    )
+    Protocol.objects.filter(sent_at__isnull=True).update(
+        sent_at=Coalesce(
+            first_report("sent_date", sent_date__isnull=False),
+            first_history(status="report_sent"),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0020_add_protocol_stage_timestamps"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_stage_timestamps, migrations.RunPython.noop
+        ),
+    ]
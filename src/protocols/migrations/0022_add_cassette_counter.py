@@ -0,0 +1,70 @@
+# Generated by Django 5.2.11 on 2026-10-17 06:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_cassette_counters(apps, schema_editor):
+    """Start each sample's counter at its highest existing cassette number."""
+    Cassette = apps.get_model("protocols", "Cassette")
+    CassetteCounter = apps.get_model("protocols", "CassetteCounter")
+
+    last_numbers = {}
+    for sample_id, code in Cassette.objects.values_list(
+        "histopathology_sample_id", "codigo_cassette"
+    ).iterator():
+        _, _, suffix = code.rpartition("-C")
+        number = int(suffix) if suffix.isdigit() else 0
+        last_numbers[sample_id] = max(last_numbers.get(sample_id, 0), number)
+
+    CassetteCounter.objects.bulk_create(
+        CassetteCounter(histopathology_sample_id=sample_id, last_number=last)
+        for sample_id, last in last_numbers.items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("protocols", "0021_backfill_protocol_stage_timestamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CassetteCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_number",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Último número de cassette asignado",
+                        verbose_name="último número",
+                    ),
+                ),
+                (
+                    "histopathology_sample",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cassette_counter",
+                        to="protocols.histopathologysample",
+                        verbose_name="muestra de histopatología",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "contador de cassettes",
+                "verbose_name_plural": "contadores de cassettes",
+            },
+        ),
+        migrations.RunPython(
+            backfill_cassette_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -2,10 +2,14 @@ import uuid
 from datetime import date
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from protocols import numbering
+
 
 class Protocol(models.Model):
     """
@@ -142,6 +146,24 @@ class Protocol(models.Model):
         default=Status.DRAFT,
     )
 
+    # Workflow stage timestamps, set once by the transition methods (and
+    # ReportGenerationService) so TAT and aging read a single table
+    received_at = models.DateTimeField(
+        _("recibido el"), null=True, blank=True, editable=False
+    )
+    processing_started_at = models.DateTimeField(
+        _("procesamiento iniciado el"), null=True, blank=True, editable=False
+    )
+    ready_at = models.DateTimeField(
+        _("listo el"), null=True, blank=True, editable=False
+    )
+    finalized_at = models.DateTimeField(
+        _("informe finalizado el"), null=True, blank=True, editable=False
+    )
+    sent_at = models.DateTimeField(
+        _("informe enviado el"), null=True, blank=True, editable=False
+    )
+
     # Reception information
     class SampleCondition(models.TextChoices):
         OPTIMAL = "optimal", _("Óptima")
@@ -171,6 +193,10 @@ class Protocol(models.Model):
     created_at = models.DateTimeField(_("creado el"), auto_now_add=True)
     updated_at = models.DateTimeField(_("actualizado el"), auto_now=True)
 
+    # Full-text search document, maintained by a PostgreSQL trigger (see
+    # protocols.services.search_service). Always NULL on other backends.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name = _("protocolo")
         verbose_name_plural = _("protocolos")
@@ -182,6 +208,33 @@ class Protocol(models.Model):
             models.Index(fields=["status", "-submission_date"]),
             models.Index(fields=["analysis_type", "-submission_date"]),
             models.Index(fields=["-created_at"]),
+            # WIP board: only protocols still in the lab workflow
+            models.Index(
+                fields=["analysis_type", "status"],
+                condition=models.Q(
+                    status__in=["submitted", "received", "processing", "ready"]
+                ),
+                name="protocol_wip_status_idx",
+            ),
+            # Aging: active protocols by reception time
+            models.Index(
+                fields=["status", "received_at"],
+                name="protocol_status_received_idx",
+            ),
+            # TAT: finalized protocols by finalization time, covering the
+            # grouping and reception columns
+            models.Index(
+                fields=["finalized_at", "analysis_type", "received_at"],
+                condition=models.Q(finalized_at__isnull=False),
+                name="protocol_finalized_tat_idx",
+            ),
+            # Pending-reports worklist (ReportPendingListView ordering)
+            models.Index(
+                Coalesce("reception_date", "created_at").desc(),
+                models.F("id").desc(),
+                condition=models.Q(status="ready"),
+                name="protocol_ready_reception_idx",
+            ),
         ]
 
     def __str__(self):
@@ -192,15 +245,39 @@ class Protocol(models.Model):
         return f"Protocol #{self.id} - {self.animal_identification}"
 
     def save(self, *args, **kwargs):
-        """Override save to generate temporary code on creation."""
+        """
+        Override save to generate temporary code on creation.
+
+        Protocols created or imported already received (reception_date set
+        directly) get received_at from it.
+        """
         if (
             not self.pk
             and not self.temporary_code
             and self.status != self.Status.DRAFT
         ):
             self.temporary_code = self.generate_temporary_code()
+        if (
+            not self.pk
+            and self.received_at is None
+            and self.reception_date
+            and self.status != self.Status.REJECTED
+        ):
+            self.received_at = self.reception_date
         super().save(*args, **kwargs)
 
+    def _stamp(self, field, at=None):
+        """
+        Set stage timestamp `field` unless already set; the first time a
+        protocol reaches a stage is the one TAT and aging measure.
+
+        Returns the fields to include in save(update_fields=...).
+        """
+        if getattr(self, field) is not None:
+            return []
+        setattr(self, field, at or timezone.now())
+        return [field]
+
     def generate_temporary_code(self):
         """
         Generate unique temporary tracking code using atomic counter.
@@ -227,17 +304,14 @@ class Protocol(models.Model):
         if self.protocol_number:
             return self.protocol_number
 
-        # Use ProtocolCounter to get next sequential number
-        # This is defined later in the file but will be available at runtime
-        from protocols.models import ProtocolCounter
-
-        formatted_number, _ = ProtocolCounter.get_next_number(
-            analysis_type=self.analysis_type,
-            year=date.today().year,
-        )
-
-        self.protocol_number = formatted_number
-        self.save(update_fields=["protocol_number"])
+        # The number is saved in the counter's transaction: no gaps
+        with transaction.atomic():
+            formatted_number, counter = ProtocolCounter.get_next_number(
+                analysis_type=self.analysis_type,
+                year=date.today().year,
+            )
+            self.protocol_number = formatted_number
+            self.save(update_fields=["protocol_number"])
         return self.protocol_number
 
     def submit(self):
@@ -276,6 +350,7 @@ class Protocol(models.Model):
             )
 
         self.reception_date = timezone.now()
+        self.received_at = self.reception_date
         self.received_by = received_by
         self.sample_condition = (
             sample_condition or self.SampleCondition.OPTIMAL
@@ -290,6 +365,7 @@ class Protocol(models.Model):
         self.save(
             update_fields=[
                 "reception_date",
+                "received_at",
                 "received_by",
                 "sample_condition",
                 "reception_notes",
@@ -298,6 +374,33 @@ class Protocol(models.Model):
             ]
         )
 
+    def start_processing(self):
+        """
+        Move a received protocol to PROCESSING.
+
+        Returns True if the status changed; protocols already further along
+        are left untouched.
+        """
+        if self.status != self.Status.RECEIVED:
+            return False
+        self.status = self.Status.PROCESSING
+        self.save(
+            update_fields=["status", *self._stamp("processing_started_at")]
+        )
+        return True
+
+    def mark_report_finalized(self, at=None):
+        """Record when the first report of the protocol was finalized."""
+        fields = self._stamp("finalized_at", at)
+        if fields:
+            self.save(update_fields=fields)
+
+    def mark_report_sent(self, at=None):
+        """Record when the first report of the protocol was sent."""
+        fields = self._stamp("sent_at", at)
+        if fields:
+            self.save(update_fields=fields)
+
     def get_owner_full_name(self):
         """Return owner's full name."""
         if self.owner_first_name and self.owner_last_name:
@@ -554,26 +657,15 @@ class WorkOrderCounter(models.Model):
         Returns:
             tuple: (formatted_number, counter_instance)
         """
-        from django.db import transaction
-
         if year is None:
             year = date.today().year
 
-        with transaction.atomic():
-            # Get or create counter for this year
-            counter, created = cls.objects.select_for_update().get_or_create(
-                year=year,
-                defaults={"last_number": 0},
-            )
-
-            # Increment counter
-            counter.last_number += 1
-            counter.save()
+        counter = numbering.increment(cls, year=year)
 
-            # Format work order number: OT-YYYY-NNN
-            formatted_number = f"OT-{year}-{counter.last_number:03d}"
+        # Format work order number: OT-YYYY-NNN
+        formatted_number = f"OT-{year}-{counter.last_number:03d}"
 
-            return formatted_number, counter
+        return formatted_number, counter
 
 
 class WorkOrder(models.Model):
@@ -1049,6 +1141,14 @@ class ProtocolCounter(models.Model):
         )
         return f"{prefix} {self.year}: {self.last_number}"
 
+    @staticmethod
+    def format_number(analysis_type, year, number):
+        """Format a protocol number: {TYPE} {YY}/{NRO}."""
+        prefix = (
+            "CT" if analysis_type == Protocol.AnalysisType.CYTOLOGY else "HP"
+        )
+        return f"{prefix} {str(year)[-2:]}/{number:03d}"
+
     @classmethod
     def get_next_number(cls, analysis_type, year=None):
         """
@@ -1061,35 +1161,46 @@ class ProtocolCounter(models.Model):
         Returns:
             tuple: (formatted_number, counter_instance)
         """
-        from django.db import transaction
-
         if year is None:
             year = date.today().year
 
-        with transaction.atomic():
-            # Get or create counter for this type and year
-            counter, created = cls.objects.select_for_update().get_or_create(
-                analysis_type=analysis_type,
-                year=year,
-                defaults={"last_number": 0},
-            )
+        counter = numbering.increment(
+            cls, analysis_type=analysis_type, year=year
+        )
+        formatted_number = cls.format_number(
+            analysis_type, year, counter.last_number
+        )
 
-            # Increment counter
-            counter.last_number += 1
-            counter.save()
+        return formatted_number, counter
 
-            # Format protocol number
-            prefix = (
-                "CT"
-                if analysis_type == Protocol.AnalysisType.CYTOLOGY
-                else "HP"
-            )
-            year_short = str(year)[-2:]
-            formatted_number = (
-                f"{prefix} {year_short}/{counter.last_number:03d}"
-            )
+    @classmethod
+    def get_next_numbers(cls, analysis_type, count, year=None):
+        """
+        Allocate `count` consecutive protocol numbers in one counter update.
+
+        The block is allocated in the caller's transaction, which holds
+        the counter lock until it ends; allocate as the last step of the
+        transaction (see ProtocolReceptionService.process_bulk_reception).
+
+        Args:
+            analysis_type: Type of analysis (cytology or histopathology)
+            count: Number of protocol numbers to allocate
+            year: Year for the counter (defaults to current year)
+
+        Returns:
+            list: Formatted numbers, in ascending order
+        """
+        if year is None:
+            year = date.today().year
 
-            return formatted_number, counter
+        counter = numbering.increment(
+            cls, by=count, analysis_type=analysis_type, year=year
+        )
+        first = counter.last_number - count + 1
+        return [
+            cls.format_number(analysis_type, year, number)
+            for number in range(first, counter.last_number + 1)
+        ]
 
 
 class TemporaryCodeCounter(models.Model):
@@ -1141,35 +1252,81 @@ class TemporaryCodeCounter(models.Model):
         Returns:
             tuple: (formatted_number, counter_instance)
         """
-        from django.db import transaction
-
         if date_obj is None:
             date_obj = date.today()
 
-        with transaction.atomic():
-            # Get or create counter for this type and date
-            counter, created = cls.objects.select_for_update().get_or_create(
-                analysis_type=analysis_type,
-                date=date_obj,
-                defaults={"last_number": 0},
-            )
+        counter = numbering.increment(
+            cls, analysis_type=analysis_type, date=date_obj
+        )
 
-            # Increment counter
-            counter.last_number += 1
-            counter.save()
+        # Format temporary code
+        type_prefix = (
+            "CT" if analysis_type == Protocol.AnalysisType.CYTOLOGY else "HP"
+        )
+        date_str = date_obj.strftime("%Y%m%d")
+        formatted_number = (
+            f"TMP-{type_prefix}-{date_str}-{counter.last_number:03d}"
+        )
 
-            # Format temporary code
-            type_prefix = (
-                "CT"
-                if analysis_type == Protocol.AnalysisType.CYTOLOGY
-                else "HP"
-            )
-            date_str = date_obj.strftime("%Y%m%d")
-            formatted_number = (
-                f"TMP-{type_prefix}-{date_str}-{counter.last_number:03d}"
+        return formatted_number, counter
+
+
+class CassetteCounter(models.Model):
+    """
+    Track sequential cassette numbering per histopathology sample.
+    Ensures unique, sequential cassette codes.
+    """
+
+    histopathology_sample = models.OneToOneField(
+        HistopathologySample,
+        on_delete=models.CASCADE,
+        related_name="cassette_counter",
+        verbose_name=_("muestra de histopatología"),
+    )
+    last_number = models.IntegerField(
+        _("último número"),
+        default=0,
+        help_text=_("Último número de cassette asignado"),
+    )
+
+    class Meta:
+        verbose_name = _("contador de cassettes")
+        verbose_name_plural = _("contadores de cassettes")
+
+    def __str__(self):
+        return f"{self.histopathology_sample_id}: {self.last_number}"
+
+    @classmethod
+    def get_next_codes(cls, histopathology_sample, count=1):
+        """
+        Allocate `count` consecutive cassette codes in one counter update.
+
+        Format: {PROTOCOL_NUMBER}-C{CASSETTE_NUMBER}. The codes are
+        allocated in the caller's transaction.
+
+        Args:
+            histopathology_sample: HistopathologySample of the cassettes
+            count: Number of codes to allocate
+
+        Returns:
+            list: Cassette codes, in ascending order
+        """
+        protocol_number = histopathology_sample.protocol.protocol_number
+        if not protocol_number:
+            raise ValueError(
+                "Protocol must have a protocol_number before creating cassettes"
             )
 
-            return formatted_number, counter
+        counter = numbering.increment(
+            cls,
+            by=count,
+            histopathology_sample_id=histopathology_sample.pk,
+        )
+        first = counter.last_number - count + 1
+        return [
+            f"{protocol_number}-C{number}"
+            for number in range(first, counter.last_number + 1)
+        ]
 
 
 class Cassette(models.Model):
@@ -1270,6 +1427,12 @@ class Cassette(models.Model):
             models.Index(fields=["codigo_cassette"]),
             models.Index(fields=["histopathology_sample", "created_at"]),
             models.Index(fields=["estado"]),
+            # WIP board: cassettes still being processed
+            models.Index(
+                fields=["estado"],
+                condition=models.Q(estado__in=["pendiente", "en_proceso"]),
+                name="cassette_wip_estado_idx",
+            ),
         ]
 
     def __str__(self):
@@ -1283,25 +1446,14 @@ class Cassette(models.Model):
 
     def generate_cassette_code(self):
         """
-        Generate unique cassette code.
+        Generate unique cassette code from the sample's CassetteCounter.
         Format: {PROTOCOL_NUMBER}-C{CASSETTE_NUMBER}
 
         Returns:
             str: Generated cassette code
         """
-        protocol_number = self.histopathology_sample.protocol.protocol_number
-        if not protocol_number:
-            raise ValueError(
-                "Protocol must have a protocol_number before creating cassettes"
-            )
-
-        # Get next cassette number for this protocol
-        existing_cassettes = Cassette.objects.filter(
-            histopathology_sample=self.histopathology_sample
-        ).count()
-        next_number = existing_cassettes + 1
-
-        return f"{protocol_number}-C{next_number}"
+        (code,) = CassetteCounter.get_next_codes(self.histopathology_sample)
+        return code
 
     def update_stage(self, stage, timestamp=None):
         """
@@ -1429,6 +1581,12 @@ class Slide(models.Model):
             models.Index(fields=["codigo_portaobjetos"]),
             models.Index(fields=["protocol", "created_at"]),
             models.Index(fields=["estado"]),
+            # WIP board: slides in cutting/staining
+            models.Index(
+                fields=["estado"],
+                condition=models.Q(estado__in=["montado", "coloreado"]),
+                name="slide_wip_estado_idx",
+            ),
         ]
 
     def __str__(self):
@@ -1825,13 +1983,16 @@ class Report(models.Model):
         """Check if report can be deleted."""
         return self.status == self.Status.DRAFT
 
+    @transaction.atomic
     def finalize(self):
         """Mark report as finalized."""
         if self.status != self.Status.DRAFT:
             raise ValueError("Only draft reports can be finalized")
         self.status = self.Status.FINALIZED
         self.save(update_fields=["status"])
+        self.protocol.mark_report_finalized()
 
+    @transaction.atomic
     def mark_as_sent(self, email):
         """Mark report as sent."""
         self.status = self.Status.SENT
@@ -1846,6 +2007,7 @@ class Report(models.Model):
                 "email_status",
             ]
         )
+        self.protocol.mark_report_sent(self.sent_date)
 
     def send(self):
         """Send the report (mark as sent)."""
@@ -1854,16 +2016,18 @@ class Report(models.Model):
 
         # For now, just mark as sent without actual email sending
         # The actual email sending is handled by the view/form
-        self.status = self.Status.SENT
-        self.sent_date = timezone.now()
-        self.email_status = self.EmailStatus.SENT
-        self.save(
-            update_fields=[
-                "status",
-                "sent_date",
-                "email_status",
-            ]
-        )
+        with transaction.atomic():
+            self.status = self.Status.SENT
+            self.sent_date = timezone.now()
+            self.email_status = self.EmailStatus.SENT
+            self.save(
+                update_fields=[
+                    "status",
+                    "sent_date",
+                    "email_status",
+                ]
+            )
+            self.protocol.mark_report_sent(self.sent_date)
 
 
 class CassetteObservation(models.Model):
@@ -18,6 +18,11 @@ from django.views import View
 from django.views.generic import ListView
 
 from protocols.models import InAppNotification
+from protocols.pagination import (
+    InvalidCursor,
+    KeysetPaginationMixin,
+    KeysetPaginator,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +39,20 @@ class NotificationListView(LoginRequiredMixin, View):
     """List notifications for the current user."""
 
     def get(self, request, *args, **kwargs):
-        """Return paginated list of notifications."""
+        """
+        Return a page of notifications.
+
+        Pages are addressed by the opaque `cursor` returned as
+        `next_cursor`/`previous_cursor`; `total` is an estimate on
+        PostgreSQL (see protocols.pagination).
+        """
         user = request.user
         filter_type = request.GET.get("filter", "all")  # all, unread, read
-        page = int(request.GET.get("page", 1))
-        per_page = min(int(request.GET.get("per_page", 20)), 50)
-        offset = (page - 1) * per_page
+        try:
+            per_page = int(request.GET.get("per_page", 20))
+        except ValueError:
+            per_page = 20
+        per_page = max(1, min(per_page, 50))
 
         qs = InAppNotification.objects.filter(recipient=user).order_by(
             "-created_at"
@@ -49,9 +62,8 @@ class NotificationListView(LoginRequiredMixin, View):
         elif filter_type == "read":
             qs = qs.filter(is_read=True)
 
-        total = qs.count()
-        notifications = list(
-            qs[offset : offset + per_page].values(
+        paginator = KeysetPaginator(
+            qs.values(
                 "id",
                 "notification_type",
                 "title",
@@ -60,17 +72,34 @@ class NotificationListView(LoginRequiredMixin, View):
                 "is_read",
                 "read_at",
                 "created_at",
-            )
+            ),
+            per_page,
+            estimate_total=True,
         )
-        for n in notifications:
-            n["created_at"] = n["created_at"].isoformat()
-            n["read_at"] = n["read_at"].isoformat() if n["read_at"] else None
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor:
+            return JsonResponse({"error": "Cursor inválido"}, status=400)
+
+        notifications = []
+        for n in page.object_list:
+            notifications.append(
+                {
+                    **n,
+                    "created_at": n["created_at"].isoformat(),
+                    "read_at": (
+                        n["read_at"].isoformat() if n["read_at"] else None
+                    ),
+                }
+            )
 
         return JsonResponse(
             {
                 "notifications": notifications,
-                "total": total,
-                "page": page,
+                "next_cursor": page.next_cursor,
+                "previous_cursor": page.previous_cursor,
+                "total": paginator.count,
+                "total_is_estimate": paginator.count_is_estimate,
                 "per_page": per_page,
             }
         )
@@ -176,7 +205,9 @@ class RealtimeAuthView(LoginRequiredMixin, View):
         return JsonResponse({"auth": auth})
 
 
-class NotificationInboxView(LoginRequiredMixin, ListView):
+class NotificationInboxView(
+    LoginRequiredMixin, KeysetPaginationMixin, ListView
+):
     """
     Full-page inbox for all user notifications (paginated).
 
@@ -0,0 +1,55 @@
+"""
+Allocation of sequential numbers from the counter tables.
+
+ProtocolCounter, TemporaryCodeCounter, WorkOrderCounter and CassetteCounter
+hold one row per key (analysis type and year or day, sample). increment()
+is a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so the row lock
+is taken by one statement instead of a locking read, an insert for the
+first number of the period and an update. With `by`, it allocates a whole
+block of consecutive numbers in that statement.
+
+The increment runs in the caller's transaction, so numbers stay gap-free
+and the row stays locked until that transaction ends: callers allocate as
+late in their transaction as they can.
+"""
+
+from django.db import connection
+
+
+def increment(counter_model, by=1, **key):
+    """
+    Increment the `counter_model` row for `key` by `by`, creating it.
+
+    Returns the counter with the new `last_number`; the allocated numbers
+    are `last_number - by + 1` to `last_number`.
+    """
+    db = connection
+    quote = db.ops.quote_name
+    meta = counter_model._meta
+    columns = [meta.get_field(name).column for name in key]
+    params = [
+        meta.get_field(name).get_db_prep_value(value, db)
+        for name, value in key.items()
+    ]
+    table = quote(meta.db_table)
+    last_number = quote(meta.get_field("last_number").column)
+    key_columns = ", ".join(quote(column) for column in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = (
+        f"INSERT INTO {table} ({key_columns}, {last_number}) "
+        f"VALUES ({placeholders}, %s) "
+        f"ON CONFLICT ({key_columns}) "
+        f"DO UPDATE SET {last_number} = {table}.{last_number} + %s "
+        f"RETURNING {quote(meta.pk.column)}, {last_number}"
+    )
+    with db.cursor() as cursor:
+        cursor.execute(sql, [*params, by, by])
+        pk, number = cursor.fetchone()
+
+    row = {meta.pk.attname: pk, **key, "last_number": number}
+    field_names = [
+        field.attname for field in meta.concrete_fields if field.attname in row
+    ]
+    return counter_model.from_db(
+        db.alias, field_names, [row[name] for name in field_names]
+    )
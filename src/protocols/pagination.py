@@ -0,0 +1,268 @@
+"""
+Keyset (cursor) pagination for long listings.
+
+OFFSET pagination reads and discards every row before the requested page
+and Django's Paginator also runs a full COUNT(*), so deep pages of large
+tables get progressively slower. KeysetPaginator instead continues from the
+ordering values of the last row shown (WHERE (created_at, id) < (...)),
+which an index on the ordering serves in constant time per page, and only
+offers an estimated total when asked to.
+
+Cursors are opaque URL-safe strings; views read them from the `cursor`
+query parameter (see KeysetPaginationMixin).
+"""
+
+import base64
+import datetime
+import json
+import logging
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or does not match the ordering."""
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision, which keyset comparisons need."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def estimated_count(queryset):
+    """
+    Approximate number of rows of `queryset` without a COUNT(*).
+
+    On PostgreSQL an unfiltered queryset uses the table statistics
+    (pg_class.reltuples) and a filtered one the planner's row estimate.
+    Other backends, only used with small databases, count exactly.
+    Returns (count, is_estimate).
+    """
+    if connection.vendor != "postgresql":
+        return queryset.count(), False
+    try:
+        if not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 until the table is first analyzed
+            if row and row[0] >= 0:
+                return int(row[0]), True
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    except Exception as e:
+        logger.warning("Row estimate failed, counting instead: %s", e)
+        return queryset.count(), False
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator, template-compatible with Page."""
+
+    def __init__(
+        self,
+        object_list,
+        paginator,
+        has_next,
+        has_previous,
+        next_cursor=None,
+        previous_cursor=None,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor if has_next else None
+        self.previous_cursor = previous_cursor if has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by its ordering (plus the primary key as tiebreaker).
+
+    The queryset must be ordered by field or annotation names, e.g. the
+    default ("-created_at",) of most models; values used for the ordering
+    must not be NULL. With `estimate_total`, `count` holds
+    estimated_count() of the queryset and `count_is_estimate` says whether
+    it is approximate; otherwise `count` is None.
+    """
+
+    def __init__(self, queryset, per_page, estimate_total=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = self._ordering(queryset)
+        self.count = None
+        self.count_is_estimate = False
+        if estimate_total:
+            self.count, self.count_is_estimate = estimated_count(queryset)
+
+    @staticmethod
+    def _ordering(queryset):
+        """[(name, descending)] from the queryset ordering, pk appended."""
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = []
+        for item in order_by:
+            if not isinstance(item, str) or item == "?":
+                raise ImproperlyConfigured(
+                    "KeysetPaginator needs an ordering by field names, "
+                    f"got {item!r}."
+                )
+            name = item.lstrip("-")
+            ordering.append(
+                ("pk" if name == "id" else name, item.startswith("-"))
+            )
+        if not any(name == "pk" for name, _ in ordering):
+            descending = ordering[-1][1] if ordering else False
+            ordering.append(("pk", descending))
+        return ordering
+
+    def _values(self, row):
+        if isinstance(row, dict):
+            pk_name = self.queryset.model._meta.pk.attname
+            return [
+                row[pk_name if name == "pk" else name]
+                for name, _ in self.ordering
+            ]
+        return [getattr(row, name) for name, _ in self.ordering]
+
+    def _output_field(self, name):
+        if name == "pk":
+            return self.queryset.model._meta.pk
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def encode_cursor(self, row, backward=False):
+        payload = {"v": self._values(row), "b": int(backward)}
+        raw = json.dumps(payload, cls=CursorEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Return (values, backward) for `cursor`."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            values = payload["v"]
+            if len(values) != len(self.ordering):
+                raise InvalidCursor("Cursor does not match the ordering")
+            return (
+                [
+                    self._output_field(name).to_python(value)
+                    for (name, _), value in zip(self.ordering, values)
+                ],
+                bool(payload.get("b")),
+            )
+        except InvalidCursor:
+            raise
+        except Exception as e:
+            raise InvalidCursor(str(e)) from e
+
+    def _after(self, values, backward):
+        """Rows strictly after `values` in the (possibly reversed) order."""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != backward else "gt"
+            step = Q(**{f"{name}__{lookup}": values[index]})
+            for position, (previous, _) in enumerate(self.ordering[:index]):
+                step &= Q(**{previous: values[position]})
+            condition |= step
+        return condition
+
+    def _order_by(self, backward):
+        return [
+            f"{'-' if descending != backward else ''}{name}"
+            for name, descending in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        """Page following (or, for backward cursors, preceding) `cursor`."""
+        if not cursor:
+            return self._first_page()
+        values, backward = self.decode_cursor(cursor)
+        queryset = self.queryset.filter(self._after(values, backward))
+        rows = list(
+            queryset.order_by(*self._order_by(backward))[: self.per_page + 1]
+        )
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backward:
+            if not more:
+                # Reached the start: show a full first page instead
+                return self._first_page()
+            rows.reverse()
+            return self._make_page(rows, has_next=True, has_previous=True)
+        return self._make_page(rows, has_next=more, has_previous=True)
+
+    def _first_page(self):
+        rows = list(
+            self.queryset.order_by(*self._order_by(False))[: self.per_page + 1]
+        )
+        more = len(rows) > self.per_page
+        return self._make_page(
+            rows[: self.per_page], has_next=more, has_previous=False
+        )
+
+    def _make_page(self, rows, has_next, has_previous):
+        return KeysetPage(
+            rows,
+            self,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.encode_cursor(rows[-1]) if rows else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], backward=True) if rows else None
+            ),
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing OFFSET pagination with KeysetPaginator.
+
+    Templates get the usual `page_obj`/`paginator`/`is_paginated`; links
+    use `page_obj.next_cursor` and `page_obj.previous_cursor` (see
+    components/ui/pagination.html). An invalid cursor shows the first page.
+    """
+
+    cursor_kwarg = "cursor"
+    estimate_total = False
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, estimate_total=self.estimate_total
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            page = paginator.page()
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -8,6 +8,7 @@ from typing import Optional
 from protocols.emails import (
     build_protocol_url,
     queue_email,
+    send_bulk_reception_notification,
     send_report_ready_notification,
     send_sample_reception_notification,
     send_work_order_notification,
@@ -59,6 +60,40 @@ class EmailNotificationService:
             )
             return False
 
+    def send_bulk_reception_email(self, veterinarian, protocols) -> bool:
+        """
+        Send one reception email for a batch of a veterinarian's samples.
+
+        Args:
+            veterinarian: Veterinarian the samples belong to
+            protocols: Protocol instances received in the batch
+
+        Returns:
+            bool: True if email was queued successfully, False otherwise
+        """
+        try:
+            email_log = send_bulk_reception_notification(
+                veterinarian, protocols
+            )
+            if email_log:
+                logger.info(
+                    f"Bulk reception email queued for veterinarian "
+                    f"{veterinarian.pk} (EmailLog ID: {email_log.id})"
+                )
+                return True
+            else:
+                logger.info(
+                    f"Bulk reception email skipped for veterinarian "
+                    f"{veterinarian.pk} (veterinarian preferences)"
+                )
+                return False
+        except Exception as e:
+            logger.error(
+                f"Failed to queue bulk reception email for veterinarian "
+                f"{veterinarian.pk}: {e}"
+            )
+            return False
+
     def send_rejection_email(self, protocol) -> bool:
         """
         Send rejection notification email to veterinarian.
@@ -194,6 +194,20 @@ class NotificationService:
             protocol=protocol,
         )
 
+    def create_for_bulk_reception(
+        self, veterinarian, protocols
+    ) -> InAppNotification:
+        """Create one notification for a batch of received samples."""
+        numbers = ", ".join(protocol.protocol_number for protocol in protocols)
+        link = f"{settings.SITE_URL}{reverse('protocols:protocol_list')}"
+        return self.create_notification(
+            recipient=veterinarian.user,
+            notification_type=InAppNotification.NotificationType.RECEPTION,
+            title=f"{len(protocols)} muestras recibidas",
+            body=f"Hemos recibido sus muestras: {numbers}. Puede seguir el estado en el portal.",
+            link_url=link,
+        )
+
     def create_for_rejection(self, protocol) -> InAppNotification:
         """Create notification when sample is rejected."""
         user = protocol.veterinarian.user
@@ -3,16 +3,24 @@ Protocol processing service for handling protocol reception and processing logic
 """
 
 import logging
-from typing import Dict, List, Tuple
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
 
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from protocols.models import (
     Cassette,
+    CassetteCounter,
     CassetteSlide,
+    CytologySample,
+    HistopathologySample,
     ProcessingLog,
     Protocol,
+    ProtocolCounter,
     ProtocolStatusHistory,
     ReceptionLog,
     Slide,
@@ -146,6 +154,167 @@ class ProtocolReceptionService:
             )
             return False, str(e)
 
+    def process_bulk_reception(
+        self, protocols: Sequence[Protocol], form_data: Dict, user
+    ) -> Tuple[List[Protocol], str]:
+        """
+        Receive a batch of submitted protocols (a box delivered by a clinic).
+
+        Everything happens in one transaction: the reception logs and
+        status history are inserted in bulk, then one counter update per
+        analysis type allocates the protocol numbers, in the order given,
+        and the protocols are updated with one statement. Numbering is the
+        last step so the counter rows, locked until commit, are held only
+        for that final update. Each veterinarian gets a single email and
+        in-app notification for the batch, sent once the transaction
+        commits. Rejections and discrepancies go through the individual
+        reception, and received sample counts are taken to match the
+        declared ones.
+
+        Args:
+            protocols: Protocol instances to receive
+            form_data: Form data with the common sample condition and notes
+            user: User performing the reception
+
+        Returns:
+            Tuple[List[Protocol], str]: (received protocols, error_message).
+            Protocols that are no longer submitted are left out.
+        """
+        sample_condition = form_data.get("sample_condition")
+        reception_notes = form_data.get("reception_notes", "")
+        order = {
+            protocol.pk: index for index, protocol in enumerate(protocols)
+        }
+
+        try:
+            with transaction.atomic():
+                received = sorted(
+                    Protocol.objects.select_for_update(of=("self",))
+                    .select_related("veterinarian__user")
+                    .filter(pk__in=order, status=Protocol.Status.SUBMITTED),
+                    key=lambda protocol: order[protocol.pk],
+                )
+                if not received:
+                    return [], ""
+
+                CytologySample.objects.filter(
+                    protocol__in=received, number_slides_received__isnull=True
+                ).update(number_slides_received=F("number_of_slides"))
+                HistopathologySample.objects.filter(
+                    protocol__in=received, number_jars_received__isnull=True
+                ).update(number_jars_received=F("number_of_containers"))
+
+                ReceptionLog.objects.bulk_create(
+                    ReceptionLog(
+                        protocol=protocol,
+                        action=ReceptionLog.Action.RECEIVED,
+                        user=user,
+                        notes=reception_notes,
+                    )
+                    for protocol in received
+                )
+                ProtocolStatusHistory.objects.bulk_create(
+                    ProtocolStatusHistory(
+                        protocol=protocol,
+                        status=Protocol.Status.RECEIVED,
+                        changed_by=user,
+                        description=_("Muestra recibida en laboratorio"),
+                    )
+                    for protocol in received
+                )
+
+                # Numbering last: the counter rows stay locked until commit
+                self._assign_protocol_numbers(received)
+
+                now = timezone.now()
+                for protocol in received:
+                    protocol.reception_date = now
+                    protocol.received_at = now
+                    protocol.received_by = user
+                    protocol.sample_condition = (
+                        sample_condition or Protocol.SampleCondition.OPTIMAL
+                    )
+                    protocol.reception_notes = reception_notes
+                    protocol.discrepancies = ""
+                    protocol.status = Protocol.Status.RECEIVED
+                    protocol.updated_at = now
+                Protocol.objects.bulk_update(
+                    received,
+                    [
+                        "protocol_number",
+                        "reception_date",
+                        "received_at",
+                        "received_by",
+                        "sample_condition",
+                        "reception_notes",
+                        "discrepancies",
+                        "status",
+                        "updated_at",
+                    ],
+                )
+
+                # bulk_update sends no post_save: sync the dashboards here
+                from pages.signals import (
+                    invalidate_dashboard_cache,
+                    schedule_rollup_refresh,
+                )
+
+                invalidate_dashboard_cache(Protocol)
+                schedule_rollup_refresh(
+                    {protocol.submission_date for protocol in received}
+                )
+
+                by_veterinarian = defaultdict(list)
+                for protocol in received:
+                    by_veterinarian[protocol.veterinarian].append(protocol)
+                for veterinarian, group in by_veterinarian.items():
+                    transaction.on_commit(
+                        lambda veterinarian=veterinarian, group=group: (
+                            self._notify_bulk_reception(veterinarian, group)
+                        ),
+                        robust=True,
+                    )
+
+            return received, ""
+
+        except Exception as e:
+            logger.error(f"Error processing bulk reception: {e}")
+            return [], str(e)
+
+    def _assign_protocol_numbers(self, protocols: List[Protocol]) -> None:
+        """
+        Number the protocols that have no number yet.
+
+        One block of numbers is allocated per analysis type, in the caller's
+        transaction, and handed out in list order.
+        """
+        year = date.today().year
+        by_type = defaultdict(list)
+        for protocol in protocols:
+            if not protocol.protocol_number:
+                by_type[protocol.analysis_type].append(protocol)
+
+        for analysis_type, group in by_type.items():
+            numbers = ProtocolCounter.get_next_numbers(
+                analysis_type, len(group), year=year
+            )
+            for protocol, number in zip(group, numbers, strict=True):
+                protocol.protocol_number = number
+
+    def _notify_bulk_reception(self, veterinarian, protocols) -> None:
+        """Send one reception email and in-app notification per batch."""
+        from protocols.services.email_service import EmailNotificationService
+        from protocols.services.notification_service import (
+            NotificationService,
+        )
+
+        EmailNotificationService().send_bulk_reception_email(
+            veterinarian, protocols
+        )
+        NotificationService().create_for_bulk_reception(
+            veterinarian, protocols
+        )
+
     def _update_sample_specific_fields(
         self, protocol: Protocol, form_data: Dict
     ) -> None:
@@ -191,12 +360,55 @@ class ProtocolProcessingService:
     cassettes, registering slides, and managing the processing workflow.
     """
 
+    # Stages a scan station can move items to:
+    # stage -> (timestamp field, new status, ProcessingLog stage)
+    CASSETTE_SCAN_STAGES = {
+        "encasetado": (
+            "fecha_encasetado",
+            Cassette.Status.EN_PROCESO,
+            ProcessingLog.Stage.ENCASETADO,
+        ),
+        "fijacion": (
+            "fecha_fijacion",
+            Cassette.Status.EN_PROCESO,
+            ProcessingLog.Stage.FIJACION,
+        ),
+        "inclusion": (
+            "fecha_inclusion",
+            Cassette.Status.EN_PROCESO,
+            ProcessingLog.Stage.INCLUSION,
+        ),
+        "entacado": (
+            "fecha_entacado",
+            Cassette.Status.COMPLETADO,
+            ProcessingLog.Stage.ENTACADO,
+        ),
+    }
+    SLIDE_SCAN_STAGES = {
+        "montaje": (
+            "fecha_montaje",
+            Slide.Status.MONTADO,
+            ProcessingLog.Stage.MONTAJE,
+        ),
+        "coloracion": (
+            "fecha_coloracion",
+            Slide.Status.COLOREADO,
+            ProcessingLog.Stage.COLORACION,
+        ),
+        "listo": (None, Slide.Status.LISTO, None),
+    }
+
     def create_cassettes(
         self, protocol: Protocol, cassette_data: List[Dict], user
     ) -> Tuple[bool, List[Cassette], str]:
         """
         Create cassettes for a histopathology protocol.
 
+        The cassette codes come from one update of the sample's
+        CassetteCounter, and the cassettes (already in the encasetado
+        stage) and their processing logs are inserted with bulk_create,
+        so the number of queries does not depend on the cassette count.
+
         Args:
             protocol: Protocol instance
             cassette_data: List of cassette data dictionaries
@@ -223,46 +435,58 @@ class ProtocolProcessingService:
                     _("Este protocolo no tiene muestra de histopatología."),
                 )
 
-            created_cassettes = []
+            if not cassette_data:
+                return False, [], _("Debe indicar al menos un cassette.")
 
-            for data in cassette_data:
-                cassette = Cassette.objects.create(
-                    histopathology_sample=protocol.histopathology_sample,
-                    material_incluido=data.get("material", ""),
-                    tipo_cassette=data.get(
-                        "tipo", Cassette.CassetteType.NORMAL
-                    ),
-                    color_cassette=data.get(
-                        "color", Cassette.CassetteColor.BLANCO
-                    ),
-                    observaciones=data.get("observaciones", ""),
+            sample = protocol.histopathology_sample
+            with transaction.atomic():
+                codes = CassetteCounter.get_next_codes(
+                    sample, len(cassette_data)
                 )
-
-                # Update to encasetado stage
-                cassette.update_stage("encasetado")
-
-                # Log action
-                ProcessingLog.log_action(
-                    protocol=protocol,
-                    etapa=ProcessingLog.Stage.ENCASETADO,
-                    usuario=user,
-                    cassette=cassette,
-                    observaciones=f"Cassette creado: {data.get('material', '')[:50]}",
+                now = timezone.now()
+                created_cassettes = Cassette.objects.bulk_create(
+                    Cassette(
+                        histopathology_sample=sample,
+                        codigo_cassette=code,
+                        material_incluido=data.get("material", ""),
+                        tipo_cassette=data.get(
+                            "tipo", Cassette.CassetteType.NORMAL
+                        ),
+                        color_cassette=data.get(
+                            "color", Cassette.CassetteColor.BLANCO
+                        ),
+                        observaciones=data.get("observaciones", ""),
+                        fecha_encasetado=now,
+                        estado=Cassette.Status.EN_PROCESO,
+                    )
+                    for code, data in zip(codes, cassette_data, strict=True)
+                )
+                ProcessingLog.objects.bulk_create(
+                    ProcessingLog(
+                        protocol=protocol,
+                        etapa=ProcessingLog.Stage.ENCASETADO,
+                        usuario=user,
+                        cassette=cassette,
+                        observaciones=f"Cassette creado: {data.get('material', '')[:50]}",
+                    )
+                    for cassette, data in zip(
+                        created_cassettes, cassette_data, strict=True
+                    )
                 )
 
-                created_cassettes.append(cassette)
+                # bulk_create sends no post_save: sync the WIP board here
+                from pages.signals import invalidate_dashboard_cache
 
-            # Update protocol status to processing
-            if protocol.status == Protocol.Status.RECEIVED:
-                protocol.status = Protocol.Status.PROCESSING
-                protocol.save(update_fields=["status"])
+                invalidate_dashboard_cache(Cassette)
 
-                ProtocolStatusHistory.log_status_change(
-                    protocol=protocol,
-                    new_status=Protocol.Status.PROCESSING,
-                    changed_by=user,
-                    description=f"Iniciado procesamiento - {len(created_cassettes)} cassettes creados",
-                )
+                # Update protocol status to processing
+                if protocol.start_processing():
+                    ProtocolStatusHistory.log_status_change(
+                        protocol=protocol,
+                        new_status=Protocol.Status.PROCESSING,
+                        changed_by=user,
+                        description=f"Iniciado procesamiento - {len(created_cassettes)} cassettes creados",
+                    )
 
             return True, created_cassettes, ""
 
@@ -278,26 +502,40 @@ class ProtocolProcessingService:
         """
         Register slides for a protocol.
 
+        The cassettes referenced by the slides are resolved with one query,
+        and the slides, their cassette links and their processing logs are
+        inserted with bulk_create, so the number of queries does not depend
+        on the slide count.
+
         Args:
             protocol: Protocol instance
-            slide_data: List of slide data dictionaries
+            slide_data: List of slide data dictionaries; for histopathology,
+                `cassette_1` and `cassette_2` are the ids of the cassettes
+                mounted on the slide
             user: User registering the slides
 
         Returns:
             Tuple[bool, List[Slide], str]: (success, created_slides, error_message)
         """
         try:
-            created_slides = []
-
-            for data in slide_data:
-                # Create slide
-                slide = Slide.objects.create(
-                    protocol=protocol,
-                    codigo_portaobjetos=data.get("codigo_portaobjetos", ""),
-                    campo=data.get("campo"),
-                    tecnica_coloracion=data.get("tecnica_coloracion", ""),
-                    observaciones=data.get("observaciones", ""),
-                    estado=Slide.Status.PENDIENTE,
+            if not slide_data:
+                return False, [], _("Debe indicar al menos un portaobjetos.")
+
+            with transaction.atomic():
+                created_slides = Slide.objects.bulk_create(
+                    Slide(
+                        protocol=protocol,
+                        codigo_portaobjetos=code,
+                        campo=data.get("campo"),
+                        tecnica_coloracion=data.get("tecnica_coloracion", ""),
+                        observaciones=data.get("observaciones", ""),
+                        estado=Slide.Status.PENDIENTE,
+                    )
+                    for code, data in zip(
+                        self._slide_codes(protocol, slide_data),
+                        slide_data,
+                        strict=True,
+                    )
                 )
 
                 # Handle cassette relationships for histopathology
@@ -305,20 +543,27 @@ class ProtocolProcessingService:
                     protocol.analysis_type
                     == Protocol.AnalysisType.HISTOPATHOLOGY
                 ):
-                    self._create_cassette_slide_relationships(
-                        slide, data, protocol
+                    CassetteSlide.objects.bulk_create(
+                        self._cassette_slide_links(
+                            protocol, created_slides, slide_data
+                        )
                     )
 
-                # Log action
-                ProcessingLog.log_action(
-                    protocol=protocol,
-                    etapa=ProcessingLog.Stage.MONTAJE,
-                    usuario=user,
-                    slide=slide,
-                    observaciones=f"Slide registrado: {data.get('codigo_portaobjetos', '')}",
+                ProcessingLog.objects.bulk_create(
+                    ProcessingLog(
+                        protocol=protocol,
+                        etapa=ProcessingLog.Stage.MONTAJE,
+                        usuario=user,
+                        slide=slide,
+                        observaciones=f"Slide registrado: {slide.codigo_portaobjetos}",
+                    )
+                    for slide in created_slides
                 )
 
-                created_slides.append(slide)
+                # bulk_create sends no post_save: sync the WIP board here
+                from pages.signals import invalidate_dashboard_cache
+
+                invalidate_dashboard_cache(Slide)
 
             return True, created_slides, ""
 
@@ -328,34 +573,98 @@ class ProtocolProcessingService:
             )
             return False, [], str(e)
 
-    def _create_cassette_slide_relationships(
-        self, slide: Slide, slide_data: Dict, protocol: Protocol
-    ) -> None:
+    def _slide_codes(
+        self, protocol: Protocol, slide_data: List[Dict]
+    ) -> List[str]:
+        """
+        Slide codes for `slide_data`, generating the missing ones.
+
+        Generated codes continue the protocol's numbering like
+        Slide.generate_slide_code(), with a single count for the batch.
         """
-        Create cassette-slide relationships for histopathology protocols.
+        codes = []
+        next_number = None
+        for data in slide_data:
+            code = data.get("codigo_portaobjetos", "")
+            if not code:
+                if next_number is None:
+                    if not protocol.protocol_number:
+                        raise ValueError(
+                            "Protocol must have a protocol_number before creating slides"
+                        )
+                    next_number = Slide.objects.filter(
+                        protocol=protocol
+                    ).count()
+                next_number += 1
+                code = f"{protocol.protocol_number}-S{next_number}"
+            codes.append(code)
+        return codes
+
+    def _cassette_slide_links(
+        self,
+        protocol: Protocol,
+        slides: List[Slide],
+        slide_data: List[Dict],
+    ) -> List[CassetteSlide]:
+        """
+        Build the cassette-slide links of histopathology slides.
+
+        Each slide can hold up to two cassettes (`cassette_1` on top,
+        `cassette_2` below); a single cassette covers the whole slide.
+        All referenced cassettes are fetched with one query.
 
         Args:
-            slide: Slide instance
-            slide_data: Slide data containing cassette relationships
             protocol: Protocol instance
+            slides: Created slides, in the order of `slide_data`
+            slide_data: Slide data containing cassette relationships
         """
-        for pos in [1, 2]:  # Each slide can have up to 2 cassette positions
-            cassette_id = slide_data.get(f"cassette_{pos}")
-            if cassette_id:
-                try:
-                    cassette = Cassette.objects.get(
-                        id=cassette_id,
-                        histopathology_sample=protocol.histopathology_sample,
-                    )
-                    CassetteSlide.objects.create(
-                        cassette=cassette,
-                        slide=slide,
-                        position=pos,
-                    )
-                except Cassette.DoesNotExist:
+        wanted = [
+            [
+                data.get(f"cassette_{pos}")
+                for pos in (1, 2)
+                if data.get(f"cassette_{pos}")
+            ]
+            for data in slide_data
+        ]
+        cassettes = {
+            str(cassette.pk): cassette
+            for cassette in Cassette.objects.filter(
+                pk__in=[
+                    cassette_id
+                    for ids in wanted
+                    for cassette_id in ids
+                    if str(cassette_id).isdigit()
+                ],
+                histopathology_sample=protocol.histopathology_sample,
+            )
+        }
+
+        links = []
+        for slide, cassette_ids in zip(slides, wanted, strict=True):
+            found = []
+            for cassette_id in cassette_ids:
+                cassette = cassettes.get(str(cassette_id))
+                if cassette is None:
                     logger.warning(
                         f"Cassette {cassette_id} not found for slide {slide.id}"
                     )
+                elif cassette not in found:
+                    found.append(cassette)
+
+            if len(found) == 1:
+                positions = [CassetteSlide.Position.COMPLETO]
+            else:
+                positions = [
+                    CassetteSlide.Position.SUPERIOR,
+                    CassetteSlide.Position.INFERIOR,
+                ]
+            links.extend(
+                CassetteSlide(
+                    cassette=cassette, slide=slide, posicion=posicion
+                )
+                for cassette, posicion in zip(found, positions)
+            )
+        return links
 
     def update_slide_stage(
         self, slide: Slide, stage: str, user, observaciones: str = ""
@@ -403,6 +712,95 @@ class ProtocolProcessingService:
             logger.error(f"Error updating slide {slide.id} stage: {e}")
             return False, str(e)
 
+    def scan_stage(
+        self, codes: Sequence[str], stage: str, user, observaciones: str = ""
+    ) -> Tuple[List[str], List[str], str]:
+        """
+        Move the scanned cassettes or slides to `stage`.
+
+        Meant for scan stations, where a rack is scanned one code (or a
+        batch of codes) at a time: the codes are resolved with one lookup,
+        the stage timestamp and status are set with one UPDATE and the
+        processing logs are inserted in bulk, like Cassette.update_stage()
+        / Slide.update_stage() plus ProcessingLog.log_action() would for
+        each item. Cassette stages look up `codigo_cassette`, slide stages
+        `codigo_portaobjetos`.
+
+        Args:
+            codes: Scanned codes
+            stage: Target stage (see CASSETTE_SCAN_STAGES, SLIDE_SCAN_STAGES)
+            user: User scanning the items
+            observaciones: Observations logged with every item
+
+        Returns:
+            Tuple[List[str], List[str], str]: (updated codes, unknown
+            codes, error_message)
+        """
+        if stage in self.CASSETTE_SCAN_STAGES:
+            model, code_field, protocol_field = (
+                Cassette,
+                "codigo_cassette",
+                "histopathology_sample__protocol",
+            )
+            field, status, etapa = self.CASSETTE_SCAN_STAGES[stage]
+        elif stage in self.SLIDE_SCAN_STAGES:
+            model, code_field, protocol_field = (
+                Slide,
+                "codigo_portaobjetos",
+                "protocol",
+            )
+            field, status, etapa = self.SLIDE_SCAN_STAGES[stage]
+        else:
+            return [], [], _("Etapa no válida.")
+
+        codes = list(
+            dict.fromkeys(code for code in map(str.strip, codes) if code)
+        )
+        try:
+            with transaction.atomic():
+                items = {
+                    code: (pk, protocol_id)
+                    for pk, code, protocol_id in model.objects.filter(
+                        **{f"{code_field}__in": codes}
+                    ).values_list("pk", code_field, protocol_field)
+                }
+                if items:
+                    now = timezone.now()
+                    changes = {"estado": status, "updated_at": now}
+                    if field:
+                        changes[field] = now
+                    model.objects.filter(
+                        pk__in=[pk for pk, protocol_id in items.values()]
+                    ).update(**changes)
+
+                    if etapa:
+                        item_field = (
+                            "cassette_id" if model is Cassette else "slide_id"
+                        )
+                        ProcessingLog.objects.bulk_create(
+                            ProcessingLog(
+                                protocol_id=protocol_id,
+                                etapa=etapa,
+                                usuario=user,
+                                observaciones=observaciones,
+                                **{item_field: pk},
+                            )
+                            for pk, protocol_id in items.values()
+                        )
+
+                    # update() sends no post_save: sync the WIP board here
+                    from pages.signals import invalidate_dashboard_cache
+
+                    invalidate_dashboard_cache(model)
+
+        except Exception as e:
+            logger.error(f"Error scanning items to stage {stage}: {e}")
+            return [], [], str(e)
+
+        updated = [code for code in codes if code in items]
+        unknown = [code for code in codes if code not in items]
+        return updated, unknown, ""
+
     def update_slide_quality(
         self, slide: Slide, quality: str, observaciones: str = ""
     ) -> Tuple[bool, str]:
@@ -267,10 +267,12 @@ class ReportGenerationService:
                     description="Report finalized",
                 )
 
-                # Update protocol status
+                # Update protocol status and stage timestamps
                 protocol = report.protocol
                 protocol.status = Protocol.Status.REPORT_SENT
-                protocol.save(update_fields=["status"])
+                protocol.save(
+                    update_fields=["status", *protocol._stamp("finalized_at")]
+                )
 
                 logger.info(
                     f"Report {report.id} finalized by user {finalized_by.id}"
@@ -302,6 +304,7 @@ class ReportGenerationService:
                 report.status = Report.Status.SENT
                 report.sent_date = timezone.now()
                 report.save(update_fields=["status", "sent_date"])
+                report.protocol.mark_report_sent(report.sent_date)
 
                 # Log sending
                 ProtocolStatusHistory.log_status_change(
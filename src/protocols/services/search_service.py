@@ -0,0 +1,128 @@
+"""
+Full-text search over protocols, shared by the protocol and reception lists.
+
+On PostgreSQL protocols carry a `search_vector` (Spanish configuration,
+accents removed) kept up to date by a database trigger and covered by a GIN
+index (see migration 0017_add_protocol_search_vector). Other backends fall
+back to case-insensitive substring matching on the same fields.
+
+Fragments of codes and veterinarian identifiers are matched with
+`icontains`, which PostgreSQL compiles to UPPER(column::text) LIKE ...;
+pg_trgm GIN indexes on exactly those expressions (protocols migration 0018
+and accounts migration 0009) let it avoid sequential scans. Keep the
+lookups in CODE_FIELDS and VETERINARIAN_ID_FIELDS in that form.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Func, Q, QuerySet, TextField, Value
+
+SEARCH_CONFIG = "spanish"
+
+# Keep in sync with the trigger in migration 0017
+SEARCH_FIELDS = (
+    "animal_identification",
+    "owner_last_name",
+    "owner_first_name",
+    "species",
+    "breed",
+    "presumptive_diagnosis",
+    "clinical_history",
+)
+CODE_FIELDS = ("temporary_code", "protocol_number")
+VETERINARIAN_ID_FIELDS = ("license_number", "cuil_cuit", "dni")
+
+
+class ProtocolSearchService:
+    """
+    Build search filters for Protocol querysets or relations to Protocol.
+
+    `prefix` is the lookup path to the protocol ("protocol__" when filtering
+    reception logs, for instance).
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+
+    @staticmethod
+    def uses_full_text() -> bool:
+        return connection.vendor == "postgresql"
+
+    @staticmethod
+    def terms(text: str) -> list:
+        """Words of `text`; punctuation never reaches to_tsquery."""
+        return re.findall(r"\w+", text or "")
+
+    def query(self, text: str) -> SearchQuery:
+        """
+        tsquery matching every word of `text` as a prefix, so partial input
+        such as "gol retr" finds "Golden Retriever".
+        """
+        raw = " & ".join(f"{term}:*" for term in self.terms(text))
+        return SearchQuery(
+            Func(Value(raw), function="unaccent", output_field=TextField()),
+            config=SEARCH_CONFIG,
+            search_type="raw",
+        )
+
+    def text_filter(self, text: str) -> Q:
+        """Protocols whose descriptive fields match `text`."""
+        if not self.terms(text):
+            return Q(pk__in=[])
+        if self.uses_full_text():
+            return Q(**{f"{self.prefix}search_vector": self.query(text)})
+        condition = Q()
+        for term in self.terms(text):
+            term_q = Q()
+            for field in SEARCH_FIELDS:
+                term_q |= Q(**{f"{self.prefix}{field}__icontains": term})
+            condition &= term_q
+        return condition
+
+    def code_filter(self, text: str) -> Q:
+        """Protocols whose temporary code or protocol number contain `text`."""
+        condition = Q()
+        for field in CODE_FIELDS:
+            condition |= Q(**{f"{self.prefix}{field}__icontains": text})
+        return condition
+
+    def veterinarian_filter(self, text: str) -> Q:
+        """Protocols whose veterinarian's license, CUIL/CUIT or DNI contain
+        `text`."""
+        condition = Q()
+        for field in VETERINARIAN_ID_FIELDS:
+            condition |= Q(
+                **{f"{self.prefix}veterinarian__{field}__icontains": text}
+            )
+        return condition
+
+    def search(
+        self,
+        queryset: QuerySet,
+        text: str,
+        include_codes: bool = False,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """
+        Filter `queryset` to matches of `text`.
+
+        With `ranked`, results are ordered by relevance (most relevant
+        first, newest first on ties) on PostgreSQL; other backends keep the
+        queryset ordering.
+        """
+        text = (text or "").strip()
+        if not text:
+            return queryset
+        condition = self.text_filter(text)
+        if include_codes:
+            condition |= self.code_filter(text)
+        queryset = queryset.filter(condition)
+        if ranked and self.terms(text) and self.uses_full_text():
+            queryset = queryset.annotate(
+                search_rank=SearchRank(
+                    F(f"{self.prefix}search_vector"), self.query(text)
+                )
+            ).order_by("-search_rank", f"-{self.prefix}created_at")
+        return queryset
@@ -239,16 +239,21 @@ def check_container_memory_alerts():
         logger.debug("Docker stats not available, skipping container alert")
         return
 
-    data = get_docker_stats()
+    # Same collector as the admin dashboard; only matching containers are
+    # queried for stats.
+    data = get_docker_stats(name_filter=name_filter or None)
     if data.get("error"):
         logger.warning("Container memory check failed: %s", data["error"])
         return
+    if data.get("partial"):
+        logger.warning(
+            "Container memory check incomplete: %s",
+            [c["name"] for c in data["containers"] if c.get("stats_error")],
+        )
 
     over = []
     for c in data.get("containers") or []:
         name = c.get("name") or ""
-        if name_filter and name_filter not in name:
-            continue
         pct = c.get("memory_percent")
         if pct is not None and pct >= threshold:
             over.append(
@@ -277,7 +282,8 @@ def check_container_memory_alerts():
         return
 
     lines = [
-        "Los siguientes contenedores superan el umbral de memoria configurado (%s%%):",
+        "Los siguientes contenedores superan el umbral de memoria configurado (%s%%):"
+        % threshold,
         "",
     ]
     for item in over:
@@ -288,7 +294,7 @@ def check_container_memory_alerts():
             "Revisa el panel de administración del servidor o considera aumentar el límite de memoria del contenedor.",
         ]
     )
-    body = "\n".join(lines) % threshold
+    body = "\n".join(lines)
 
     try:
         email = EmailMultiAlternatives(
@@ -0,0 +1,279 @@
+"""
+Tests for the batch reception of a box of samples.
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User, Veterinarian
+from protocols.models import (
+    CytologySample,
+    HistopathologySample,
+    InAppNotification,
+    Protocol,
+    ProtocolCounter,
+    ProtocolStatusHistory,
+    ReceptionLog,
+)
+from protocols.services.protocol_service import ProtocolReceptionService
+
+
+class BulkReceptionTestCase(TestCase):
+    """Base fixture: two veterinarians with submitted protocols."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="staff@example.com",
+            username="staff",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+            email_verified=True,
+            is_staff=True,
+        )
+        self.vet_a = self._veterinarian("a")
+        self.vet_b = self._veterinarian("b")
+        self.protocols = [
+            self._protocol(self.vet_a, Protocol.AnalysisType.CYTOLOGY),
+            self._protocol(self.vet_a, Protocol.AnalysisType.HISTOPATHOLOGY),
+            self._protocol(self.vet_b, Protocol.AnalysisType.CYTOLOGY),
+            self._protocol(self.vet_a, Protocol.AnalysisType.CYTOLOGY),
+        ]
+        self.year = date.today().year
+        self.form_data = {
+            "sample_condition": Protocol.SampleCondition.OPTIMAL,
+            "reception_notes": "Caja de la clínica",
+        }
+
+    def _veterinarian(self, suffix):
+        user = User.objects.create_user(
+            email=f"vet-{suffix}@example.com",
+            username=f"vet-{suffix}",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+            email_verified=True,
+        )
+        return Veterinarian.objects.create(
+            user=user,
+            first_name="Vet",
+            last_name=suffix.upper(),
+            license_number=f"MP-BULK-{suffix}",
+            phone="123",
+            email=f"vet-{suffix}@example.com",
+        )
+
+    def _protocol(self, veterinarian, analysis_type):
+        protocol = Protocol.objects.create(
+            analysis_type=analysis_type,
+            veterinarian=veterinarian,
+            species="Canino",
+            animal_identification="Max",
+            submission_date=date.today(),
+        )
+        if analysis_type == Protocol.AnalysisType.CYTOLOGY:
+            CytologySample.objects.create(
+                protocol=protocol,
+                veterinarian=veterinarian,
+                technique_used="PAAF",
+                sampling_site="Linfonódulo",
+                number_of_slides=3,
+            )
+        else:
+            HistopathologySample.objects.create(
+                protocol=protocol,
+                veterinarian=veterinarian,
+                material_submitted="Nódulo cutáneo",
+                number_of_containers=2,
+            )
+        protocol.submit()
+        return protocol
+
+
+class ProcessBulkReceptionTest(BulkReceptionTestCase):
+    """Tests for ProtocolReceptionService.process_bulk_reception."""
+
+    def test_receives_batch_with_consecutive_numbers(self):
+        ProtocolCounter.objects.create(
+            analysis_type=Protocol.AnalysisType.CYTOLOGY,
+            year=self.year,
+            last_number=7,
+        )
+        yy = str(self.year)[-2:]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            received, error = (
+                ProtocolReceptionService().process_bulk_reception(
+                    self.protocols, self.form_data, self.staff
+                )
+            )
+
+        self.assertEqual(error, "")
+        self.assertEqual(
+            [protocol.protocol_number for protocol in received],
+            [f"CT {yy}/008", f"HP {yy}/001", f"CT {yy}/009", f"CT {yy}/010"],
+        )
+        for protocol in self.protocols:
+            protocol.refresh_from_db()
+            self.assertEqual(protocol.status, Protocol.Status.RECEIVED)
+            self.assertEqual(protocol.received_by, self.staff)
+            self.assertEqual(protocol.received_at, protocol.reception_date)
+            self.assertEqual(protocol.reception_notes, "Caja de la clínica")
+        self.assertEqual(
+            CytologySample.objects.get(
+                protocol=self.protocols[0]
+            ).number_slides_received,
+            3,
+        )
+        self.assertEqual(
+            HistopathologySample.objects.get(
+                protocol=self.protocols[1]
+            ).number_jars_received,
+            2,
+        )
+        self.assertEqual(
+            ReceptionLog.objects.filter(
+                action=ReceptionLog.Action.RECEIVED
+            ).count(),
+            4,
+        )
+        self.assertEqual(
+            ProtocolStatusHistory.objects.filter(
+                status=Protocol.Status.RECEIVED
+            ).count(),
+            4,
+        )
+
+    def test_one_notification_per_veterinarian(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProtocolReceptionService().process_bulk_reception(
+                self.protocols, self.form_data, self.staff
+            )
+
+        notifications = InAppNotification.objects.filter(
+            notification_type=InAppNotification.NotificationType.RECEPTION
+        )
+        self.assertEqual(
+            sorted(n.recipient_id for n in notifications),
+            sorted([self.vet_a.user_id, self.vet_b.user_id]),
+        )
+        self.assertEqual(
+            notifications.get(recipient=self.vet_a.user).title,
+            "3 muestras recibidas",
+        )
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["vet-a@example.com", "vet-b@example.com"],
+        )
+
+    def test_skips_protocols_no_longer_submitted(self):
+        first = self.protocols[0]
+        first.receive(received_by=self.staff)
+        number = first.protocol_number
+
+        received, error = ProtocolReceptionService().process_bulk_reception(
+            self.protocols, self.form_data, self.staff
+        )
+
+        self.assertEqual(error, "")
+        self.assertEqual(received, self.protocols[1:])
+        first.refresh_from_db()
+        self.assertEqual(first.protocol_number, number)
+        self.assertEqual(
+            ReceptionLog.objects.filter(protocol=first).count(), 0
+        )
+
+    def test_failure_rolls_back_the_whole_batch(self):
+        with (
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+            patch.object(
+                ProtocolStatusHistory.objects,
+                "bulk_create",
+                side_effect=RuntimeError("boom"),
+            ),
+        ):
+            received, error = (
+                ProtocolReceptionService().process_bulk_reception(
+                    self.protocols, self.form_data, self.staff
+                )
+            )
+
+        self.assertEqual((received, error), ([], "boom"))
+        self.assertEqual(callbacks, [])
+        self.assertFalse(ProtocolCounter.objects.exists())
+        self.assertFalse(ReceptionLog.objects.exists())
+        for protocol in self.protocols:
+            protocol.refresh_from_db()
+            self.assertEqual(protocol.status, Protocol.Status.SUBMITTED)
+            self.assertIsNone(protocol.protocol_number)
+
+
+class ReceptionBulkViewTest(BulkReceptionTestCase):
+    """Tests for the batch reception view."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(email="staff@example.com", password="testpass123")
+        self.url = reverse("protocols:reception_bulk")
+
+    def _codes(self, protocols):
+        return "\n".join(protocol.temporary_code for protocol in protocols)
+
+    def test_get_prefills_codes(self):
+        code = self.protocols[0].temporary_code
+
+        response = self.client.get(self.url, {"code": code})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "protocols/reception_bulk.html")
+        self.assertEqual(
+            response.context["form"].initial["temporary_codes"], code
+        )
+
+    def test_post_receives_scanned_codes(self):
+        response = self.client.post(
+            self.url,
+            {
+                "temporary_codes": self._codes(self.protocols).lower(),
+                "sample_condition": Protocol.SampleCondition.OPTIMAL,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["received"]), 4)
+        self.assertEqual(
+            Protocol.objects.filter(status=Protocol.Status.RECEIVED).count(),
+            4,
+        )
+
+    def test_unknown_code_receives_nothing(self):
+        response = self.client.post(
+            self.url,
+            {
+                "temporary_codes": self._codes(self.protocols) + "\nTMP-NOPE",
+                "sample_condition": Protocol.SampleCondition.OPTIMAL,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("TMP-NOPE", str(response.context["form"].errors))
+        self.assertFalse(
+            Protocol.objects.filter(status=Protocol.Status.RECEIVED).exists()
+        )
+
+    def test_rejection_is_not_offered(self):
+        response = self.client.post(
+            self.url,
+            {
+                "temporary_codes": self._codes(self.protocols),
+                "sample_condition": Protocol.SampleCondition.REJECTED,
+            },
+        )
+
+        self.assertIn("sample_condition", response.context["form"].errors)
+        self.assertFalse(
+            Protocol.objects.filter(status=Protocol.Status.RECEIVED).exists()
+        )
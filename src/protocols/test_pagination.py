@@ -0,0 +1,231 @@
+"""
+Tests for keyset (cursor) pagination and the listings using it.
+"""
+
+from datetime import timedelta
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, Veterinarian
+from protocols.models import InAppNotification, Protocol
+from protocols.pagination import InvalidCursor, KeysetPaginator
+from protocols.views import ProtocolListView
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Base fixture: protocols, some sharing the same created_at."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            password="testpass123",
+            role=User.Role.ADMIN,
+        )
+        vet_user = User.objects.create_user(
+            email="vet@example.com",
+            username="vet",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        now = timezone.now()
+        for index in range(7):
+            protocol = Protocol.objects.create(
+                veterinarian=self.vet,
+                analysis_type=Protocol.AnalysisType.CYTOLOGY,
+                status=Protocol.Status.SUBMITTED,
+                submission_date=timezone.localdate(),
+                animal_identification=f"Animal {index}",
+                species="Canino",
+                presumptive_diagnosis="Control",
+            )
+            # Pairs of protocols share a timestamp, so the primary key
+            # has to break ties
+            Protocol.objects.filter(pk=protocol.pk).update(
+                created_at=now - timedelta(minutes=index // 2)
+            )
+        self.expected = list(
+            Protocol.objects.order_by("-created_at", "-pk").values_list(
+                "pk", flat=True
+            )
+        )
+
+    def _ids(self, page):
+        return [protocol.pk for protocol in page.object_list]
+
+
+class KeysetPaginatorTest(KeysetPaginationTestCase):
+    """Tests for protocols.pagination.KeysetPaginator."""
+
+    def test_forward_pages_cover_every_row_once(self):
+        paginator = KeysetPaginator(Protocol.objects.all(), 3)
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        self.assertFalse(first.has_previous())
+        self.assertTrue(second.has_previous())
+        self.assertFalse(third.has_next())
+        self.assertIsNone(third.next_cursor)
+        self.assertEqual(
+            self._ids(first) + self._ids(second) + self._ids(third),
+            self.expected,
+        )
+
+    def test_backward_cursor_returns_previous_page(self):
+        paginator = KeysetPaginator(Protocol.objects.all(), 2)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        self.assertEqual(
+            self._ids(paginator.page(third.previous_cursor)),
+            self._ids(second),
+        )
+        # Going back to the start always shows a full first page
+        back_to_first = paginator.page(second.previous_cursor)
+        self.assertEqual(self._ids(back_to_first), self._ids(first))
+        self.assertFalse(back_to_first.has_previous())
+
+    def test_mixed_directions(self):
+        queryset = Protocol.objects.order_by(
+            "species", "-animal_identification"
+        )
+        paginator = KeysetPaginator(queryset, 4)
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+
+        self.assertEqual(
+            [p.animal_identification for p in first]
+            + [p.animal_identification for p in second],
+            [f"Animal {index}" for index in range(6, -1, -1)],
+        )
+
+    def test_values_querysets(self):
+        queryset = Protocol.objects.values("id", "created_at")
+        paginator = KeysetPaginator(queryset, 4)
+
+        second = paginator.page(paginator.page().next_cursor)
+
+        self.assertEqual([row["id"] for row in second], self.expected[4:])
+
+    def test_invalid_cursor_raises(self):
+        paginator = KeysetPaginator(Protocol.objects.all(), 3)
+
+        for cursor in ("not-a-cursor", "e30", "eyJ2IjogWzFdfQ"):
+            with (
+                self.subTest(cursor=cursor),
+                self.assertRaises(InvalidCursor),
+            ):
+                paginator.page(cursor)
+
+    @skipIf(
+        connection.vendor == "postgresql", "PostgreSQL totals are estimates"
+    )
+    def test_estimate_total_is_exact_off_postgresql(self):
+        paginator = KeysetPaginator(
+            Protocol.objects.all(), 3, estimate_total=True
+        )
+
+        self.assertEqual(paginator.count, 7)
+        self.assertIsNone(KeysetPaginator(Protocol.objects.all(), 3).count)
+
+
+class KeysetPaginatedViewsTest(KeysetPaginationTestCase):
+    """Listings follow cursors instead of page numbers."""
+
+    @patch.object(ProtocolListView, "paginate_by", 3)
+    def test_protocol_list_follows_cursor(self):
+        self.client.login(email="admin@example.com", password="testpass123")
+        url = reverse("protocols:protocol_list")
+
+        first = self.client.get(url)
+        second = self.client.get(
+            url, {"cursor": first.context["page_obj"].next_cursor}
+        )
+
+        self.assertEqual(
+            self._ids(first.context["page_obj"]), self.expected[:3]
+        )
+        self.assertEqual(
+            self._ids(second.context["page_obj"]), self.expected[3:6]
+        )
+        self.assertContains(first, "cursor=")
+        self.assertNotContains(first, "Anterior")
+        self.assertContains(second, "Anterior")
+
+    def test_invalid_cursor_shows_first_page(self):
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        response = self.client.get(
+            reverse("protocols:protocol_list"), {"cursor": "garbage"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._ids(response.context["page_obj"]), self.expected
+        )
+
+    def test_rejected_list_paginates_by_rejection_date(self):
+        Protocol.objects.update(
+            status=Protocol.Status.REJECTED, reception_date=None
+        )
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        response = self.client.get(reverse("protocols:rejected_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._ids(response.context["page_obj"]), self.expected
+        )
+
+
+class NotificationCursorAPITest(KeysetPaginationTestCase):
+    """Tests for cursor pagination of the notifications API."""
+
+    def setUp(self):
+        super().setUp()
+        for index in range(5):
+            InAppNotification.objects.create(
+                recipient=self.admin,
+                notification_type=InAppNotification.NotificationType.CUSTOM,
+                title=f"Aviso {index}",
+            )
+        self.client.login(email="admin@example.com", password="testpass123")
+        self.url = reverse("pages_api:notifications:list")
+
+    def test_walks_all_notifications_with_cursors(self):
+        titles = []
+        params = {"per_page": 2}
+        while True:
+            data = self.client.get(self.url, params).json()
+            titles += [n["title"] for n in data["notifications"]]
+            if not data["next_cursor"]:
+                break
+            params["cursor"] = data["next_cursor"]
+
+        self.assertEqual(
+            titles, [f"Aviso {index}" for index in range(4, -1, -1)]
+        )
+        if not data["total_is_estimate"]:
+            self.assertEqual(data["total"], 5)
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(self.url, {"cursor": "garbage"})
+
+        self.assertEqual(response.status_code, 400)
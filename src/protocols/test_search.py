@@ -0,0 +1,264 @@
+"""
+Tests for the shared protocol search service and its indexes.
+"""
+
+from unittest import skipIf, skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, Veterinarian
+from protocols.models import Protocol, ReceptionLog
+from protocols.services.search_service import ProtocolSearchService
+
+on_postgresql = skipUnless(
+    connection.vendor == "postgresql", "Full-text search needs PostgreSQL"
+)
+
+
+class ProtocolSearchTestCase(TestCase):
+    """Base fixture: protocols with different descriptive fields."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="staff@example.com",
+            username="staff",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            email="vet@example.com",
+            username="vet",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        self.max = self._protocol(
+            "Max",
+            owner_last_name="Gómez",
+            breed="Golden Retriever",
+            presumptive_diagnosis="Nódulo cutáneo",
+        )
+        self.luna = self._protocol(
+            "Luna",
+            species="Felino",
+            presumptive_diagnosis="Carcinoma mamario",
+            clinical_history="Tumores en glándulas mamarias",
+        )
+        self.service = ProtocolSearchService()
+
+    def _protocol(self, animal, status=Protocol.Status.SUBMITTED, **fields):
+        fields.setdefault("species", "Canino")
+        fields.setdefault("presumptive_diagnosis", "Control")
+        return Protocol.objects.create(
+            veterinarian=self.vet,
+            analysis_type=Protocol.AnalysisType.CYTOLOGY,
+            status=status,
+            submission_date=timezone.localdate(),
+            animal_identification=animal,
+            **fields,
+        )
+
+    def _search(self, text, **kwargs):
+        return list(
+            self.service.search(Protocol.objects.all(), text, **kwargs)
+        )
+
+
+class ProtocolSearchServiceTest(ProtocolSearchTestCase):
+    """Matching behaviour common to every backend."""
+
+    def test_matches_owner_breed_and_clinical_history(self):
+        self.assertEqual(self._search("Gómez"), [self.max])
+        self.assertEqual(self._search("golden"), [self.max])
+        self.assertEqual(self._search("glándulas"), [self.luna])
+
+    def test_every_word_must_match_as_prefix(self):
+        self.assertEqual(self._search("gol retr"), [self.max])
+        self.assertEqual(self._search("golden felino"), [])
+
+    def test_codes_only_when_requested(self):
+        code = self.luna.temporary_code
+
+        self.assertEqual(self._search(code), [])
+        self.assertEqual(self._search(code, include_codes=True), [self.luna])
+
+    def test_punctuation_only_matches_nothing(self):
+        self.assertEqual(self._search("&|!:*"), [])
+
+    def test_veterinarian_filter_matches_any_identifier(self):
+        self.vet.cuil_cuit = "20-31234567-8"
+        self.vet.save()
+
+        for fragment in ("mp-", "3123456"):
+            self.assertEqual(
+                Protocol.objects.filter(
+                    self.service.veterinarian_filter(fragment)
+                ).count(),
+                2,
+            )
+        self.assertFalse(
+            Protocol.objects.filter(self.service.veterinarian_filter("XYZ"))
+        )
+
+    def test_prefix_filters_related_protocols(self):
+        ReceptionLog.objects.create(
+            protocol=self.luna,
+            user=self.staff,
+            action=ReceptionLog.Action.RECEIVED,
+        )
+        logs = ProtocolSearchService(prefix="protocol__").search(
+            ReceptionLog.objects.all(), "felino"
+        )
+
+        self.assertEqual([log.protocol for log in logs], [self.luna])
+
+
+@on_postgresql
+class ProtocolFullTextSearchTest(ProtocolSearchTestCase):
+    """PostgreSQL-specific behaviour of the search vector."""
+
+    def test_search_vector_is_maintained_by_trigger(self):
+        self.max.clinical_history = "Dermatitis crónica"
+        self.max.save()
+
+        self.assertEqual(self._search("dermatitis"), [self.max])
+
+    def test_accents_and_stemming_are_ignored(self):
+        self.assertEqual(self._search("gomez"), [self.max])
+        self.assertEqual(self._search("nodulos cutaneos"), [self.max])
+        self.assertEqual(self._search("tumor"), [self.luna])
+
+    def test_ranked_results_prefer_stronger_matches(self):
+        # "mamario" only in the diagnosis, weaker than Luna's diagnosis
+        # plus history
+        other = self._protocol(
+            "Kira", clinical_history="Antecedente de quiste mamario"
+        )
+
+        results = self._search("mamario", ranked=True)
+
+        self.assertEqual(results, [self.luna, other])
+
+    def test_query_uses_gin_index(self):
+        query = str(self.service.search(Protocol.objects.all(), "max").query)
+
+        self.assertIn("@@", query)
+        self.assertIn("unaccent", query)
+
+
+@on_postgresql
+class TrigramIndexTest(ProtocolSearchTestCase):
+    """Code lookups match the expressions of the pg_trgm indexes."""
+
+    def test_code_lookup_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_indexes "
+                "WHERE indexname = 'protocol_temp_code_trgm'"
+            )
+            if cursor.fetchone() is None:
+                self.skipTest("pg_trgm is not available")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = Protocol.objects.filter(
+            self.service.code_filter("CT-2026")
+        ).explain()
+
+        self.assertIn("protocol_temp_code_trgm", plan)
+
+
+class BenchmarkCodeSearchCommandTest(TestCase):
+    """The benchmark refuses to run outside PostgreSQL."""
+
+    @skipIf(connection.vendor == "postgresql", "Runs on other backends")
+    def test_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_code_search", protocols=10)
+
+
+class ProtocolSearchViewsTest(ProtocolSearchTestCase):
+    """The protocol and reception lists use the shared search."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(email="staff@example.com", password="testpass123")
+
+    def test_protocol_list_searches_owner(self):
+        User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            password="testpass123",
+            role=User.Role.ADMIN,
+        )
+        self.client.login(email="admin@example.com", password="testpass123")
+
+        response = self.client.get(
+            reverse("protocols:protocol_list"), {"search": "gómez"}
+        )
+
+        self.assertEqual(list(response.context["protocols"]), [self.max])
+
+    def test_reception_pending_searches_diagnosis(self):
+        response = self.client.get(
+            reverse("protocols:reception_pending"),
+            {"animal_name": "carcinoma"},
+        )
+
+        self.assertEqual(list(response.context["protocols"]), [self.luna])
+
+    def test_reception_pending_filters_by_license_fragment(self):
+        other_user = User.objects.create_user(
+            email="other@example.com",
+            username="other",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        other_vet = Veterinarian.objects.create(
+            user=other_user,
+            first_name="Ana",
+            last_name="Ruiz",
+            license_number="MP-2",
+            phone="123",
+            email="other@example.com",
+        )
+        self.luna.veterinarian = other_vet
+        self.luna.save()
+
+        response = self.client.get(
+            reverse("protocols:reception_pending"),
+            {"veterinarian_license": "p-2"},
+        )
+
+        self.assertEqual(list(response.context["protocols"]), [self.luna])
+
+    def test_reception_history_searches_species(self):
+        ReceptionLog.objects.create(
+            protocol=self.luna,
+            user=self.staff,
+            action=ReceptionLog.Action.RECEIVED,
+        )
+        ReceptionLog.objects.create(
+            protocol=self.max,
+            user=self.staff,
+            action=ReceptionLog.Action.RECEIVED,
+        )
+
+        response = self.client.get(
+            reverse("protocols:reception_history"), {"animal_name": "felino"}
+        )
+
+        self.assertEqual(
+            [log.protocol for log in response.context["logs"]], [self.luna]
+        )
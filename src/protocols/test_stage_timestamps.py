@@ -0,0 +1,226 @@
+"""
+Tests for the protocol stage timestamps (received_at ... sent_at) and the
+TAT metrics derived from them.
+"""
+
+import importlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Histopathologist, User, Veterinarian
+from protocols.models import Protocol, ProtocolStatusHistory, Report
+from protocols.services.report_service import ReportGenerationService
+
+backfill = importlib.import_module(
+    "protocols.migrations.0021_backfill_protocol_stage_timestamps"
+)
+
+
+class StageTimestampsTestCase(TestCase):
+    """Base fixture: a veterinarian, a histopathologist and a protocol."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="staff@example.com",
+            username="staff",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+            is_staff=True,
+        )
+        vet_user = User.objects.create_user(
+            email="vet@example.com",
+            username="vet",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.vet = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="Juan",
+            last_name="Pérez",
+            license_number="MP-1",
+            phone="123",
+            email="vet@example.com",
+        )
+        self.histopathologist = Histopathologist.objects.create(
+            user=self.staff,
+            first_name="Ana",
+            last_name="López",
+            license_number="MV-1",
+        )
+        self.protocol = Protocol.objects.create(
+            veterinarian=self.vet,
+            analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+            status=Protocol.Status.SUBMITTED,
+            submission_date=timezone.localdate(),
+            animal_identification="Max",
+            species="Canino",
+            presumptive_diagnosis="Tumor",
+        )
+
+    def _report(self, **kwargs):
+        return Report.objects.create(
+            protocol=self.protocol,
+            histopathologist=self.histopathologist,
+            veterinarian=self.vet,
+            diagnosis="Carcinoma",
+            **kwargs,
+        )
+
+
+class TransitionStampsTest(StageTimestampsTestCase):
+    """Transition methods stamp each stage once, with the status change."""
+
+    def test_receive_and_start_processing(self):
+        self.protocol.receive(received_by=self.staff)
+        self.assertTrue(self.protocol.start_processing())
+        first_start = self.protocol.processing_started_at
+
+        self.protocol.refresh_from_db()
+        self.assertEqual(
+            self.protocol.received_at, self.protocol.reception_date
+        )
+        self.assertEqual(self.protocol.processing_started_at, first_start)
+        self.assertIsNone(self.protocol.ready_at)
+        # Already processing: nothing changes
+        self.assertFalse(self.protocol.start_processing())
+
+    def test_created_received_protocol_gets_received_at(self):
+        received = timezone.now() - timedelta(days=3)
+        protocol = Protocol.objects.create(
+            veterinarian=self.vet,
+            analysis_type=Protocol.AnalysisType.CYTOLOGY,
+            status=Protocol.Status.RECEIVED,
+            submission_date=timezone.localdate(),
+            reception_date=received,
+            animal_identification="Luna",
+            species="Felino",
+        )
+
+        self.assertEqual(protocol.received_at, received)
+
+    def test_report_finalize_and_send_stamp_protocol(self):
+        report = self._report()
+
+        report.finalize()
+        finalized_at = Protocol.objects.get(pk=self.protocol.pk).finalized_at
+        report.mark_as_sent("vet@example.com")
+
+        self.protocol.refresh_from_db()
+        self.assertIsNotNone(finalized_at)
+        self.assertEqual(self.protocol.finalized_at, finalized_at)
+        self.assertEqual(self.protocol.status, Protocol.Status.SUBMITTED)
+        self.assertEqual(self.protocol.sent_at, report.sent_date)
+
+    def test_service_finalization_saves_protocol_once(self):
+        report = self._report()
+
+        with CaptureQueriesContext(connection) as queries:
+            ReportGenerationService().finalize_report(report, self.staff)
+
+        self.protocol.refresh_from_db()
+        self.assertEqual(self.protocol.status, Protocol.Status.REPORT_SENT)
+        self.assertIsNotNone(self.protocol.finalized_at)
+        protocol_updates = [
+            q
+            for q in queries
+            if q["sql"].startswith('UPDATE "protocols_protocol"')
+        ]
+        self.assertEqual(len(protocol_updates), 1)
+
+    def test_service_keeps_first_finalization(self):
+        service = ReportGenerationService()
+        earlier = timezone.now() - timedelta(days=2)
+        Protocol.objects.filter(pk=self.protocol.pk).update(
+            finalized_at=earlier
+        )
+        self.protocol.refresh_from_db()
+        report = self._report(version=2)
+
+        self.assertEqual(
+            service.finalize_report(report, self.staff), (True, "")
+        )
+        self.assertEqual(service.send_report(report, self.staff), (True, ""))
+
+        self.protocol.refresh_from_db()
+        self.assertEqual(self.protocol.finalized_at, earlier)
+        self.assertEqual(self.protocol.sent_at, report.sent_date)
+
+
+class BackfillStageTimestampsTest(StageTimestampsTestCase):
+    """Tests for the 0021 backfill from the status history."""
+
+    def _log(self, status, changed_at, description=""):
+        entry = ProtocolStatusHistory.log_status_change(
+            self.protocol, status, description=description
+        )
+        ProtocolStatusHistory.objects.filter(pk=entry.pk).update(
+            changed_at=changed_at
+        )
+
+    def test_backfills_from_history_and_reports(self):
+        now = timezone.now()
+        received = now - timedelta(days=10)
+        Protocol.objects.filter(pk=self.protocol.pk).update(
+            status=Protocol.Status.REPORT_SENT, reception_date=received
+        )
+        self._log(Protocol.Status.PROCESSING, now - timedelta(days=9))
+        self._log(Protocol.Status.READY, now - timedelta(days=6))
+        self._log(Protocol.Status.PROCESSING, now - timedelta(days=5))
+        self._log(
+            Protocol.Status.READY,
+            now - timedelta(days=4),
+            description=backfill.FINALIZED_DESCRIPTION,
+        )
+        sent = now - timedelta(days=3)
+        self._report(status=Report.Status.SENT, sent_date=sent)
+
+        backfill.backfill_stage_timestamps(apps, None)
+
+        self.protocol.refresh_from_db()
+        self.assertEqual(self.protocol.received_at, received)
+        self.assertEqual(
+            self.protocol.processing_started_at, now - timedelta(days=9)
+        )
+        self.assertEqual(self.protocol.ready_at, now - timedelta(days=6))
+        self.assertEqual(self.protocol.finalized_at, now - timedelta(days=4))
+        self.assertEqual(self.protocol.sent_at, sent)
+
+    def test_rejected_protocols_are_not_received(self):
+        Protocol.objects.filter(pk=self.protocol.pk).update(
+            status=Protocol.Status.REJECTED, reception_date=timezone.now()
+        )
+
+        backfill.backfill_stage_timestamps(apps, None)
+
+        self.protocol.refresh_from_db()
+        self.assertIsNone(self.protocol.received_at)
+
+
+class StageTimestampTATTest(StageTimestampsTestCase):
+    """TAT reads the stage timestamps, not the report's last edit."""
+
+    def test_report_edits_do_not_move_tat(self):
+        now = timezone.now()
+        Protocol.objects.filter(pk=self.protocol.pk).update(
+            status=Protocol.Status.REPORT_SENT,
+            received_at=now - timedelta(days=6),
+            finalized_at=now - timedelta(days=2),
+        )
+        report = self._report(status=Report.Status.FINALIZED)
+        report.diagnosis = "Carcinoma (corregido)"
+        report.save()
+
+        self.client.login(email="staff@example.com", password="testpass123")
+        response = self.client.get(
+            reverse("pages_api:dashboard_tat") + "?format=json"
+        )
+
+        histo = response.json()["histopatologia"]
+        self.assertEqual(histo["tat_promedio_dias"], 4.0)
+        self.assertEqual(histo["dentro_objetivo"], 100)
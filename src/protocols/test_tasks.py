@@ -3,8 +3,11 @@ Tests for Celery tasks in protocols.tasks module.
 """
 
 from datetime import date
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from accounts.models import User, Veterinarian
 from protocols import tasks
@@ -169,3 +172,45 @@ class CeleryTaskTest(TestCase):
         """Test that send_email task has correct name."""
         task = tasks.send_email
         self.assertEqual(task.name, "protocols.tasks.send_email")
+
+
+@override_settings(
+    CONTAINER_MEMORY_ALERT_THRESHOLD=85,
+    CONTAINER_MEMORY_ALERT_NAME_FILTER="laboratory-web",
+)
+class ContainerMemoryAlertTest(TestCase):
+    """check_container_memory_alerts uses the shared Docker collector."""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(
+            email="admin@example.com",
+            username="admin",
+            password="testpass123",
+            role=User.Role.ADMIN,
+        )
+
+    @patch("services.server_stats_service.get_docker_stats")
+    def test_queries_only_filtered_containers_and_alerts(self, mock_stats):
+        mock_stats.return_value = {
+            "containers": [
+                {
+                    "name": "laboratory-web-1",
+                    "memory_percent": 90.0,
+                    "stats_error": None,
+                },
+                {
+                    "name": "laboratory-web-2",
+                    "memory_percent": None,
+                    "stats_error": "Tiempo de espera agotado",
+                },
+            ],
+            "error": None,
+            "partial": True,
+        }
+
+        tasks.check_container_memory_alerts()
+
+        mock_stats.assert_called_once_with(name_filter="laboratory-web")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("laboratory-web-1: 90.0%", mail.outbox[0].body)
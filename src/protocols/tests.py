@@ -1,12 +1,18 @@
+import importlib
 import uuid
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import mock_open, patch
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import Histopathologist, Veterinarian
 from protocols.forms import (
@@ -15,6 +21,7 @@ from protocols.forms import (
 )
 from protocols.models import (
     Cassette,
+    CassetteCounter,
     CassetteSlide,
     CytologySample,
     HistopathologySample,
@@ -26,6 +33,7 @@ from protocols.models import (
     WorkOrder,
     WorkOrderService,
 )
+from protocols.services.protocol_service import ProtocolProcessingService
 
 User = get_user_model()
 
@@ -998,6 +1006,80 @@ class CassetteModelTest(TestCase):
             cassette3.color_cassette, Cassette.CassetteColor.NARANJA
         )
 
+    def test_cassette_numbering_survives_deletions(self):
+        """Codes come from the sample counter, not from the cassette count."""
+        first = Cassette.objects.create(
+            histopathology_sample=self.sample, material_incluido="Material 1"
+        )
+        Cassette.objects.create(
+            histopathology_sample=self.sample, material_incluido="Material 2"
+        )
+        first.delete()
+
+        cassette = Cassette.objects.create(
+            histopathology_sample=self.sample, material_incluido="Material 3"
+        )
+
+        self.assertTrue(cassette.codigo_cassette.endswith("-C3"))
+
+    def test_create_cassettes_in_constant_queries(self):
+        """The service creates any number of cassettes in fixed queries."""
+        service = ProtocolProcessingService()
+        self.protocol.refresh_from_db()
+        self.protocol.start_processing()
+        # Loaded by the view with select_related()
+        self.assertEqual(self.protocol.histopathology_sample, self.sample)
+
+        def create(count):
+            data = [{"material": f"Fragmento {i}"} for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                success, cassettes, error = service.create_cassettes(
+                    self.protocol, data, self.lab_staff
+                )
+            self.assertTrue(success, error)
+            return cassettes, len(queries)
+
+        cassettes, few_queries = create(2)
+        more_cassettes, many_queries = create(10)
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(
+            [cassette.codigo_cassette for cassette in more_cassettes],
+            [f"{self.protocol.protocol_number}-C{n}" for n in range(3, 13)],
+        )
+        for cassette in Cassette.objects.filter(
+            histopathology_sample=self.sample
+        ):
+            self.assertEqual(cassette.estado, Cassette.Status.EN_PROCESO)
+            self.assertIsNotNone(cassette.fecha_encasetado)
+        self.assertEqual(
+            ProcessingLog.objects.filter(
+                etapa=ProcessingLog.Stage.ENCASETADO,
+                cassette__in=cassettes + more_cassettes,
+            ).count(),
+            12,
+        )
+
+    def test_backfill_starts_counter_after_existing_cassettes(self):
+        """Migration 0022 continues the numbering of existing cassettes."""
+        backfill = importlib.import_module(
+            "protocols.migrations.0022_add_cassette_counter"
+        )
+        for _ in range(3):
+            Cassette.objects.create(
+                histopathology_sample=self.sample, material_incluido="M"
+            )
+        CassetteCounter.objects.all().delete()
+
+        backfill.backfill_cassette_counters(apps, None)
+
+        self.assertEqual(
+            CassetteCounter.objects.get(
+                histopathology_sample=self.sample
+            ).last_number,
+            3,
+        )
+
 
 class SlideModelTest(TestCase):
     """Test cases for Slide model (Step 05)."""
@@ -1260,6 +1342,105 @@ class CassetteSlideTest(TestCase):
                 slide=self.slide,
             )
 
+    def test_register_slides_links_cassettes(self):
+        """Registered slides are linked to their cassettes by position."""
+        success, slides, error = ProtocolProcessingService().register_slides(
+            self.protocol,
+            [
+                {
+                    "cassette_1": self.cassette1.pk,
+                    "cassette_2": self.cassette2.pk,
+                },
+                {"cassette_1": str(self.cassette2.pk)},
+                {"cassette_1": 999999},
+            ],
+            self.lab_staff,
+        )
+
+        self.assertTrue(success, error)
+        number = self.protocol.protocol_number
+        self.assertEqual(
+            [slide.codigo_portaobjetos for slide in slides],
+            [f"{number}-S2", f"{number}-S3", f"{number}-S4"],
+        )
+        self.assertEqual(
+            sorted(
+                slides[0].cassette_slides.values_list("cassette", "posicion")
+            ),
+            sorted(
+                [
+                    (self.cassette1.pk, CassetteSlide.Position.SUPERIOR),
+                    (self.cassette2.pk, CassetteSlide.Position.INFERIOR),
+                ]
+            ),
+        )
+        self.assertEqual(
+            list(
+                slides[1].cassette_slides.values_list("cassette", "posicion")
+            ),
+            [(self.cassette2.pk, CassetteSlide.Position.COMPLETO)],
+        )
+        self.assertFalse(slides[2].cassette_slides.exists())
+        self.assertEqual(
+            ProcessingLog.objects.filter(
+                etapa=ProcessingLog.Stage.MONTAJE, slide__in=slides
+            ).count(),
+            3,
+        )
+
+    def test_register_slides_in_constant_queries(self):
+        """Registering any number of slides takes a fixed set of queries."""
+        service = ProtocolProcessingService()
+        # Loaded by the view with select_related()
+        self.assertEqual(self.protocol.histopathology_sample, self.sample)
+
+        def register(count):
+            data = [
+                {
+                    "cassette_1": self.cassette1.pk,
+                    "cassette_2": self.cassette2.pk,
+                }
+                for _ in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                success, slides, error = service.register_slides(
+                    self.protocol, data, self.lab_staff
+                )
+            self.assertTrue(success, error)
+            return len(queries)
+
+        self.assertEqual(register(2), register(40))
+        self.assertEqual(
+            CassetteSlide.objects.filter(cassette=self.cassette1).count(), 42
+        )
+
+    def test_slide_register_view_links_cassette(self):
+        """The registration view stores the cassette link of a slide."""
+        self.client.login(email="lab@example.com", password="testpass123")
+
+        response = self.client.post(
+            reverse(
+                "protocols:slide_register",
+                kwargs={"protocol_pk": self.protocol.pk},
+            ),
+            {
+                "slide_count": 1,
+                "tecnica_coloracion_0": "Hematoxilina-Eosina",
+                "cassette_0_1": self.cassette1.pk,
+            },
+        )
+
+        self.assertRedirects(
+            response,
+            reverse(
+                "protocols:processing_status", kwargs={"pk": self.protocol.pk}
+            ),
+            fetch_redirect_response=False,
+        )
+        link = CassetteSlide.objects.get(cassette=self.cassette1)
+        self.assertEqual(link.posicion, CassetteSlide.Position.COMPLETO)
+        self.assertEqual(link.slide.protocol, self.protocol)
+
 
 class ProcessingLogTest(TestCase):
     """Test cases for ProcessingLog model (Step 05)."""
@@ -1624,6 +1805,42 @@ class ProcessingViewsTest(TestCase):
         # Should show at least 2 received protocols
         self.assertGreaterEqual(context["protocols_received"], 2)
 
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "processing-dashboard-tests",
+            }
+        }
+    )
+    def test_processing_dashboard_counts_cached_until_save(self):
+        """Counts are served from cache until a cassette is saved."""
+        cache.clear()
+        self.client.login(email="staff@example.com", password="testpass123")
+        url = reverse("protocols:processing_dashboard")
+
+        first = self.client.get(url)
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Cassette.objects.create(
+                histopathology_sample=self.histopathology_sample,
+                codigo_cassette="HP-D-C1",
+                material_incluido="Fragmento",
+            )
+        refreshed = self.client.get(url)
+
+        self.assertFalse(
+            any(
+                "protocols_cassette" in q["sql"]
+                for q in cached.captured_queries
+            )
+        )
+        self.assertEqual(
+            refreshed.context["cassettes_pending"],
+            first.context["cassettes_pending"] + 1,
+        )
+
     def test_processing_dashboard_view_permission_staff_required(self):
         """Test that only staff can access processing dashboard."""
         # Create a non-staff user for this test
@@ -1667,6 +1884,73 @@ class ProcessingViewsTest(TestCase):
             self.assertTrue(hasattr(protocol, "days_in_process"))
             self.assertGreaterEqual(protocol.days_in_process, 0)
 
+    def test_processing_queue_view_progress_is_annotated(self):
+        """Cassette progress and days in process come from SQL."""
+        Cassette.objects.create(
+            histopathology_sample=self.histopathology_sample,
+            codigo_cassette="HP-Q-C1",
+            material_incluido="Fragmento",
+            estado=Cassette.Status.COMPLETADO,
+        )
+        Cassette.objects.create(
+            histopathology_sample=self.histopathology_sample,
+            codigo_cassette="HP-Q-C2",
+            material_incluido="Fragmento",
+        )
+        for estado in (Slide.Status.LISTO, Slide.Status.MONTADO) * 2:
+            Slide.objects.create(
+                protocol=self.histopathology_protocol,
+                tecnica_coloracion="Hematoxilina-Eosina",
+                estado=estado,
+            )
+        Protocol.objects.filter(pk=self.histopathology_protocol.pk).update(
+            reception_date=timezone.now() - timedelta(days=3)
+        )
+        self.client.login(email="staff@example.com", password="testpass123")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("protocols:processing_queue"))
+
+        protocol = next(
+            p
+            for p in response.context["protocols"]
+            if p.pk == self.histopathology_protocol.pk
+        )
+        self.assertEqual(protocol.cassettes_count, 2)
+        self.assertEqual(protocol.cassettes_completed, 1)
+        self.assertEqual(protocol.slides_count, 4)
+        self.assertEqual(protocol.slides_ready, 2)
+        self.assertEqual(protocol.days_in_process, 3)
+        # Counts are correlated subqueries, not joins grouped per protocol
+        queue_sql = next(
+            query["sql"]
+            for query in queries
+            if "protocols_cassette" in query["sql"]
+        )
+        self.assertNotIn("GROUP BY", queue_sql)
+
+    def test_processing_queue_view_queries_do_not_grow_with_queue(self):
+        """The queue runs a fixed number of queries."""
+        self.client.login(email="staff@example.com", password="testpass123")
+        url = reverse("protocols:processing_queue")
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for index in range(5):
+            protocol = Protocol.objects.create(
+                analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+                veterinarian=self.veterinarian,
+                species="Canino",
+                animal_identification=f"Animal {index}",
+                submission_date=date.today(),
+            )
+            protocol.submit()
+            protocol.receive(received_by=self.staff_user)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+
+        self.assertEqual(len(many), len(few))
+
     def test_processing_queue_view_filter_by_type(self):
         """Test processing queue view filtering by analysis type."""
         self.client.login(email="staff@example.com", password="testpass123")
@@ -2273,6 +2557,206 @@ class ProcessingViewsTest(TestCase):
         self.assertRedirects(response, reverse("accounts:complete_profile"))
 
 
+class ProcessingScanTest(TestCase):
+    """Test cases for the processing scan station."""
+
+    def setUp(self):
+        """Set up a received histopathology protocol with cassettes."""
+        self.vet_user = User.objects.create_user(
+            email="vet@example.com",
+            username="vet",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+            email_verified=True,
+        )
+        self.staff_user = User.objects.create_user(
+            email="staff@example.com",
+            username="staff",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+            email_verified=True,
+            is_staff=True,
+        )
+        self.veterinarian = Veterinarian.objects.create(
+            user=self.vet_user,
+            first_name="John",
+            last_name="Doe",
+            license_number="MP-12345-PROTOCOLS",
+            phone="+54 341 1234567",
+            email="vet@example.com",
+        )
+        self.protocol = Protocol.objects.create(
+            analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+            veterinarian=self.veterinarian,
+            species="Canino",
+            animal_identification="Rex",
+            submission_date=date.today(),
+        )
+        self.protocol.submit()
+        self.protocol.receive(received_by=self.staff_user)
+        self.sample = HistopathologySample.objects.create(
+            protocol=self.protocol,
+            veterinarian=self.veterinarian,
+            material_submitted="Fragmento de hígado",
+        )
+        self.cassettes = [
+            Cassette.objects.create(
+                histopathology_sample=self.sample,
+                material_incluido=f"Fragmento {i}",
+            )
+            for i in range(2)
+        ]
+        self.slide = Slide.objects.create(
+            protocol=self.protocol,
+            tecnica_coloracion="Hematoxilina-Eosina",
+        )
+        self.url = reverse("protocols:processing_scan")
+        self.client.login(email="staff@example.com", password="testpass123")
+
+    def _scan(self, stage, codes):
+        return self.client.post(
+            self.url,
+            {"stage": stage, "codes": codes},
+            content_type="application/json",
+        )
+
+    def test_scan_station_page(self):
+        """The station offers both cassette and slide stages."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "protocols/processing/scan_station.html"
+        )
+        self.assertIn(
+            "fijacion",
+            [stage for stage, label in response.context["cassette_stages"]],
+        )
+        self.assertIn(
+            "listo",
+            [stage for stage, label in response.context["slide_stages"]],
+        )
+
+    def test_scan_cassette_batch(self):
+        """A batch of cassettes moves to the stage with one log each."""
+        codes = [cassette.codigo_cassette for cassette in self.cassettes]
+
+        response = self._scan("fijacion", codes + ["HP 99/999-C1"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "stage": "fijacion",
+                "updated": codes,
+                "not_found": ["HP 99/999-C1"],
+            },
+        )
+        for cassette in self.cassettes:
+            cassette.refresh_from_db()
+            self.assertIsNotNone(cassette.fecha_fijacion)
+            self.assertEqual(cassette.estado, Cassette.Status.EN_PROCESO)
+            log = ProcessingLog.objects.get(cassette=cassette)
+            self.assertEqual(log.etapa, ProcessingLog.Stage.FIJACION)
+            self.assertEqual(log.protocol, self.protocol)
+            self.assertEqual(log.usuario, self.staff_user)
+
+    def test_scan_single_code_form_encoded(self):
+        """A scanner can post one code at a time as a form."""
+        code = self.cassettes[0].codigo_cassette
+
+        response = self.client.post(
+            self.url, {"stage": "entacado", "code": [f" {code} ", "  "]}
+        )
+
+        self.assertEqual(response.json()["updated"], [code])
+        self.assertEqual(response.json()["not_found"], [])
+        self.cassettes[0].refresh_from_db()
+        self.assertIsNotNone(self.cassettes[0].fecha_entacado)
+        self.assertEqual(self.cassettes[0].estado, Cassette.Status.COMPLETADO)
+
+    def test_scan_cassette_code_at_slide_stage(self):
+        """Slide stages only look up slide codes."""
+        code = self.cassettes[0].codigo_cassette
+
+        response = self._scan("montaje", [code])
+
+        self.assertEqual(response.json()["not_found"], [code])
+        self.assertFalse(ProcessingLog.objects.exists())
+
+    def test_scan_slide_stages(self):
+        """Slides use their own stages; marking ready is not logged."""
+        code = self.slide.codigo_portaobjetos
+
+        self._scan("coloracion", [code])
+        self.slide.refresh_from_db()
+        self.assertIsNotNone(self.slide.fecha_coloracion)
+        self.assertEqual(self.slide.estado, Slide.Status.COLOREADO)
+
+        self._scan("listo", [code])
+        self.slide.refresh_from_db()
+        self.assertEqual(self.slide.estado, Slide.Status.LISTO)
+        self.assertEqual(
+            list(
+                ProcessingLog.objects.filter(slide=self.slide).values_list(
+                    "etapa", flat=True
+                )
+            ),
+            [ProcessingLog.Stage.COLORACION],
+        )
+
+    def test_scan_rejects_bad_requests(self):
+        """Unknown stages, empty scans and malformed JSON get a 400."""
+        code = self.cassettes[0].codigo_cassette
+
+        self.assertEqual(self._scan("secado", [code]).status_code, 400)
+        self.assertEqual(self._scan("fijacion", []).status_code, 400)
+        self.assertEqual(self._scan("fijacion", [1]).status_code, 400)
+        self.assertEqual(self._scan([], [code]).status_code, 400)
+        response = self.client.post(
+            self.url,
+            {"stage": "fijacion", "codes": [code], "observaciones": None},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            self.url, "{", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProcessingLog.objects.exists())
+
+    def test_scan_query_count_does_not_grow_with_batch(self):
+        """A full rack costs the same queries as two cassettes."""
+        for i in range(38):
+            Cassette.objects.create(
+                histopathology_sample=self.sample,
+                material_incluido=f"Fragmento extra {i}",
+            )
+        codes = list(
+            Cassette.objects.values_list("codigo_cassette", flat=True)
+        )
+        service = ProtocolProcessingService()
+
+        with CaptureQueriesContext(connection) as small:
+            service.scan_stage(codes[:2], "inclusion", self.staff_user)
+        with CaptureQueriesContext(connection) as large:
+            updated, unknown, error = service.scan_stage(
+                codes, "inclusion", self.staff_user
+            )
+
+        self.assertEqual(len(updated), 40)
+        self.assertEqual(len(large), len(small))
+
+    def test_scan_requires_staff(self):
+        """Veterinarians cannot use the scan station."""
+        self.client.login(email="vet@example.com", password="testpass123")
+
+        response = self._scan("fijacion", [self.cassettes[0].codigo_cassette])
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ProcessingLog.objects.exists())
+
+
 # ============================================================================
 # WORK ORDER VIEWS TESTS
 # ============================================================================
@@ -5,14 +5,19 @@ Tests race conditions and concurrent access patterns to ensure
 the application works correctly under parallel execution.
 """
 
+import multiprocessing
 import os
+import sys
 import tempfile
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.db import connection, transaction
+from django.db import connection, connections, transaction
 from django.test import TransactionTestCase
 
 from accounts.models import Histopathologist, Veterinarian
@@ -24,6 +29,7 @@ from protocols.models import (
     WorkOrder,
     WorkOrderCounter,
 )
+from protocols.services.protocol_service import ProtocolReceptionService
 
 User = get_user_model()
 
@@ -488,3 +494,141 @@ class ConcurrencyTest(TransactionTestCase):
         # Verify protocols exist in database
         for protocol_id in results:
             self.assertTrue(Protocol.objects.filter(id=protocol_id).exists())
+
+
+def _receive_protocols(protocol_ids, user_id, box_size):
+    """
+    Benchmark client: receive `protocol_ids` through the reception service.
+
+    The first half is received in boxes of `box_size` through
+    process_bulk_reception(), the rest one by one through
+    process_reception(), as the views do. Runs in a forked process with its
+    own database connection.
+    """
+    service = ProtocolReceptionService()
+    user = User.objects.get(pk=user_id)
+    form_data = {"sample_condition": Protocol.SampleCondition.OPTIMAL}
+    try:
+        protocols = list(
+            Protocol.objects.filter(pk__in=protocol_ids).order_by("pk")
+        )
+        boxed, single = (
+            protocols[: len(protocols) // 2],
+            protocols[len(protocols) // 2 :],
+        )
+        for start in range(0, len(boxed), box_size):
+            received, error = service.process_bulk_reception(
+                boxed[start : start + box_size], form_data, user
+            )
+            if error:
+                raise RuntimeError(error)
+        for protocol in single:
+            success, error = service.process_reception(
+                protocol, form_data, user
+            )
+            if not success:
+                raise RuntimeError(error)
+    finally:
+        connection.close()
+
+
+@skipUnless(
+    os.environ.get("RUN_BENCHMARKS"), "Set RUN_BENCHMARKS=1 to run benchmarks"
+)
+@skipIf(_is_sqlite(), "SQLite serializes every write transaction")
+class ReceptionThroughputBenchmark(TransactionTestCase):
+    """
+    Receptions per second with 1, 8 and 32 parallel clients.
+
+    Every client is a separate process (threads would share the GIL)
+    receiving its own submitted protocols through ProtocolReceptionService,
+    so all of them compete for the same protocol number counter. Every
+    client receives half of its protocols in boxes through the bulk
+    reception and the other half one at a time, so the mix is the same at
+    every level. Only runs with RUN_BENCHMARKS set. The results are written
+    to stderr; the assertions only check that numbering stays unique and
+    gap-free under load.
+    """
+
+    CLIENTS = (1, 8, 32)
+    RECEPTIONS_PER_CLIENT = 20
+    BOX_SIZE = 10
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="lab@example.com",
+            username="lab",
+            password="testpass123",
+            role=User.Role.PERSONAL_LAB,
+        )
+        vet_user = User.objects.create_user(
+            email="vet@example.com",
+            username="vet",
+            password="testpass123",
+            role=User.Role.VETERINARIO,
+        )
+        self.veterinarian = Veterinarian.objects.create(
+            user=vet_user,
+            first_name="John",
+            last_name="Doe",
+            license_number="MP-BENCHMARK-001",
+            phone="+54 342 1234567",
+            email="vet@example.com",
+        )
+
+    def _submitted_protocol_ids(self, count):
+        return [
+            Protocol.objects.create(
+                veterinarian=self.veterinarian,
+                analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+                status=Protocol.Status.SUBMITTED,
+                submission_date=date.today(),
+                species="Canino",
+                animal_identification=f"Benchmark {index}",
+                presumptive_diagnosis="Test diagnosis",
+            ).pk
+            for index in range(count)
+        ]
+
+    # Celery runs eagerly under test, which would rebuild the daily metrics
+    # rollup on every save instead of once per burst
+    @patch("pages.signals.schedule_rollup_refresh")
+    def test_reception_throughput(self, schedule_rollup_refresh):
+        context = multiprocessing.get_context("fork")
+        rates = {}
+        for clients in self.CLIENTS:
+            protocol_ids = self._submitted_protocol_ids(
+                clients * self.RECEPTIONS_PER_CLIENT
+            )
+            batches = [protocol_ids[i::clients] for i in range(clients)]
+            # Forked clients must not share the parent's connections
+            connections.close_all()
+
+            with context.Pool(clients) as pool:
+                started = time.perf_counter()
+                pool.starmap(
+                    _receive_protocols,
+                    [
+                        (batch, self.staff.pk, self.BOX_SIZE)
+                        for batch in batches
+                    ],
+                )
+                elapsed = time.perf_counter() - started
+            rates[clients] = len(protocol_ids) / elapsed
+
+        numbers = sorted(
+            int(number.rsplit("/", 1)[1])
+            for number in Protocol.objects.values_list(
+                "protocol_number", flat=True
+            )
+        )
+        self.assertEqual(numbers, list(range(1, len(numbers) + 1)))
+
+        sys.stderr.write(
+            "\nReception throughput: "
+            + ", ".join(
+                f"{clients} client(s) {rate:.0f}/s"
+                for clients, rate in rates.items()
+            )
+            + "\n"
+        )
@@ -5,7 +5,9 @@ Tests for report generation and management.
 from datetime import date
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from accounts.models import Histopathologist, Veterinarian
@@ -302,6 +304,48 @@ class ReportViewsTest(TestCase):
         response = self.client.get(reverse("protocols:report_pending_list"))
         self.assertEqual(response.status_code, 200)
 
+    def _ready_protocol(self, animal):
+        return Protocol.objects.create(
+            analysis_type=Protocol.AnalysisType.HISTOPATHOLOGY,
+            veterinarian=self.veterinarian,
+            species="Canino",
+            animal_identification=animal,
+            submission_date=date.today(),
+            status=Protocol.Status.READY,
+        )
+
+    def test_report_pending_list_excludes_reported_protocols(self):
+        """Only READY protocols without a report are listed."""
+        reported = self._ready_protocol("Luna")
+        Report.objects.create(
+            protocol=reported,
+            histopathologist=self.staff_histopathologist,
+            veterinarian=self.veterinarian,
+        )
+        pending = self._ready_protocol("Toby")
+        self.client.login(username="staff@test.com", password="testpass123")
+
+        response = self.client.get(reverse("protocols:report_pending_list"))
+
+        self.assertEqual(
+            [p.pk for p in response.context["protocols"]],
+            [pending.pk, self.protocol.pk],
+        )
+
+    def test_report_pending_list_queries_do_not_grow_with_rows(self):
+        """The pending list runs a fixed number of queries."""
+        self.client.login(username="staff@test.com", password="testpass123")
+        url = reverse("protocols:report_pending_list")
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for index in range(5):
+            self._ready_protocol(f"Animal {index}")
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+
+        self.assertEqual(len(many), len(few))
+
     def test_report_create_view(self):
         """Test report creation view."""
         self.client.login(username="staff@test.com", password="testpass123")
@@ -52,6 +52,11 @@ urlpatterns = [
         views.ReceptionSearchView.as_view(),
         name="reception_search",
     ),
+    path(
+        "reception/bulk/",
+        views.ReceptionBulkView.as_view(),
+        name="reception_bulk",
+    ),
     path(
         "reception/<int:pk>/confirm/",
         views.ReceptionConfirmView.as_view(),
@@ -113,6 +118,11 @@ urlpatterns = [
         views.SlideRegisterView.as_view(),
         name="slide_register",
     ),
+    path(
+        "processing/scan/",
+        views.ProcessingScanView.as_view(),
+        name="processing_scan",
+    ),
     path(
         "processing/slide/<int:slide_pk>/stage/",
         views.SlideUpdateStageView.as_view(),
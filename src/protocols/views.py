@@ -1,3 +1,4 @@
+import json
 import logging
 from datetime import date
 from io import BytesIO
@@ -5,10 +6,12 @@ from io import BytesIO
 import qrcode
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
-from django.http import FileResponse
+from django.db.models import Count, DateField, OuterRef, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.http import FileResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import (
     CreateView,
@@ -30,28 +33,32 @@ from accounts.mixins import (
     VeterinarianProfileRequiredMixin,
     VeterinarianRequiredMixin,
 )
+from pages import dashboard_cache
+from protocols.db_functions import DaysBetween, SubqueryCount
 from protocols.forms import (
     CytologyProtocolForm,
     HistopathologyProtocolForm,
     ProtocolEditForm,
     ProtocolResubmitForm,
+    ReceptionBulkForm,
     ReceptionForm,
     ReceptionSearchForm,
 )
 from protocols.models import (
     Cassette,
-    CassetteSlide,
     ProcessingLog,
     Protocol,
     ProtocolStatusHistory,
     ReceptionLog,
     Slide,
 )
+from protocols.pagination import KeysetPaginationMixin
 from protocols.services.email_service import EmailNotificationService
 from protocols.services.protocol_service import (
     ProtocolProcessingService,
     ProtocolReceptionService,
 )
+from protocols.services.search_service import ProtocolSearchService
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +67,7 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 
-class ProtocolListView(ListView):
+class ProtocolListView(KeysetPaginationMixin, ListView):
     """
     Display list of protocols for the current user.
     Admin users see all protocols, veterinarians see only their own.
@@ -71,6 +78,7 @@ class ProtocolListView(ListView):
     template_name = "protocols/protocol_list.html"
     context_object_name = "protocols"
     paginate_by = 20
+    estimate_total = True
 
     def get_queryset(self):
         """Get protocols based on user permissions."""
@@ -120,13 +128,12 @@ class ProtocolListView(ListView):
         if date_to:
             protocols = protocols.filter(submission_date__lte=date_to)
 
+        # Full-text search on animal, owner and clinical data, plus codes;
+        # results are ordered by relevance.
         search_query = self.request.GET.get("search")
         if search_query:
-            protocols = protocols.filter(
-                Q(animal_identification__icontains=search_query)
-                | Q(temporary_code__icontains=search_query)
-                | Q(protocol_number__icontains=search_query)
-                | Q(presumptive_diagnosis__icontains=search_query)
+            protocols = ProtocolSearchService().search(
+                protocols, search_query, include_codes=True, ranked=True
             )
 
         return protocols
@@ -148,7 +155,7 @@ class ProtocolListView(ListView):
                 "name": "search",
                 "label": "Buscar",
                 "type": "text",
-                "placeholder": "Animal, código, diagnóstico...",
+                "placeholder": "Animal, propietario, código, diagnóstico...",
                 "value": search_query,
             },
             {
@@ -617,7 +624,10 @@ class ReceptionPendingView(StaffRequiredMixin, ListView):
         ).strip()
         animal_name = self.request.GET.get("animal_name", "").strip()
 
-        # Filter by temporal code (case-insensitive partial match)
+        search = ProtocolSearchService()
+
+        # Filter by temporal code (case-insensitive partial match, trigram
+        # index on PostgreSQL)
         if temporal_code:
             protocols = protocols.filter(
                 temporary_code__icontains=temporal_code
@@ -630,16 +640,12 @@ class ReceptionPendingView(StaffRequiredMixin, ListView):
         # Filter by veterinarian identifier (license_number, cuil_cuit, or dni)
         if veterinarian_license:
             protocols = protocols.filter(
-                Q(veterinarian__license_number__icontains=veterinarian_license)
-                | Q(veterinarian__cuil_cuit__icontains=veterinarian_license)
-                | Q(veterinarian__dni__icontains=veterinarian_license)
+                search.veterinarian_filter(veterinarian_license)
             )
 
-        # Filter by animal name (case-insensitive partial match)
+        # Full-text search on animal, owner, species and clinical data
         if animal_name:
-            protocols = protocols.filter(
-                animal_identification__icontains=animal_name
-            )
+            protocols = search.search(protocols, animal_name)
 
         # Order by submission date
         protocols = protocols.order_by("submission_date")
@@ -674,7 +680,9 @@ class ReceptionPendingView(StaffRequiredMixin, ListView):
         return context
 
 
-class ReceptionHistoryView(StaffRequiredMixin, ListView):
+class ReceptionHistoryView(
+    StaffRequiredMixin, KeysetPaginationMixin, ListView
+):
     """
     Display list of reception logs with filtering capabilities.
     """
@@ -709,12 +717,11 @@ class ReceptionHistoryView(StaffRequiredMixin, ListView):
             "reception_date_to", ""
         ).strip()
 
+        search = ProtocolSearchService(prefix="protocol__")
+
         # Filter by protocol code (search both temporary and final codes)
         if protocol_code:
-            logs = logs.filter(
-                Q(protocol__temporary_code__icontains=protocol_code)
-                | Q(protocol__protocol_number__icontains=protocol_code)
-            )
+            logs = logs.filter(search.code_filter(protocol_code))
 
         # Filter by analysis type
         if analysis_type:
@@ -723,22 +730,12 @@ class ReceptionHistoryView(StaffRequiredMixin, ListView):
         # Filter by veterinarian identifier (license_number, cuil_cuit, or dni)
         if veterinarian_license:
             logs = logs.filter(
-                Q(
-                    protocol__veterinarian__license_number__icontains=veterinarian_license
-                )
-                | Q(
-                    protocol__veterinarian__cuil_cuit__icontains=veterinarian_license
-                )
-                | Q(
-                    protocol__veterinarian__dni__icontains=veterinarian_license
-                )
+                search.veterinarian_filter(veterinarian_license)
             )
 
-        # Filter by animal name
+        # Full-text search on animal, owner, species and clinical data
         if animal_name:
-            logs = logs.filter(
-                protocol__animal_identification__icontains=animal_name
-            )
+            logs = search.search(logs, animal_name)
 
         # Filter by reception date range
         if reception_date_from:
@@ -777,7 +774,9 @@ class ReceptionHistoryView(StaffRequiredMixin, ListView):
         return context
 
 
-class RejectedProtocolsView(StaffRequiredMixin, ListView):
+class RejectedProtocolsView(
+    StaffRequiredMixin, KeysetPaginationMixin, ListView
+):
     """
     Display list of rejected protocols.
     """
@@ -788,11 +787,13 @@ class RejectedProtocolsView(StaffRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        """Get rejected protocols."""
+        """Get rejected protocols, most recently rejected first."""
+        # Keyset pagination needs a non-null ordering value
         return (
             Protocol.objects.filter(status=Protocol.Status.REJECTED)
             .select_related("veterinarian__user", "received_by")
-            .order_by("-reception_date")
+            .annotate(rejected_at=Coalesce("reception_date", "created_at"))
+            .order_by("-rejected_at")
         )
 
 
@@ -873,60 +874,34 @@ class ProcessingDashboardView(StaffRequiredMixin, TemplateView):
 
     template_name = "protocols/processing/dashboard.html"
 
+    # Context name for each counted state
+    PROTOCOL_COUNTS = {
+        Protocol.Status.RECEIVED: "protocols_received",
+        Protocol.Status.PROCESSING: "protocols_processing",
+        Protocol.Status.READY: "protocols_ready",
+    }
+    CASSETTE_COUNTS = {
+        Cassette.Status.PENDIENTE: "cassettes_pending",
+        Cassette.Status.EN_PROCESO: "cassettes_processing",
+        Cassette.Status.COMPLETADO: "cassettes_completed",
+    }
+    SLIDE_COUNTS = {
+        Slide.Status.PENDIENTE: "slides_pending",
+        Slide.Status.MONTADO: "slides_mounted",
+        Slide.Status.COLOREADO: "slides_stained",
+        Slide.Status.LISTO: "slides_ready",
+    }
+
     def get_context_data(self, **kwargs):
         """Add processing statistics to context."""
         context = super().get_context_data(**kwargs)
 
-        # Get received protocols that need processing
-        protocols_received = (
-            Protocol.objects.filter(status=Protocol.Status.RECEIVED)
-            .select_related(
-                "veterinarian__user",
-                "cytology_sample",
-                "histopathology_sample",
-            )
-            .count()
-        )
-
-        # Get protocols currently in processing
-        protocols_processing = (
-            Protocol.objects.filter(status=Protocol.Status.PROCESSING)
-            .select_related(
-                "veterinarian__user",
-                "cytology_sample",
-                "histopathology_sample",
-            )
-            .count()
+        # Counts by protocol status, cassette and slide estado; cached and
+        # invalidated by saves of those models (WIP family)
+        context.update(
+            dashboard_cache.get_or_compute("processing_dashboard_counts")
         )
 
-        # Get protocols ready for analysis
-        protocols_ready = Protocol.objects.filter(
-            status=Protocol.Status.READY
-        ).count()
-
-        # Get cassettes by status
-        cassettes_pending = Cassette.objects.filter(
-            estado=Cassette.Status.PENDIENTE
-        ).count()
-        cassettes_processing = Cassette.objects.filter(
-            estado=Cassette.Status.EN_PROCESO
-        ).count()
-        cassettes_completed = Cassette.objects.filter(
-            estado=Cassette.Status.COMPLETADO
-        ).count()
-
-        # Get slides by status
-        slides_pending = Slide.objects.filter(
-            estado=Slide.Status.PENDIENTE
-        ).count()
-        slides_mounted = Slide.objects.filter(
-            estado=Slide.Status.MONTADO
-        ).count()
-        slides_stained = Slide.objects.filter(
-            estado=Slide.Status.COLOREADO
-        ).count()
-        slides_ready = Slide.objects.filter(estado=Slide.Status.LISTO).count()
-
         # Recent processing activity
         recent_logs = ProcessingLog.objects.select_related(
             "protocol",
@@ -935,26 +910,45 @@ class ProcessingDashboardView(StaffRequiredMixin, TemplateView):
             "usuario",
         ).order_by("-created_at")[:10]
 
-        context.update(
-            {
-                "protocols_received": protocols_received,
-                "protocols_processing": protocols_processing,
-                "protocols_ready": protocols_ready,
-                "cassettes_pending": cassettes_pending,
-                "cassettes_processing": cassettes_processing,
-                "cassettes_completed": cassettes_completed,
-                "slides_pending": slides_pending,
-                "slides_mounted": slides_mounted,
-                "slides_stained": slides_stained,
-                "slides_ready": slides_ready,
-                "recent_logs": recent_logs,
-            }
-        )
+        context["recent_logs"] = recent_logs
 
         return context
 
+    @classmethod
+    def _calculate_counts(cls):
+        """One grouped count per table for the dashboard cards."""
+        counts = dict.fromkeys(
+            [
+                *cls.PROTOCOL_COUNTS.values(),
+                *cls.CASSETTE_COUNTS.values(),
+                *cls.SLIDE_COUNTS.values(),
+            ],
+            0,
+        )
+        for queryset, field, names in (
+            (Protocol.objects, "status", cls.PROTOCOL_COUNTS),
+            (Cassette.objects, "estado", cls.CASSETTE_COUNTS),
+            (Slide.objects, "estado", cls.SLIDE_COUNTS),
+        ):
+            rows = (
+                queryset.filter(**{f"{field}__in": list(names)})
+                .values(field)
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+            for row in rows:
+                counts[names[row[field]]] = row["count"]
+        return counts
+
 
-class ProcessingQueueView(StaffRequiredMixin, ListView):
+dashboard_cache.register(
+    "processing_dashboard_counts",
+    [dashboard_cache.WIP],
+    ProcessingDashboardView._calculate_counts,
+)
+
+
+class ProcessingQueueView(StaffRequiredMixin, KeysetPaginationMixin, ListView):
     """
     Display processing queue with protocols ready for processing.
     """
@@ -963,6 +957,7 @@ class ProcessingQueueView(StaffRequiredMixin, ListView):
     template_name = "protocols/processing/queue.html"
     context_object_name = "protocols"
     paginate_by = 20
+    estimate_total = True
 
     def get_queryset(self):
         """Get protocols in processing queue with filtering."""
@@ -970,7 +965,14 @@ class ProcessingQueueView(StaffRequiredMixin, ListView):
         analysis_type = self.request.GET.get("type", "all")
         status_filter = self.request.GET.get("status", "all")
 
-        # Base queryset - received and processing protocols
+        # Base queryset - received and processing protocols. Progress and
+        # days in process are computed in SQL, so only the visible page is
+        # loaded; each count is its own correlated subquery so cassettes
+        # and slides are never joined against each other.
+        cassettes = Cassette.objects.filter(
+            histopathology_sample__protocol=OuterRef("pk")
+        )
+        slides = Slide.objects.filter(protocol=OuterRef("pk"))
         protocols = (
             Protocol.objects.filter(
                 status__in=[
@@ -983,7 +985,25 @@ class ProcessingQueueView(StaffRequiredMixin, ListView):
                 "cytology_sample",
                 "histopathology_sample",
             )
-            .order_by("reception_date")
+            .annotate(
+                queued_at=Coalesce("reception_date", "created_at"),
+                days_in_process=Coalesce(
+                    DaysBetween(
+                        Value(timezone.localdate(), output_field=DateField()),
+                        TruncDate("reception_date"),
+                    ),
+                    0,
+                ),
+                cassettes_count=SubqueryCount(cassettes),
+                cassettes_completed=SubqueryCount(
+                    cassettes.filter(estado=Cassette.Status.COMPLETADO)
+                ),
+                slides_count=SubqueryCount(slides),
+                slides_ready=SubqueryCount(
+                    slides.filter(estado=Slide.Status.LISTO)
+                ),
+            )
+            .order_by("queued_at", "id")
         )
 
         # Apply type filter
@@ -994,32 +1014,6 @@ class ProcessingQueueView(StaffRequiredMixin, ListView):
         if status_filter != "all":
             protocols = protocols.filter(status=status_filter)
 
-        # Calculate processing info
-        for protocol in protocols:
-            days_in_process = (
-                (date.today() - protocol.reception_date.date()).days
-                if protocol.reception_date
-                else 0
-            )
-            protocol.days_in_process = days_in_process
-
-            # Check what's pending
-            if protocol.analysis_type == Protocol.AnalysisType.HISTOPATHOLOGY:
-                cassettes = (
-                    protocol.histopathology_sample.cassettes.all()
-                    if hasattr(protocol, "histopathology_sample")
-                    else []
-                )
-                protocol.cassettes_count = len(cassettes)
-                protocol.cassettes_completed = sum(
-                    1
-                    for c in cassettes
-                    if c.estado == Cassette.Status.COMPLETADO
-                )
-            else:
-                protocol.cassettes_count = 0
-                protocol.cassettes_completed = 0
-
         return protocols
 
     def get_context_data(self, **kwargs):
@@ -1174,52 +1168,28 @@ class CassetteCreateView(StaffRequiredMixin, View):
             if cassette_count < 1 or cassette_count > 20:
                 raise ValueError("Invalid cassette count")
 
-            # Create cassettes with form data
-            created_cassettes = []
-            for i in range(cassette_count):
-                # Get cassette-specific data
-                material = request.POST.get(f"material_{i}", "")
-                tipo = request.POST.get(
-                    f"tipo_{i}", Cassette.CassetteType.NORMAL
-                )
-                color = request.POST.get(
-                    f"color_{i}", Cassette.CassetteColor.BLANCO
-                )
-                observaciones = request.POST.get(f"observaciones_{i}", "")
-
-                cassette = Cassette.objects.create(
-                    histopathology_sample=protocol.histopathology_sample,
-                    material_incluido=material,
-                    tipo_cassette=tipo,
-                    color_cassette=color,
-                    observaciones=observaciones,
-                )
-
-                # Update to encasetado stage
-                cassette.update_stage("encasetado")
-
-                # Log action
-                ProcessingLog.log_action(
-                    protocol=protocol,
-                    etapa=ProcessingLog.Stage.ENCASETADO,
-                    usuario=request.user,
-                    cassette=cassette,
-                    observaciones=f"Cassette creado: {material[:50]}",
-                )
-
-                created_cassettes.append(cassette)
-
-            # Update protocol status to processing
-            if protocol.status == Protocol.Status.RECEIVED:
-                protocol.status = Protocol.Status.PROCESSING
-                protocol.save(update_fields=["status"])
-
-                ProtocolStatusHistory.log_status_change(
-                    protocol=protocol,
-                    new_status=Protocol.Status.PROCESSING,
-                    changed_by=request.user,
-                    description=f"Iniciado procesamiento - {len(created_cassettes)} cassettes creados",
+            cassette_data = [
+                {
+                    "material": request.POST.get(f"material_{i}", ""),
+                    "tipo": request.POST.get(
+                        f"tipo_{i}", Cassette.CassetteType.NORMAL
+                    ),
+                    "color": request.POST.get(
+                        f"color_{i}", Cassette.CassetteColor.BLANCO
+                    ),
+                    "observaciones": request.POST.get(
+                        f"observaciones_{i}", ""
+                    ),
+                }
+                for i in range(cassette_count)
+            ]
+            success, created_cassettes, error_message = (
+                ProtocolProcessingService().create_cassettes(
+                    protocol, cassette_data, request.user
                 )
+            )
+            if not success:
+                raise ValueError(error_message)
 
             messages.success(
                 request,
@@ -1386,6 +1356,89 @@ class ReceptionConfirmView(StaffRequiredMixin, FormView):
         return redirect(self.get_success_url())
 
 
+class ReceptionBulkView(StaffRequiredMixin, FormView):
+    """
+    Receive a box of samples at once by scanning their temporary codes.
+    """
+
+    form_class = ReceptionBulkForm
+    template_name = "protocols/reception_bulk.html"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reception_service = ProtocolReceptionService()
+
+    def get_initial(self):
+        """Prefill codes passed as ?code=... (e.g. from the pending list)."""
+        initial = super().get_initial()
+        codes = self.request.GET.getlist("code")
+        if codes:
+            initial["temporary_codes"] = "\n".join(codes)
+        return initial
+
+    def form_valid(self, form):
+        """Validate every code, then receive the whole batch."""
+        codes = form.cleaned_data["temporary_codes"]
+        found = {
+            protocol.temporary_code: protocol
+            for protocol in Protocol.objects.filter(temporary_code__in=codes)
+        }
+
+        unknown = [code for code in codes if code not in found]
+        if unknown:
+            form.add_error(
+                "temporary_codes",
+                _("Códigos no encontrados: %(codes)s")
+                % {"codes": ", ".join(unknown)},
+            )
+        not_submitted = [
+            code
+            for code in codes
+            if code in found
+            and found[code].status != Protocol.Status.SUBMITTED
+        ]
+        if not_submitted:
+            form.add_error(
+                "temporary_codes",
+                _("Protocolos en borrador o ya procesados: %(codes)s")
+                % {"codes": ", ".join(not_submitted)},
+            )
+        if not form.is_valid():
+            return self.form_invalid(form)
+
+        received, error_message = (
+            self.reception_service.process_bulk_reception(
+                [found[code] for code in codes],
+                form.cleaned_data,
+                self.request.user,
+            )
+        )
+        if error_message:
+            messages.error(
+                self.request, f"Error al procesar recepción: {error_message}"
+            )
+            return self.form_invalid(form)
+
+        skipped = len(codes) - len(received)
+        messages.success(
+            self.request,
+            _("%(count)d muestras recibidas exitosamente.")
+            % {"count": len(received)},
+        )
+        if skipped:
+            messages.warning(
+                self.request,
+                _(
+                    "%(count)d protocolos fueron procesados por otro usuario y se omitieron."
+                )
+                % {"count": skipped},
+            )
+
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), received=received)
+        )
+
+
 class ProtocolSelectTypeView(VeterinarianRequiredMixin, TemplateView):
     """
     Show a page to select the type of protocol to create.
@@ -1572,65 +1625,33 @@ class SlideRegisterView(StaffRequiredMixin, View):
             if slide_count < 1 or slide_count > 50:
                 raise ValueError("Invalid slide count")
 
-            # Create slides
-            created_slides = []
+            slide_data = []
             for i in range(slide_count):
-                # Get slide-specific data
-                codigo_portaobjetos = request.POST.get(
-                    f"codigo_portaobjetos_{i}", ""
-                )
                 campo = request.POST.get(f"campo_{i}")
-                campo = int(campo) if campo else None
-                tecnica_coloracion = request.POST.get(
-                    f"tecnica_coloracion_{i}", ""
-                )
-                observaciones = request.POST.get(f"observaciones_{i}", "")
-
-                # Create slide
-                slide = Slide.objects.create(
-                    protocol=protocol,
-                    codigo_portaobjetos=codigo_portaobjetos,
-                    campo=campo,
-                    tecnica_coloracion=tecnica_coloracion,
-                    observaciones=observaciones,
-                    estado=Slide.Status.PENDIENTE,
+                slide_data.append(
+                    {
+                        "codigo_portaobjetos": request.POST.get(
+                            f"codigo_portaobjetos_{i}", ""
+                        ),
+                        "campo": int(campo) if campo else None,
+                        "tecnica_coloracion": request.POST.get(
+                            f"tecnica_coloracion_{i}", ""
+                        ),
+                        "observaciones": request.POST.get(
+                            f"observaciones_{i}", ""
+                        ),
+                        # Each slide can have up to 2 cassette positions
+                        "cassette_1": request.POST.get(f"cassette_{i}_1"),
+                        "cassette_2": request.POST.get(f"cassette_{i}_2"),
+                    }
                 )
-
-                # Handle cassette relationships for histopathology
-                if (
-                    protocol.analysis_type
-                    == Protocol.AnalysisType.HISTOPATHOLOGY
-                ):
-                    # Get cassette relationships for this slide
-                    for pos in [
-                        1,
-                        2,
-                    ]:  # Each slide can have up to 2 cassette positions
-                        cassette_id = request.POST.get(f"cassette_{i}_{pos}")
-                        if cassette_id:
-                            try:
-                                cassette = Cassette.objects.get(
-                                    id=cassette_id,
-                                    histopathology_sample=protocol.histopathology_sample,
-                                )
-                                CassetteSlide.objects.create(
-                                    cassette=cassette,
-                                    slide=slide,
-                                    position=pos,
-                                )
-                            except Cassette.DoesNotExist:
-                                pass
-
-                # Log action
-                ProcessingLog.log_action(
-                    protocol=protocol,
-                    etapa=ProcessingLog.Stage.MONTAJE,
-                    usuario=request.user,
-                    slide=slide,
-                    observaciones=f"Slide registrado: {codigo_portaobjetos}",
+            success, created_slides, error_message = (
+                ProtocolProcessingService().register_slides(
+                    protocol, slide_data, request.user
                 )
-
-                created_slides.append(slide)
+            )
+            if not success:
+                raise ValueError(error_message)
 
             messages.success(
                 request,
@@ -1737,6 +1758,83 @@ class SlideUpdateQualityView(StaffRequiredMixin, View):
         return redirect("protocols:processing_status", pk=slide.protocol.pk)
 
 
+class ProcessingScanView(StaffRequiredMixin, View):
+    """
+    Scan station: move scanned cassettes or slides to a processing stage.
+
+    GET shows the station page. POST takes a target `stage` and one or
+    more scanned `code` values (form-encoded, or JSON with `codes`), so a
+    rack can be sent one scan at a time or as a batch, and answers in JSON.
+    """
+
+    MAX_CODES = 200
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.processing_service = ProtocolProcessingService()
+
+    def get(self, request, *args, **kwargs):
+        """Show the scan station."""
+        labels = dict(ProcessingLog.Stage.choices)
+        labels["listo"] = Slide.Status.LISTO.label
+        service = self.processing_service
+        context = {
+            "cassette_stages": [
+                (stage, labels[stage])
+                for stage in service.CASSETTE_SCAN_STAGES
+            ],
+            "slide_stages": [
+                (stage, labels[stage]) for stage in service.SLIDE_SCAN_STAGES
+            ],
+        }
+        return render(
+            request, "protocols/processing/scan_station.html", context
+        )
+
+    def post(self, request, *args, **kwargs):
+        """Apply the stage to the scanned codes."""
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body)
+                stage = data.get("stage", "")
+                codes = data.get("codes", [])
+                observaciones = data.get("observaciones", "")
+            except (ValueError, AttributeError):
+                return JsonResponse({"error": "JSON inválido."}, status=400)
+        else:
+            stage = request.POST.get("stage", "")
+            codes = request.POST.getlist("code")
+            observaciones = request.POST.get("observaciones", "")
+
+        if not isinstance(stage, str) or not isinstance(observaciones, str):
+            return JsonResponse({"error": "Datos inválidos."}, status=400)
+        if not isinstance(codes, list) or not all(
+            isinstance(code, str) for code in codes
+        ):
+            return JsonResponse({"error": "Códigos inválidos."}, status=400)
+        if not codes:
+            return JsonResponse(
+                {"error": "Debe escanear al menos un código."}, status=400
+            )
+        if len(codes) > self.MAX_CODES:
+            return JsonResponse(
+                {
+                    "error": f"No se pueden procesar más de {self.MAX_CODES} códigos a la vez."
+                },
+                status=400,
+            )
+
+        updated, not_found, error_message = self.processing_service.scan_stage(
+            codes, stage, request.user, observaciones
+        )
+        if error_message:
+            return JsonResponse({"error": str(error_message)}, status=400)
+
+        return JsonResponse(
+            {"stage": stage, "updated": updated, "not_found": not_found}
+        )
+
+
 class ProtocolResubmitView(StaffRequiredMixin, FormView):
     """
     Handle resubmission of rejected protocols.
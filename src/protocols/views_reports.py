@@ -5,6 +5,8 @@ Views for report generation and management.
 import logging
 
 from django.contrib import messages
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
 from django.http import FileResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
@@ -24,6 +26,7 @@ from protocols.forms_reports import (
     ReportSendForm,
 )
 from protocols.models import Protocol, Report
+from protocols.pagination import KeysetPaginationMixin
 from protocols.services.email_service import EmailNotificationService
 from protocols.services.pdf_service import PDFGenerationService
 from protocols.services.report_service import ReportGenerationService
@@ -37,7 +40,9 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 
-class ReportPendingListView(StaffRequiredMixin, ListView):
+class ReportPendingListView(
+    StaffRequiredMixin, KeysetPaginationMixin, ListView
+):
     """
     List protocols that are ready for report generation.
     """
@@ -45,32 +50,26 @@ class ReportPendingListView(StaffRequiredMixin, ListView):
     model = Protocol
     template_name = "protocols/reports/pending_list.html"
     context_object_name = "protocols"
+    paginate_by = 20
+    estimate_total = True
 
     def get_queryset(self):
-        """Get protocols ready for report generation."""
-        # Protocols that are READY status and don't have reports yet
-        protocols = (
+        """Get READY protocols that have no report yet."""
+        # Anti-join in SQL, ordered to match the partial index
+        # protocol_ready_reception_idx
+        return (
             Protocol.objects.filter(status=Protocol.Status.READY)
+            .filter(~Exists(Report.objects.filter(protocol=OuterRef("pk"))))
             .select_related(
                 "veterinarian__user",
                 "cytology_sample",
                 "histopathology_sample",
             )
-            .prefetch_related(
-                "histopathology_sample__cassettes",
-                "slides",
-            )
-            .order_by("-reception_date")
+            .prefetch_related("histopathology_sample__cassettes")
+            .annotate(queued_at=Coalesce("reception_date", "created_at"))
+            .order_by("-queued_at", "-id")
         )
 
-        # Filter out protocols that already have reports
-        protocols_without_reports = []
-        for protocol in protocols:
-            if not protocol.reports.exists():
-                protocols_without_reports.append(protocol)
-
-        return protocols_without_reports
-
     def get_context_data(self, **kwargs):
         """Add title to context."""
         context = super().get_context_data(**kwargs)
@@ -78,7 +77,7 @@ class ReportPendingListView(StaffRequiredMixin, ListView):
         return context
 
 
-class ReportHistoryView(StaffRequiredMixin, ListView):
+class ReportHistoryView(StaffRequiredMixin, KeysetPaginationMixin, ListView):
     """
     View history of generated reports.
     """
@@ -1,11 +1,18 @@
 """
 Server statistics service for admin dashboard monitoring.
 
-Collects CPU, RAM, disk, I/O and Docker container stats via psutil and Docker SDK.
+Collects CPU, RAM, disk, I/O, network and Docker container stats via psutil and
+Docker SDK.
 Optional: if psutil or docker are not installed, functions return error payloads.
 """
 
+import contextlib
 import logging
+import math
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any, Dict, List
 
 try:
@@ -15,8 +22,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-_GARAGE_BUCKET_CACHE_KEY = "server_stats_garage_bucket"
-_GARAGE_BUCKET_CACHE_TIMEOUT = 300  # 5 minutes
+# Docker client shared by every get_docker_stats call in this process
+_docker_client = None
+_docker_client_lock = threading.Lock()
 
 _SYSTEM_ERROR = {
     "cpu": {"percent": None},
@@ -28,6 +36,7 @@ _SYSTEM_ERROR = {
         "read_human": "—",
         "write_human": "—",
     },
+    "net": {"sent_per_sec": None, "recv_per_sec": None},
     "error": "Módulo psutil no instalado.",
 }
 
@@ -43,22 +52,105 @@ def _format_bytes(value: int | None) -> str:
     return f"{value:.1f} PB"
 
 
-def get_system_stats() -> Dict[str, Any]:
+def _read_counters() -> Dict[str, Any]:
     """
-    Collect system metrics using psutil.
+    Cumulative CPU time, disk I/O and network counters since boot.
+
+    The boot time and host name identify the counter series, so a sample
+    taken on another host or container, or before a reboot, is not used
+    as a baseline.
+    """
+    times = psutil.cpu_times()._asdict()
+    # guest time is already included in user time on Linux
+    total = sum(times.values()) - times.get("guest", 0)
+    total -= times.get("guest_nice", 0)
+    io = psutil.disk_io_counters()
+    net = psutil.net_io_counters()
+    return {
+        "timestamp": time.time(),
+        "host": socket.gethostname(),
+        "boot_time": psutil.boot_time(),
+        "cpu_total": total,
+        "cpu_idle": times.get("idle", 0) + times.get("iowait", 0),
+        "read_bytes": io.read_bytes if io else None,
+        "write_bytes": io.write_bytes if io else None,
+        "read_count": io.read_count if io else None,
+        "write_count": io.write_count if io else None,
+        "bytes_sent": net.bytes_sent if net else None,
+        "bytes_recv": net.bytes_recv if net else None,
+    }
+
+
+def _delta(current: Dict, previous: Dict, key: str) -> float | None:
+    """Counter increase since `previous`, or None if unknown or reset."""
+    if current.get(key) is None or previous.get(key) is None:
+        return None
+    delta = current[key] - previous[key]
+    return delta if delta >= 0 else None
+
+
+def _rate(
+    current: Dict, previous: Dict | None, key: str, elapsed: float | None
+) -> float | None:
+    """Per-second rate of counter `key` between two samples."""
+    if previous is None or not elapsed:
+        return None
+    delta = _delta(current, previous, key)
+    return round(delta / elapsed, 1) if delta is not None else None
+
+
+def _format_rate(value: float | None) -> str:
+    return "—" if value is None else f"{_format_bytes(value)}/s"
+
+
+def get_system_stats(previous: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Collect system metrics using psutil, without sleeping.
+
+    CPU usage and the disk/network rates are computed from the deltas
+    between the cumulative counters read now and the ones stored in
+    `previous` (the "system" part of the last snapshot payload), so they
+    cover the whole interval between refreshes. A previous sample from
+    another host or boot is ignored. Without a usable previous sample, CPU falls back to psutil's non-blocking reading and rates are
+    None.
 
     Returns:
         dict: CPU percent, RAM (total/used/available/percent), disk usage
-        for '/', and disk I/O (read_bytes, write_bytes, human-readable).
-        If psutil is not installed, returns error payload with null values.
+        for '/', disk I/O totals and rates (bytes/s, IOPS), network rates
+        and the raw counters for the next call. If psutil is not installed,
+        returns error payload with null values.
     """
     if psutil is None:
         return _SYSTEM_ERROR.copy()
 
-    cpu_percent = psutil.cpu_percent(interval=0.1)
     mem = psutil.virtual_memory()
     disk = psutil.disk_usage("/")
-    io_counters = psutil.disk_io_counters()
+    counters = _read_counters()
+
+    last = (previous or {}).get("counters")
+    if last and any(
+        last.get(key) != counters[key] for key in ("host", "boot_time")
+    ):
+        last = None
+    elapsed = None
+    if last and last.get("timestamp"):
+        elapsed = counters["timestamp"] - last["timestamp"]
+        if elapsed <= 0:
+            last, elapsed = None, None
+
+    cpu_percent = None
+    if last:
+        cpu_total = _delta(counters, last, "cpu_total")
+        cpu_idle = _delta(counters, last, "cpu_idle")
+        if cpu_total and cpu_idle is not None:
+            cpu_percent = max(0.0, 100.0 * (1 - cpu_idle / cpu_total))
+    if cpu_percent is None:
+        cpu_percent = psutil.cpu_percent(interval=None)
+
+    read_rate = _rate(counters, last, "read_bytes", elapsed)
+    write_rate = _rate(counters, last, "write_bytes", elapsed)
+    sent_rate = _rate(counters, last, "bytes_sent", elapsed)
+    recv_rate = _rate(counters, last, "bytes_recv", elapsed)
 
     return {
         "cpu": {
@@ -77,15 +169,27 @@ def get_system_stats() -> Dict[str, Any]:
             "percent": round(disk.percent, 1),
         },
         "io": {
-            "read_bytes": io_counters.read_bytes if io_counters else None,
-            "write_bytes": io_counters.write_bytes if io_counters else None,
-            "read_human": _format_bytes(
-                io_counters.read_bytes if io_counters else None
-            ),
-            "write_human": _format_bytes(
-                io_counters.write_bytes if io_counters else None
-            ),
+            "read_bytes": counters["read_bytes"],
+            "write_bytes": counters["write_bytes"],
+            "read_human": _format_bytes(counters["read_bytes"]),
+            "write_human": _format_bytes(counters["write_bytes"]),
+            "read_bytes_per_sec": read_rate,
+            "write_bytes_per_sec": write_rate,
+            "read_rate_human": _format_rate(read_rate),
+            "write_rate_human": _format_rate(write_rate),
+            "read_iops": _rate(counters, last, "read_count", elapsed),
+            "write_iops": _rate(counters, last, "write_count", elapsed),
         },
+        "net": {
+            "bytes_sent": counters["bytes_sent"],
+            "bytes_recv": counters["bytes_recv"],
+            "sent_per_sec": sent_rate,
+            "recv_per_sec": recv_rate,
+            "sent_rate_human": _format_rate(sent_rate),
+            "recv_rate_human": _format_rate(recv_rate),
+        },
+        "interval_seconds": round(elapsed, 1) if elapsed else None,
+        "counters": counters,
     }
 
 
@@ -93,71 +197,61 @@ def get_media_bucket_stats() -> Dict[str, Any] | None:
     """
     Return object count and total size for the media bucket (Garage/S3), or None.
 
-    Uses Django default_storage when USE_S3_STORAGE is True and not TESTING.
-    Result is cached for 5 minutes to avoid listing the bucket on every poll.
-    On exception (e.g. connection error), logs and returns None.
+    Reads the running per-prefix counters kept by the media storage
+    (pages.MediaPrefixUsage), so the cost does not depend on the number of
+    objects in the bucket. Only when USE_S3_STORAGE is True and not TESTING.
+    On exception (e.g. database error), logs and returns None.
     """
     from django.conf import settings
-    from django.core.cache import cache
 
     if getattr(settings, "TESTING", False):
         return None
     if not getattr(settings, "USE_S3_STORAGE", False):
         return None
 
-    cached = cache.get(_GARAGE_BUCKET_CACHE_KEY)
-    if cached is not None:
-        return cached
-
     try:
         from django.core.files.storage import default_storage
 
-        if (
-            not hasattr(default_storage, "bucket")
-            or default_storage.bucket is None
-        ):
+        from pages.models import MediaPrefixUsage, MediaReconciliation
+
+        bucket_name = getattr(default_storage, "bucket_name", None)
+        if not bucket_name:
             return None
-        client = default_storage.connection.meta.client
-        bucket_name = default_storage.bucket.name
+        totals = MediaPrefixUsage.get_totals()
+        state = MediaReconciliation.objects.filter(
+            pk=MediaReconciliation.SINGLETON_PK
+        ).first()
     except Exception as e:
-        logger.warning("Garage bucket stats unavailable (storage): %s", e)
+        logger.warning("Garage bucket stats unavailable: %s", e)
         return None
 
-    try:
-        paginator = client.get_paginator("list_objects_v2")
-        count = 0
-        total_size = 0
-        for page in paginator.paginate(Bucket=bucket_name):
-            for obj in page.get("Contents") or []:
-                count += 1
-                total_size += obj.get("Size", 0)
-        result = {
-            "bucket": bucket_name,
-            "object_count": count,
-            "total_size_bytes": total_size,
-        }
-        cache.set(
-            _GARAGE_BUCKET_CACHE_KEY, result, _GARAGE_BUCKET_CACHE_TIMEOUT
-        )
-        return result
-    except Exception as e:
-        logger.warning("Garage bucket stats unavailable (list): %s", e)
-        return None
+    reconciled_at = state.last_completed_at if state else None
+    return {
+        "bucket": bucket_name,
+        **totals,
+        "reconciled_at": reconciled_at.isoformat() if reconciled_at else None,
+    }
 
 
-def _parse_container_stats(c) -> Dict[str, Any]:
-    """Return memory and CPU stats for a container, or None values on failure."""
-    out = {
+def _empty_container_stats() -> Dict[str, Any]:
+    return {
         "memory_usage_bytes": None,
         "memory_limit_bytes": None,
         "memory_percent": None,
         "cpu_percent": None,
     }
+
+
+def _parse_container_stats(c) -> Dict[str, Any]:
+    """Return memory and CPU stats for a container, or None values on failure."""
+    out = _empty_container_stats()
     try:
         stats = c.stats(stream=False)
     except Exception as e:
         logger.debug("Container %s stats failed: %s", c.name, e)
+        out["stats_error"] = str(e) or e.__class__.__name__
         return out
+    out["stats_error"] = None
 
     # Memory
     mem = stats.get("memory_stats") or {}
@@ -189,16 +283,91 @@ def _parse_container_stats(c) -> Dict[str, Any]:
     return out
 
 
-def get_docker_stats() -> Dict[str, Any]:
+def _docker_stats_timeout() -> float:
+    from django.conf import settings
+
+    return float(getattr(settings, "DOCKER_STATS_TIMEOUT", 5.0))
+
+
+def _get_docker_client(docker):
+    """
+    Return the process-wide Docker client, creating it on first use.
+
+    Its HTTP timeout is slightly above DOCKER_STATS_TIMEOUT so a stats call
+    abandoned by get_docker_stats cannot keep its worker thread for long.
+    """
+    global _docker_client
+    with _docker_client_lock:
+        if _docker_client is None:
+            timeout = _docker_stats_timeout()
+            _docker_client = docker.from_env(timeout=math.ceil(timeout) + 1)
+        return _docker_client
+
+
+def reset_docker_client() -> None:
+    """Drop the cached Docker client; the next call reconnects."""
+    global _docker_client
+    with _docker_client_lock:
+        client, _docker_client = _docker_client, None
+    if client is not None:
+        with contextlib.suppress(Exception):
+            client.close()
+
+
+def _collect_container_stats(containers) -> List[Dict[str, Any]]:
+    """
+    Fetch stats for all `containers` concurrently, in input order.
+
+    Each container gets DOCKER_STATS_TIMEOUT seconds once a worker picks it
+    up; stats that are not back in time are reported as None with a
+    per-container stats_error instead of delaying the others.
+    """
+    from django.conf import settings
+
+    if not containers:
+        return []
+    timeout = _docker_stats_timeout()
+    workers = min(
+        len(containers), int(getattr(settings, "DOCKER_STATS_MAX_WORKERS", 8))
+    )
+    rounds = math.ceil(len(containers) / workers)
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="docker-stats"
+    )
+    try:
+        futures = [
+            executor.submit(_parse_container_stats, c) for c in containers
+        ]
+        wait(futures, timeout=timeout * rounds)
+        results = []
+        for c, future in zip(containers, futures):
+            if future.done():
+                results.append(future.result())
+                continue
+            logger.warning("Container %s stats timed out", c.name)
+            stats = _empty_container_stats()
+            stats["stats_error"] = "Tiempo de espera agotado"
+            results.append(stats)
+        return results
+    finally:
+        # Do not wait for stats calls that timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_docker_stats(name_filter: str | None = None) -> Dict[str, Any]:
     """
     List running Docker containers via Docker SDK.
 
     Requires Docker socket to be mounted (e.g. /var/run/docker.sock).
-    Returns error message if Docker is unavailable.
+    Returns error message if Docker is unavailable. The client is reused
+    across calls and per-container stats are fetched in parallel, so a run
+    takes about as long as the slowest container. With `name_filter`, only
+    containers whose name contains it are included.
 
     Returns:
-        dict: Either {"containers": [...], "error": null} or
-        {"containers": [], "error": "message"}.
+        dict: Either {"containers": [...], "error": null, "partial": bool} or
+        {"containers": [], "error": "message"}. Containers whose stats could
+        not be read have a non-null "stats_error" and "partial" is true.
     """
     try:
         import docker
@@ -206,14 +375,18 @@ def get_docker_stats() -> Dict[str, Any]:
         return {"containers": [], "error": "Módulo docker no instalado."}
 
     try:
-        client = docker.from_env()
+        client = _get_docker_client(docker)
         containers = client.containers.list()
     except Exception as e:
         logger.warning("Docker stats unavailable: %s", e)
+        reset_docker_client()
         return {"containers": [], "error": str(e)}
 
+    if name_filter:
+        containers = [c for c in containers if name_filter in c.name]
+
     result: List[Dict[str, Any]] = []
-    for c in containers:
+    for c, stats in zip(containers, _collect_container_stats(containers)):
         entry = {
             "name": c.name,
             "image": c.image.tags[0]
@@ -222,6 +395,10 @@ def get_docker_stats() -> Dict[str, Any]:
             "status": c.status,
             "started_at": c.attrs.get("State", {}).get("StartedAt") or "—",
         }
-        entry.update(_parse_container_stats(c))
+        entry.update(stats)
         result.append(entry)
-    return {"containers": result, "error": None}
+    return {
+        "containers": result,
+        "error": None,
+        "partial": any(entry["stats_error"] for entry in result),
+    }